@@ -1,7 +1,89 @@
-from django.contrib import admin
-from .models import Order, Review, Favorite, Notification
+from django.contrib import admin, messages
+from django.db import transaction
 
-admin.site.register(Order)
-admin.site.register(Review)
-admin.site.register(Favorite)
-admin.site.register(Notification)
+from proyectoApp import contadores, fragmentos
+from proyectoApp.models import Producto
+
+from . import page_cache
+from .models import Order, Review, Favorite, Notification, NotificationOutbox
+from .pagination import EstimatedCountPaginator
+
+
+class LargeTableAdmin(admin.ModelAdmin):
+    """
+    Tablas con millones de filas: el listado no cuenta la tabla completa.
+    Las FK del formulario van en raw_id_fields (un <select> cargaría todas las filas).
+    """
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+
+@admin.register(Order)
+class OrderAdmin(LargeTableAdmin):
+    list_display = ('id', 'product', 'buyer', 'quantity', 'status', 'created_at')
+    list_select_related = ('product', 'buyer')
+    list_filter = ('status',)
+    raw_id_fields = ('buyer', 'product')
+
+
+# --------------------------
+# MODERACIÓN DE RESEÑAS
+# --------------------------
+def _set_reviews_active(request, queryset, active):
+    """
+    Un solo UPDATE; como no pasa por las señales, recalcula los contadores de
+    los productos afectados e invalida sus páginas (y con ello el histograma).
+    """
+    with transaction.atomic():
+        changed = queryset.exclude(active=active)
+        products = list(changed.order_by().values_list('product_id', flat=True).distinct())
+        total = changed.update(active=active)
+        contadores.recontar(
+            Producto.objects.filter(pk__in=products),
+            **contadores.valores_resenas(Review.objects.filter(active=True), 'product', 'rating'),
+        )
+    fragmentos.invalidar_productos(products)
+    page_cache.bump_catalog_version()
+    messages.success(request, f"{total} reseñas {'activadas' if active else 'desactivadas'}.")
+
+
+@admin.action(description="Activar reseñas seleccionadas")
+def activate_reviews(modeladmin, request, queryset):
+    _set_reviews_active(request, queryset, True)
+
+
+@admin.action(description="Desactivar reseñas seleccionadas")
+def deactivate_reviews(modeladmin, request, queryset):
+    _set_reviews_active(request, queryset, False)
+
+
+@admin.register(Review)
+class ReviewAdmin(LargeTableAdmin):
+    list_display = ('product', 'author', 'rating', 'active', 'created_at')
+    list_select_related = ('product', 'author')
+    list_filter = ('active',)
+    raw_id_fields = ('product', 'author')
+    actions = (activate_reviews, deactivate_reviews)
+
+
+@admin.register(Favorite)
+class FavoriteAdmin(LargeTableAdmin):
+    list_display = ('user', 'product', 'created_at')
+    list_select_related = ('user', 'product')
+    raw_id_fields = ('user', 'product')
+
+
+@admin.register(Notification)
+class NotificationAdmin(LargeTableAdmin):
+    list_display = ('user', 'message', 'read', 'created_at')
+    list_select_related = ('user',)
+    raw_id_fields = ('user',)
+
+
+@admin.register(NotificationOutbox)
+class NotificationOutboxAdmin(LargeTableAdmin):
+    list_display = ('idempotency_key', 'kind', 'product', 'attempts', 'available_at', 'processed_at')
+    list_select_related = ('product',)
+    # Pendientes / procesados por fecha: outbox_pending_idx
+    list_filter = ('processed_at',)
+    raw_id_fields = ('product',)
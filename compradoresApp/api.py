@@ -0,0 +1,267 @@
+# compradoresApp/api.py
+"""
+API JSON de sólo lectura: productos, resumen de tiendas y reseñas.
+
+- Los filtros del listado de productos son los mismos del catálogo (FilterForm).
+- Las consultas usan proyecciones .values(): no se construyen instancias.
+- ?fields=a,b,c elige las columnas; la paginación es por cursor (?cursor=, ?limit=).
+- Las respuestas se guardan en caché por la misma versión que usa el caché de
+  páginas, y el ETag se deriva de esa versión: un If-None-Match vigente recibe
+  304 sin tocar la base de datos.
+"""
+import hashlib
+import json
+from functools import wraps
+
+from django.core.cache import cache
+from django.core.files.storage import default_storage
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Count
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import quote_etag
+from django.views.decorators.http import require_safe
+
+from proyectoApp import imagenes
+from proyectoApp.fragmentos import clave_producto
+from proyectoApp.models import Producto, Tienda
+
+from .catalog import catalog_ordering, filter_products
+from .forms import FilterForm
+from .models import Review
+from .page_cache import CATALOG_VERSION_KEY, get_version, page_timeout
+from .pagination import CursorPaginator
+from .reviews import review_ordering
+
+try:
+    import orjson
+except ImportError:  # orjson es opcional: sin él se usa json de la stdlib
+    orjson = None
+
+DEFAULT_LIMIT = 20
+MAX_LIMIT = 100
+
+
+def _dumps(data):
+    if orjson is not None:
+        return orjson.dumps(data)
+    return json.dumps(data, cls=DjangoJSONEncoder, ensure_ascii=False).encode()
+
+
+def _json(data, status=200):
+    return HttpResponse(_dumps(data), content_type='application/json', status=status)
+
+
+def _error(message, status=400):
+    return _json({'error': message}, status=status)
+
+
+# --------------------------
+# CAMPOS EXPUESTOS
+# --------------------------
+def _column(*lookups, convert=None):
+    """Campo público: las columnas que necesita y cómo obtener su valor de la fila."""
+    return lookups, convert or (lambda row: row[lookups[0]])
+
+
+def _media_url(name):
+    return default_storage.url(name) if name else None
+
+
+def _thumb_url(row):
+    if not row['imagen']:
+        return None
+    if not row['imagen_derivados']:
+        return _media_url(row['imagen'])
+    return _media_url(imagenes.nombre_derivado(row['imagen'], imagenes.ANCHOS[0]))
+
+
+PRODUCT_FIELDS = {
+    'id': _column('id'),
+    'nombre': _column('nombre'),
+    'descripcion': _column('descripcion'),
+    'precio': _column('precio'),
+    'categoria': _column('categoria'),
+    'stock': _column('stock'),
+    'imagen': _column('imagen', convert=lambda row: _media_url(row['imagen'])),
+    'miniatura': _column('imagen', 'imagen_derivados', convert=_thumb_url),
+    'fecha_creacion': _column('fecha_creacion'),
+    'calificacion_promedio': _column('calificacion_promedio'),
+    'resenas_total': _column('resenas_total'),
+    'favoritos_total': _column('favoritos_total'),
+    'tienda_id': _column('tienda_id'),
+    'tienda': _column('tienda__nombre'),
+    'ubicacion': _column('tienda__ubicacion'),
+}
+PRODUCT_DEFAULT = ('id', 'nombre', 'precio', 'categoria', 'miniatura',
+                   'calificacion_promedio', 'tienda', 'ubicacion')
+
+SHOP_FIELDS = {
+    'id': _column('id'),
+    'nombre': _column('nombre'),
+    'descripcion': _column('descripcion'),
+    'ubicacion': _column('ubicacion'),
+    'fecha_creacion': _column('fecha_creacion'),
+    'calificacion_promedio': _column('calificacion_promedio'),
+    'resenas_total': _column('resenas_total'),
+    'productos_total': _column('productos_total'),
+}
+SHOP_DEFAULT = tuple(SHOP_FIELDS)
+
+REVIEW_FIELDS = {
+    'id': _column('id'),
+    'rating': _column('rating'),
+    'comment': _column('comment'),
+    'created_at': _column('created_at'),
+    'author': _column('author__username'),
+    'artisan_response': _column('artisan_response'),
+    'response_created_at': _column('response_created_at'),
+}
+REVIEW_DEFAULT = tuple(REVIEW_FIELDS)
+
+
+def _selected_fields(request, available, default):
+    raw = request.GET.get('fields')
+    fields = [f.strip() for f in raw.split(',') if f.strip()] if raw else list(default)
+    unknown = [f for f in fields if f not in available]
+    if unknown:
+        raise ValueError(f"Campos desconocidos: {', '.join(unknown)}.")
+    return fields
+
+
+def _lookups(available, fields, extra=()):
+    lookups = dict.fromkeys(extra)
+    for f in fields:
+        lookups.update(dict.fromkeys(available[f][0]))
+    return list(lookups)
+
+
+def _serialize(rows, available, fields):
+    return [{f: available[f][1](row) for f in fields} for row in rows]
+
+
+def _limit(request):
+    try:
+        return max(1, min(int(request.GET.get('limit', DEFAULT_LIMIT)), MAX_LIMIT))
+    except ValueError:
+        return DEFAULT_LIMIT
+
+
+def _page(request, qs, available, fields, ordering):
+    # Las columnas de orden van siempre en la proyección: el cursor sale de ellas
+    qs = qs.values(*_lookups(available, fields, extra=[o.lstrip('-') for o in ordering]))
+    page = CursorPaginator(qs, _limit(request), ordering=ordering).get_page(request.GET.get('cursor'))
+    return {
+        'results': _serialize(page, available, fields),
+        'next': page.next_cursor,
+        'previous': page.previous_cursor,
+    }
+
+
+# --------------------------
+# CACHÉ Y GET CONDICIONAL
+# --------------------------
+def versioned_json(version_func):
+    """
+    version_func(*args, **kwargs) -> versión del contenido. Sólo se cachean
+    respuestas 200; los errores se generan cada vez.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            version = version_func(*args, **kwargs)
+            query = '&'.join(sorted(request.GET.urlencode().split('&')))
+            digest = hashlib.md5(f'{request.path}?{query}:{version}'.encode()).hexdigest()
+            etag = quote_etag(digest)
+
+            not_modified = get_conditional_response(request, etag=etag)
+            if not_modified is not None:
+                return not_modified
+
+            key = 'api:' + digest
+            content = cache.get(key)
+            if content is None:
+                response = view(request, *args, **kwargs)
+                if response.status_code != 200:
+                    return response
+                content = response.content
+                cache.set(key, content, page_timeout())
+
+            response = HttpResponse(content, content_type='application/json')
+            response['ETag'] = etag
+            response['Cache-Control'] = 'public, max-age=0, must-revalidate'
+            return response
+        return wrapper
+    return decorator
+
+
+def _catalog_version(*args, **kwargs):
+    return get_version(CATALOG_VERSION_KEY)
+
+
+def _product_version(pk):
+    return get_version(clave_producto(pk))
+
+
+# --------------------------
+# VISTAS
+# --------------------------
+@require_safe
+@versioned_json(_catalog_version)
+def products(request):
+    form = FilterForm(request.GET)
+    if not form.is_valid():
+        return _json({'error': form.errors.get_json_data()}, status=400)
+    try:
+        fields = _selected_fields(request, PRODUCT_FIELDS, PRODUCT_DEFAULT)
+    except ValueError as e:
+        return _error(str(e))
+
+    _, ordering = catalog_ordering(form)
+    # Siempre por cursor: la relevancia no sirve de clave de orden estable
+    qs = filter_products(Producto.objects.all(), form, ranked=False)
+    return _json(_page(request, qs, PRODUCT_FIELDS, fields, ordering))
+
+
+@require_safe
+@versioned_json(_product_version)
+def product(request, pk):
+    try:
+        fields = _selected_fields(request, PRODUCT_FIELDS, PRODUCT_DEFAULT)
+    except ValueError as e:
+        return _error(str(e))
+
+    row = Producto.objects.filter(pk=pk).values(*_lookups(PRODUCT_FIELDS, fields)).first()
+    if row is None:
+        return _error("Producto no encontrado.", status=404)
+    return _json(_serialize([row], PRODUCT_FIELDS, fields)[0])
+
+
+@require_safe
+@versioned_json(_product_version)
+def product_reviews(request, pk):
+    try:
+        fields = _selected_fields(request, REVIEW_FIELDS, REVIEW_DEFAULT)
+    except ValueError as e:
+        return _error(str(e))
+
+    _, ordering = review_ordering(request.GET.get('sort'))
+    qs = Review.objects.filter(product_id=pk, active=True)
+    return _json(_page(request, qs, REVIEW_FIELDS, fields, ordering))
+
+
+@require_safe
+@versioned_json(_catalog_version)
+def shop(request, pk):
+    try:
+        fields = _selected_fields(request, SHOP_FIELDS, SHOP_DEFAULT)
+    except ValueError as e:
+        return _error(str(e))
+
+    qs = Tienda.objects.filter(pk=pk)
+    if 'productos_total' in fields:
+        qs = qs.annotate(productos_total=Count('producto'))
+    row = qs.values(*_lookups(SHOP_FIELDS, fields)).first()
+    if row is None:
+        return _error("Tienda no encontrada.", status=404)
+    return _json(_serialize([row], SHOP_FIELDS, fields)[0])
@@ -0,0 +1,93 @@
+# compradoresApp/badges.py
+"""
+Contadores de la barra de navegación: notificaciones sin leer (compradores)
+y ventas sin revisar (artesanos).
+
+Viven en caché y se mantienen con incrementos desde las señales y el worker
+del outbox; si la clave no está, se recalcula con un COUNT indexado y se
+vuelve a guardar. Abrir notifications_list o mi_tienda los deja en cero.
+
+Los incrementos del worker sólo llegan a la web con un caché compartido; con
+LocMemCache (por proceso, sólo fuera de producción) los contadores duran unos
+segundos y se recalculan desde Notification.read / Venta.notificado.
+"""
+from django.conf import settings
+from django.core.cache import cache
+
+from proyectoApp.models import Venta
+
+from .models import Notification
+
+TIMEOUT = 60 * 60 * 24 if settings.CACHE_SHARED else 10
+
+
+def _notif_key(user_id):
+    return f'badge:notificaciones:{user_id}'
+
+
+def _ventas_key(user_id):
+    return f'badge:ventas:{user_id}'
+
+
+def _incr(key, delta=1):
+    try:
+        cache.incr(key, delta)
+    except ValueError:
+        # No está en caché: se recalculará al leerlo
+        pass
+
+
+def _get_or_count(key, count):
+    value = cache.get(key)
+    if value is None:
+        value = count()
+        cache.set(key, value, TIMEOUT)
+    return value
+
+
+# --------------------------
+# NOTIFICACIONES
+# --------------------------
+def unread_notifications(user_id):
+    return _get_or_count(
+        _notif_key(user_id),
+        lambda: Notification.objects.filter(user_id=user_id, read=False).count(),
+    )
+
+
+def notification_created(user_id, count=1):
+    _incr(_notif_key(user_id), count)
+
+
+def forget_notifications(user_id):
+    cache.delete(_notif_key(user_id))
+
+
+def mark_notifications_read(user_id):
+    Notification.objects.filter(user_id=user_id, read=False).update(read=True)
+    cache.set(_notif_key(user_id), 0, TIMEOUT)
+
+
+# --------------------------
+# VENTAS SIN REVISAR
+# --------------------------
+def unseen_sales(user_id):
+    return _get_or_count(
+        _ventas_key(user_id),
+        lambda: Venta.objects.filter(
+            tienda__artesano__user_id=user_id, notificado=False
+        ).count(),
+    )
+
+
+def sale_created(user_id):
+    _incr(_ventas_key(user_id))
+
+
+def forget_sales(user_id):
+    cache.delete(_ventas_key(user_id))
+
+
+def mark_sales_seen(user_id, tienda):
+    Venta.objects.filter(tienda=tienda, notificado=False).update(notificado=True)
+    cache.set(_ventas_key(user_id), 0, TIMEOUT)
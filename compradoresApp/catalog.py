@@ -0,0 +1,46 @@
+# compradoresApp/catalog.py
+"""Filtros y órdenes del catálogo, compartidos por la vista HTML y la API JSON."""
+from proyectoApp.search import get_search_backend
+
+# Órdenes del catálogo; todos terminan en id para poder paginar por cursor
+CATALOG_ORDERINGS = {
+    '': ('-fecha_creacion', '-id'),
+    'rating': ('-calificacion_promedio', '-id'),
+    'popular': ('-favoritos_total', '-id'),
+    # Puntaje con decaimiento, mantenido por `manage.py procesar_tendencias`
+    'trending': ('-tendencia', '-id'),
+}
+
+
+def catalog_ordering(form):
+    sort = form.cleaned_data.get("sort", "") if form.is_valid() else ""
+    return sort, CATALOG_ORDERINGS.get(sort, CATALOG_ORDERINGS[''])
+
+
+def filter_products(qs, form, ranked=True):
+    """Aplica los filtros de un FilterForm; con `ranked`, la búsqueda ordena por relevancia."""
+    if not form.is_valid():
+        return qs
+
+    q = form.cleaned_data.get("q")
+    category = form.cleaned_data.get("category")
+    location = form.cleaned_data.get("location")
+    min_price = form.cleaned_data.get("min_price")
+    max_price = form.cleaned_data.get("max_price")
+
+    # Valores exactos (los de la barra de facetas), para usar los índices de
+    # categoria y ubicacion; el texto parcial va por la búsqueda (q). En MySQL
+    # la colación *_ci compara sin mayúsculas ni tildes.
+    if category:
+        qs = qs.filter(categoria=category.strip())
+    if location:
+        qs = qs.filter(tienda__ubicacion=location.strip())
+    if min_price:
+        qs = qs.filter(precio__gte=min_price)
+    if max_price:
+        qs = qs.filter(precio__lte=max_price)
+
+    # Texto libre contra el índice de búsqueda
+    if q:
+        qs = get_search_backend().search(qs, q, ranked=ranked)
+    return qs
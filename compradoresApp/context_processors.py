@@ -0,0 +1,14 @@
+from django.utils.functional import SimpleLazyObject
+
+from . import badges
+
+
+def badges_context(request):
+    if not request.user.is_authenticated:
+        return {}
+    user_id = request.user.pk
+    # Perezosos: sólo cuestan algo si la plantilla muestra el badge
+    return {
+        'notificaciones': SimpleLazyObject(lambda: badges.unseen_sales(user_id)),
+        'notificaciones_sin_leer': SimpleLazyObject(lambda: badges.unread_notifications(user_id)),
+    }
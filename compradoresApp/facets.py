@@ -0,0 +1,209 @@
+# compradoresApp/facets.py
+"""
+Conteos por faceta del catálogo: categoría, ubicación de la tienda y rango
+de precio, para el conjunto de filtros actual.
+
+- Cada faceta es una sola consulta agrupada (GROUP BY) y se calcula sin su
+  propio filtro, para que se vean también las otras opciones.
+- El resultado se guarda en caché por faceta y filtros normalizados, con una
+  versión que cambian las señales de Producto y Tienda (no las reseñas: no
+  afectan los conteos).
+- Las combinaciones que se calculan se anotan en un contador; el comando
+  `precalcular_facetas` recalcula las más pedidas tras una invalidación
+  (sólo con un caché compartido: otro proceso no ve un LocMemCache).
+"""
+import hashlib
+import time
+
+from django.core.cache import cache
+from django.db.models import Case, Count, IntegerField, Value, When
+
+from proyectoApp.models import Producto
+
+from .catalog import filter_products
+from .forms import FilterForm
+from .page_cache import VERSION_TIMEOUT, get_version, page_timeout
+
+FACETS_VERSION_KEY = 'facetas-version'
+POPULAR_KEY = 'facetas:populares'
+MAX_POPULAR = 500
+MAX_VALUES = 20
+
+FILTER_FIELDS = ('q', 'category', 'location', 'min_price', 'max_price')
+
+# Rangos (desde, hasta] en CLP; None = sin límite
+PRICE_BUCKETS = ((None, 5000), (5000, 10000), (10000, 25000), (25000, 50000),
+                 (50000, 100000), (100000, None))
+
+
+def bump_facets_version():
+    cache.set(FACETS_VERSION_KEY, time.time_ns(), VERSION_TIMEOUT)
+
+
+# --------------------------
+# CONSULTAS AGRUPADAS
+# --------------------------
+def _grouped(qs, column):
+    return [
+        (row[column], row['n'])
+        for row in qs.values(column).annotate(n=Count('id')).order_by('-n', column)[:MAX_VALUES]
+        if row[column]
+    ]
+
+
+def _price_counts(qs):
+    bucket = Case(
+        *[When(precio__lte=hi, then=Value(i)) for i, (_, hi) in enumerate(PRICE_BUCKETS) if hi],
+        default=Value(len(PRICE_BUCKETS) - 1),
+        output_field=IntegerField(),
+    )
+    counts = dict(qs.annotate(bucket=bucket).values('bucket').annotate(n=Count('id')).values_list('bucket', 'n'))
+    return [(i, counts[i]) for i in range(len(PRICE_BUCKETS)) if counts.get(i)]
+
+
+# nombre -> (campos del filtro que se ignoran, cálculo)
+FACETS = {
+    'category': (('category',), lambda qs: _grouped(qs, 'categoria')),
+    'location': (('location',), lambda qs: _grouped(qs, 'tienda__ubicacion')),
+    'price': (('min_price', 'max_price'), _price_counts),
+}
+
+
+def normalize_filters(data):
+    """Filtros válidos y no vacíos como texto, en el formato de FilterForm."""
+    form = FilterForm({k: data.get(k) for k in FILTER_FIELDS if data.get(k)})
+    if not form.is_valid():
+        return {}
+    filters = {}
+    for field in FILTER_FIELDS:
+        value = form.cleaned_data.get(field)
+        if value in (None, ''):
+            continue
+        # Decimal('5000.00') -> '5000': la misma combinación, la misma clave.
+        # Categoría y ubicación se filtran por valor exacto: no se cambian
+        if field.endswith('_price'):
+            filters[field] = format(value.normalize(), 'f')
+        else:
+            filters[field] = value.strip().lower() if field == 'q' else value.strip()
+    return filters
+
+
+def facet_filters(name, filters):
+    ignored = FACETS[name][0]
+    return {k: v for k, v in filters.items() if k not in ignored}
+
+
+def _key(name, filters, version):
+    raw = '&'.join(f'{k}={v}' for k, v in sorted(filters.items()))
+    return f'facetas:{name}:{version}:' + hashlib.md5(raw.encode()).hexdigest()
+
+
+def compute(name, filters):
+    qs = filter_products(Producto.objects.order_by(), FilterForm(filters), ranked=False)
+    return FACETS[name][1](qs)
+
+
+def _record_popular(combos):
+    popular = cache.get(POPULAR_KEY) or {}
+    for combo in combos:
+        popular[combo] = popular.get(combo, 0) + 1
+    if len(popular) > MAX_POPULAR:
+        popular = dict(sorted(popular.items(), key=lambda item: -item[1])[:MAX_POPULAR // 2])
+    cache.set(POPULAR_KEY, popular, VERSION_TIMEOUT)
+
+
+def facet_counts(filters):
+    """{faceta: [(valor, conteo), ...]} desde caché; calcula sólo lo que falta."""
+    version = get_version(FACETS_VERSION_KEY)
+    per_facet = {name: facet_filters(name, filters) for name in FACETS}
+    keys = {name: _key(name, f, version) for name, f in per_facet.items()}
+    cached = cache.get_many(keys.values())
+
+    result, missing = {}, {}
+    for name, key in keys.items():
+        if key in cached:
+            result[name] = cached[key]
+        else:
+            result[name] = missing[key] = compute(name, per_facet[name])
+    if missing:
+        cache.set_many(missing, page_timeout())
+        _record_popular(
+            (name, tuple(sorted(per_facet[name].items()))) for name, key in keys.items() if key in missing
+        )
+    return result
+
+
+def precompute(combos):
+    """Calcula y guarda las combinaciones (faceta, filtros) dadas; devuelve cuántas."""
+    version = get_version(FACETS_VERSION_KEY)
+    values = {_key(name, filters, version): compute(name, filters) for name, filters in combos}
+    cache.set_many(values, page_timeout())
+    return len(values)
+
+
+def popular_combos(limit):
+    popular = cache.get(POPULAR_KEY) or {}
+    ranked = sorted(popular.items(), key=lambda item: -item[1])[:limit]
+    return [(name, dict(filters)) for (name, filters), _ in ranked]
+
+
+# --------------------------
+# ENLACES PARA LA PLANTILLA
+# --------------------------
+def _price_label(lo, hi):
+    if lo is None:
+        return f'Hasta ${hi}'
+    if hi is None:
+        return f'Más de ${lo}'
+    return f'${lo} – ${hi}'
+
+
+def facet_links(request, counts, filters):
+    """[(título, opciones, query sin la faceta)]; cada opción trae su conteo y su query."""
+    def link(**changes):
+        params = request.GET.copy()
+        for key in ('page', 'cursor'):
+            params.pop(key, None)
+        for key, value in changes.items():
+            params.pop(key, None)
+            if value is not None:
+                params[key] = value
+        return params.urlencode()
+
+    def option(label, count, active, **changes):
+        return {'label': label, 'count': count, 'active': active, 'query': link(**changes)}
+
+    groups = []
+    for name, title in (('category', 'Categoría'), ('location', 'Ubicación')):
+        options = [
+            option(value, n, filters.get(name, '').lower() == value.lower(), **{name: value})
+            for value, n in counts[name]
+        ]
+        groups.append((title, options, link(**{name: None})))
+
+    options = []
+    for i, n in counts['price']:
+        lo, hi = PRICE_BUCKETS[i]
+        # (desde, hasta]: precio es entero, el mínimo del filtro es inclusivo
+        min_price = str(lo + 1) if lo is not None else None
+        max_price = str(hi) if hi is not None else None
+        active = filters.get('min_price') == min_price and filters.get('max_price') == max_price
+        options.append(option(_price_label(lo, hi), n, active, min_price=min_price, max_price=max_price))
+    groups.append(('Precio', options, link(min_price=None, max_price=None)))
+    return groups
+
+
+def filter_choices(counts, filters):
+    """
+    Opciones de los <select> de categoría y ubicación: [(valor, elegido)].
+    El filtro es por valor exacto, así que sólo se ofrecen valores existentes
+    (más el actual, si quedó fuera de los MAX_VALUES más frecuentes).
+    """
+    choices = {}
+    for name in ('category', 'location'):
+        values = [value for value, _ in counts[name]]
+        current = filters.get(name)
+        if current and current not in values:
+            values.append(current)
+        choices[name] = [(value, value == current) for value in sorted(values, key=str.lower)]
+    return choices
@@ -17,6 +17,15 @@ class ReviewForm(forms.ModelForm):
         }
 
 class FilterForm(forms.Form):
+    SORT_CHOICES = (
+        ('', 'Más recientes'),
+        ('rating', 'Mejor calificados'),
+        ('popular', 'Más populares'),
+        ('trending', 'En tendencia'),
+    )
+
+    q = forms.CharField(required=False, max_length=100)
+    sort = forms.ChoiceField(required=False, choices=SORT_CHOICES)
     category = forms.CharField(required=False)
     location = forms.CharField(required=False)
     min_price = forms.DecimalField(required=False, decimal_places=2, max_digits=10)
@@ -0,0 +1,35 @@
+from time import perf_counter
+
+from django.core.management.base import BaseCommand, CommandError
+
+from compradoresApp import recommendations
+
+
+class Command(BaseCommand):
+    help = (
+        "Calcula los productos relacionados (co-favoritos, co-compras, misma tienda "
+        "y categoría) y reemplaza la tabla RelatedProduct. Requiere numpy y scipy."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--top', type=int, default=recommendations.TOP_K,
+                            help="Vecinos guardados por producto.")
+        parser.add_argument('--block', type=int, default=recommendations.BLOCK_SIZE,
+                            help="Productos por bloque de la multiplicación (acota la memoria).")
+
+    def handle(self, *args, **options):
+        inicio = perf_counter()
+        try:
+            ids, neighbors, stats = recommendations.compute(options['top'], options['block'])
+        except recommendations.RecommendationError as e:
+            raise CommandError(str(e))
+        total = recommendations.store(ids, neighbors)
+
+        self.stdout.write(
+            f"{stats['interacciones']} interacciones leídas en {stats.get('lectura_s', 0):.1f} s; "
+            f"similitud en {stats.get('similitud_s', 0):.1f} s."
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f"{total} relaciones guardadas para {len(neighbors)} productos "
+            f"en {perf_counter() - inicio:.1f} s."
+        ))
@@ -0,0 +1,37 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from compradoresApp import facets
+
+
+class Command(BaseCommand):
+    help = (
+        "Calcula y deja en caché los conteos por faceta del catálogo: sin filtros, "
+        "por cada categoría y ubicación principal, y las combinaciones más pedidas. "
+        "Conviene correrlo tras importaciones o con cron, después de una invalidación. "
+        "Requiere un caché compartido (Redis/Memcached): con LocMemCache sólo llenaría "
+        "el caché de este proceso."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--popular', type=int, default=100,
+                            help="Cuántas de las combinaciones más pedidas recalcular.")
+
+    def handle(self, *args, **options):
+        if not settings.CACHE_SHARED:
+            raise CommandError(
+                "CACHE_BACKEND es por proceso: los workers web no verían estos conteos. "
+                "Configure un caché compartido (p. ej. RedisCache) para precalcular facetas."
+            )
+        combos = [(name, {}) for name in facets.FACETS]
+        # Un filtro de categoría o de ubicación es lo más común desde la barra de facetas
+        for name in ('category', 'location'):
+            for value, _ in facets.compute(name, {}):
+                filters = facets.normalize_filters({name: value})
+                combos.extend((other, facets.facet_filters(other, filters)) for other in facets.FACETS)
+        combos.extend(facets.popular_combos(options['popular']))
+
+        # Sin repetidos: distintas combinaciones comparten la misma clave por faceta
+        unique = {(name, tuple(sorted(filters.items()))): (name, filters) for name, filters in combos}
+        total = facets.precompute(unique.values())
+        self.stdout.write(self.style.SUCCESS(f"{total} conteos de facetas en caché."))
@@ -0,0 +1,43 @@
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+
+from compradoresApp import outbox
+
+
+class Command(BaseCommand):
+    help = (
+        "Entrega las notificaciones pendientes del outbox por lotes. "
+        "Con --loop queda corriendo como worker local."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch', type=int, default=outbox.BATCH_SIZE)
+        parser.add_argument('--max-attempts', type=int, default=outbox.MAX_ATTEMPTS)
+        parser.add_argument('--loop', action='store_true', help="No terminar al vaciar el outbox.")
+        parser.add_argument('--sleep', type=float, default=1.0,
+                            help="Segundos de espera cuando no hay pendientes (con --loop).")
+        parser.add_argument('--purge-days', type=int, default=None,
+                            help="Elimina eventos ya procesados con más de N días.")
+
+    def handle(self, *args, **options):
+        total = 0
+        try:
+            while True:
+                procesados = outbox.process_batch(options['batch'], options['max_attempts'])
+                total += procesados
+                if procesados:
+                    self.stdout.write(f"{procesados} notificaciones entregadas.")
+                    continue
+                if not options['loop']:
+                    break
+                time.sleep(options['sleep'])
+        except KeyboardInterrupt:
+            pass
+
+        if options['purge_days'] is not None:
+            borrados = outbox.purge_processed(timedelta(days=options['purge_days']))
+            self.stdout.write(f"{borrados} eventos procesados eliminados.")
+
+        self.stdout.write(self.style.SUCCESS(f"Total entregado: {total}."))
@@ -0,0 +1,36 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from compradoresApp import trending
+
+
+class Command(BaseCommand):
+    help = (
+        "Aplica a los puntajes de tendencia los pedidos, favoritos y reseñas nuevos, "
+        "por lotes. Con --loop queda corriendo como worker local."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch', type=int, default=trending.BATCH_SIZE,
+                            help="Eventos por fuente en cada lote.")
+        parser.add_argument('--loop', action='store_true', help="No terminar al quedar al día.")
+        parser.add_argument('--sleep', type=float, default=5.0,
+                            help="Segundos de espera cuando no hay eventos nuevos (con --loop).")
+
+    def handle(self, *args, **options):
+        total = 0
+        try:
+            while True:
+                procesados = trending.process_batch(options['batch'])
+                total += procesados
+                if procesados:
+                    self.stdout.write(f"{procesados} eventos aplicados.")
+                    continue
+                if not options['loop']:
+                    break
+                time.sleep(options['sleep'])
+        except KeyboardInterrupt:
+            pass
+
+        self.stdout.write(self.style.SUCCESS(f"Total aplicado: {total}."))
@@ -0,0 +1,23 @@
+from time import perf_counter
+
+from django.core.management.base import BaseCommand
+
+from compradoresApp import trending
+
+
+class Command(BaseCommand):
+    help = (
+        "Recalcula desde cero los puntajes de tendencia a partir de pedidos, favoritos "
+        "y reseñas recientes, y rehace el top en caché. El worker sigue desde ahí."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--ventana', type=int, default=12,
+                            help="Vidas medias hacia atrás que se leen (lo anterior aporta casi nada).")
+
+    def handle(self, *args, **options):
+        inicio = perf_counter()
+        productos = trending.rebuild(window_half_lives=options['ventana'])
+        self.stdout.write(self.style.SUCCESS(
+            f"Tendencias recalculadas: {productos} productos con puntaje en {perf_counter() - inicio:.1f} s."
+        ))
@@ -0,0 +1,39 @@
+# Generated by Django 5.0.14 on 2026-10-18 18:46
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('compradoresApp', '0003_indices_consultas'),
+        ('proyectoApp', '0009_producto_imagen_derivados'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='notification',
+            name='idempotency_key',
+            field=models.CharField(blank=True, max_length=64, null=True, unique=True),
+        ),
+        migrations.CreateModel(
+            name='NotificationOutbox',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('order', 'Pedido'), ('review', 'Reseña')], max_length=20)),
+                ('message', models.CharField(max_length=255)),
+                ('idempotency_key', models.CharField(max_length=64, unique=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('available_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('attempts', models.PositiveSmallIntegerField(default=0)),
+                ('last_error', models.TextField(blank=True)),
+                ('processed_at', models.DateTimeField(blank=True, null=True)),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='proyectoApp.producto')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['processed_at', 'available_at'], name='outbox_pending_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.0.14 on 2026-10-18 19:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('compradoresApp', '0005_related_product'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TrendingState',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('landmark', models.DateTimeField()),
+                ('last_order_id', models.BigIntegerField(default=0)),
+                ('last_favorite_id', models.BigIntegerField(default=0)),
+                ('last_review_id', models.BigIntegerField(default=0)),
+            ],
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.0.14 on 2026-10-18 19:12
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('compradoresApp', '0006_trending_state'),
+        ('proyectoApp', '0011_producto_tendencia'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='review',
+            index=models.Index(fields=['product', 'active', 'rating', 'created_at'], name='review_prod_rating_idx'),
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.0.14 on 2026-10-18 19:15
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('compradoresApp', '0007_review_rating_index'),
+        ('proyectoApp', '0012_indices_admin'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['status'], name='order_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='review',
+            index=models.Index(fields=['active'], name='review_active_idx'),
+        ),
+    ]
@@ -21,6 +21,13 @@ class Order(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     status = models.CharField(max_length=1, choices=STATUS_CHOICES, default='P')
 
+    class Meta:
+        indexes = [
+            # Filtro por estado del admin; InnoDB agrega el id al índice, así
+            # que también sirve el orden por -id del listado
+            models.Index(fields=['status'], name='order_status_idx'),
+        ]
+
     def __str__(self):
         return f"Pedido #{self.id} - {self.product.nombre}"
 
@@ -38,6 +45,15 @@ class Review(models.Model):
     artisan_response = models.TextField(blank=True)
     response_created_at = models.DateTimeField(null=True, blank=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['product', 'active', 'created_at'], name='review_prod_active_date_idx'),
+            # Órdenes por calificación y el histograma (ver compradoresApp/reviews.py)
+            models.Index(fields=['product', 'active', 'rating', 'created_at'], name='review_prod_rating_idx'),
+            # Reseñas desactivadas (filtro del admin)
+            models.Index(fields=['active'], name='review_active_idx'),
+        ]
+
     def respond(self, text):
         self.artisan_response = text
         self.response_created_at = timezone.now()
@@ -55,6 +71,9 @@ class Favorite(models.Model):
 
     class Meta:
         unique_together = ('user', 'product')
+        indexes = [
+            models.Index(fields=['user', 'created_at'], name='favorite_user_date_idx'),
+        ]
 
     def __str__(self):
         return f"{self.user.username} ♥ {self.product.nombre}"
@@ -67,5 +86,80 @@ class Notification(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     read = models.BooleanField(default=False)
 
+    # Clave del evento que la originó (ver NotificationOutbox); evita duplicados
+    idempotency_key = models.CharField(max_length=64, unique=True, null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', 'created_at'], name='notif_user_date_idx'),
+            models.Index(fields=['user', 'read'], name='notif_user_read_idx'),
+        ]
+
     def __str__(self):
         return f"Notif {self.user.username}: {self.message[:40]}"
+
+
+class NotificationOutbox(models.Model):
+    """
+    Evento pendiente de notificar, escrito en la misma transacción que el
+    pedido o la reseña. `manage.py procesar_notificaciones` lo convierte en
+    Notification por lotes (ver compradoresApp/outbox.py).
+    """
+    KIND_CHOICES = (
+        ('order', 'Pedido'),
+        ('review', 'Reseña'),
+    )
+
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    product = models.ForeignKey(Producto, related_name='+', on_delete=models.CASCADE)
+    message = models.CharField(max_length=255)
+    idempotency_key = models.CharField(max_length=64, unique=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    available_at = models.DateTimeField(default=timezone.now)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    last_error = models.TextField(blank=True)
+    processed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['processed_at', 'available_at'], name='outbox_pending_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.idempotency_key} ({'procesado' if self.processed_at else 'pendiente'})"
+
+
+class RelatedProduct(models.Model):
+    """
+    Vecinos más parecidos de cada producto, calculados fuera de línea por
+    `manage.py calcular_relacionados` (ver compradoresApp/recommendations.py).
+    """
+    # Sin índice propio: lo cubre la restricción única (product, rank)
+    product = models.ForeignKey(Producto, related_name='+', on_delete=models.CASCADE, db_index=False)
+    related = models.ForeignKey(Producto, related_name='related_to', on_delete=models.CASCADE)
+    rank = models.PositiveSmallIntegerField()
+    score = models.FloatField()
+
+    class Meta:
+        constraints = [
+            # Es el índice de la lectura en product_detail
+            models.UniqueConstraint(fields=['product', 'rank'], name='related_product_rank_uniq'),
+        ]
+
+    def __str__(self):
+        return f"{self.product_id} -> {self.related_id} (#{self.rank})"
+
+
+class TrendingState(models.Model):
+    """
+    Fila única con el avance del cálculo de tendencias (compradoresApp/trending.py):
+    el último id procesado de cada fuente y la fecha de referencia de los puntajes.
+    """
+    landmark = models.DateTimeField()
+    last_order_id = models.BigIntegerField(default=0)
+    last_favorite_id = models.BigIntegerField(default=0)
+    last_review_id = models.BigIntegerField(default=0)
+
+    def __str__(self):
+        return f"Tendencias desde {self.landmark:%Y-%m-%d %H:%M}"
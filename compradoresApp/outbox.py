@@ -0,0 +1,95 @@
+# compradoresApp/outbox.py
+"""
+Outbox transaccional de notificaciones.
+
+Las vistas sólo insertan una fila en NotificationOutbox dentro de su propia
+transacción (`enqueue`). El worker (`manage.py procesar_notificaciones`)
+toma lotes pendientes con SELECT ... FOR UPDATE SKIP LOCKED, resuelve los
+destinatarios con una sola consulta y crea las Notification con bulk_create.
+La clave de idempotencia es única en ambas tablas, así que reprocesar un
+lote nunca duplica notificaciones.
+"""
+from collections import Counter
+from datetime import timedelta
+
+from django.db import DatabaseError, transaction
+from django.utils import timezone
+
+from proyectoApp.models import Producto
+
+from . import badges
+from .models import Notification, NotificationOutbox
+
+BATCH_SIZE = 500
+MAX_ATTEMPTS = 5
+
+
+def enqueue(kind, product, message, idempotency_key):
+    return NotificationOutbox.objects.create(
+        kind=kind,
+        product=product,
+        message=message[:255],
+        idempotency_key=idempotency_key,
+    )
+
+
+def _backoff(attempts):
+    return timedelta(seconds=min(2 ** attempts, 300))
+
+
+def process_batch(batch_size=BATCH_SIZE, max_attempts=MAX_ATTEMPTS):
+    """Procesa un lote. Devuelve cuántos eventos quedaron entregados."""
+    now = timezone.now()
+    with transaction.atomic():
+        rows = list(
+            NotificationOutbox.objects.select_for_update(skip_locked=True)
+            .filter(processed_at__isnull=True, available_at__lte=now, attempts__lt=max_attempts)
+            .order_by('available_at', 'id')[:batch_size]
+        )
+        if not rows:
+            return 0
+
+        try:
+            with transaction.atomic():
+                recipients = dict(
+                    Producto.objects.filter(pk__in={r.product_id for r in rows})
+                    .values_list('pk', 'tienda__artesano__user_id')
+                )
+                notifications = [
+                    Notification(
+                        user_id=recipients[r.product_id],
+                        message=r.message,
+                        idempotency_key=r.idempotency_key,
+                    )
+                    for r in rows if recipients.get(r.product_id)
+                ]
+                # Claves ya entregadas (reintentos): no deben sumar al badge
+                delivered = set(
+                    Notification.objects.filter(
+                        idempotency_key__in=[n.idempotency_key for n in notifications]
+                    ).values_list('idempotency_key', flat=True)
+                )
+                Notification.objects.bulk_create(
+                    notifications, batch_size=batch_size, ignore_conflicts=True,
+                )
+        except DatabaseError as exc:
+            for r in rows:
+                r.attempts += 1
+                r.available_at = now + _backoff(r.attempts)
+                r.last_error = str(exc)[:1000]
+            NotificationOutbox.objects.bulk_update(rows, ['attempts', 'available_at', 'last_error'])
+            return 0
+
+        NotificationOutbox.objects.filter(pk__in=[r.pk for r in rows]).update(processed_at=now)
+
+    # bulk_create no emite señales: los badges se incrementan aquí, por usuario
+    new_per_user = Counter(n.user_id for n in notifications if n.idempotency_key not in delivered)
+    for user_id, count in new_per_user.items():
+        badges.notification_created(user_id, count)
+    return len(rows)
+
+
+def purge_processed(older_than):
+    return NotificationOutbox.objects.filter(
+        processed_at__isnull=False, processed_at__lt=timezone.now() - older_than
+    ).delete()[0]
@@ -0,0 +1,94 @@
+# compradoresApp/page_cache.py
+"""
+Caché de página completa para visitantes anónimos, con GET condicional.
+
+Sólo se cachean respuestas 200 a GET/HEAD anónimos sin mensajes pendientes
+ni cookies. La clave incluye la URL, el query string normalizado y una versión
+que cambian las señales (ver compradoresApp/signals.py), así que una entrada
+vieja simplemente deja de usarse. Cada entrada guarda su ETag y Last-Modified:
+un 304 no toca la base de datos.
+
+Last-Modified es el momento en que se generó la página, no una fecha leída de
+las tablas: ediciones, update() del admin o moderación no dejan rastro en
+ninguna columna de fecha, y una fecha atrasada daría 304 con contenido viejo.
+"""
+import hashlib
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.contrib import messages
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date, quote_etag
+
+CATALOG_VERSION_KEY = 'catalogo-version'
+VERSION_TIMEOUT = 60 * 60 * 24 * 30
+
+
+def page_timeout():
+    return getattr(settings, 'ANONYMOUS_PAGE_CACHE_TIMEOUT', 300)
+
+
+def bump_catalog_version():
+    cache.set(CATALOG_VERSION_KEY, time.time_ns(), VERSION_TIMEOUT)
+
+
+def get_version(key):
+    version = cache.get(key)
+    if version is None:
+        # Si el caché perdió la versión, se crea una nueva (nunca repetida)
+        version = time.time_ns()
+        cache.add(key, version, VERSION_TIMEOUT)
+        version = cache.get(key, version)
+    return version
+
+
+def _page_key(request, version):
+    query = '&'.join(sorted(request.GET.urlencode().split('&')))
+    raw = f'{request.path}?{query}:{version}'
+    return 'pagina-anonima:' + hashlib.md5(raw.encode()).hexdigest()
+
+
+def anonymous_page_cache(version_func):
+    """version_func(request, *args, **kwargs) -> versión actual del contenido."""
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if (request.method not in ('GET', 'HEAD')
+                    or request.user.is_authenticated
+                    or len(messages.get_messages(request))):
+                return view(request, *args, **kwargs)
+
+            key = _page_key(request, version_func(request, *args, **kwargs))
+            entry = cache.get(key)
+
+            if entry is None:
+                response = view(request, *args, **kwargs)
+                if (response.status_code != 200 or response.streaming
+                        or response.cookies or len(messages.get_messages(request))):
+                    return response
+                entry = {
+                    'content': response.content,
+                    'content_type': response['Content-Type'],
+                    'etag': quote_etag(hashlib.md5(response.content).hexdigest()),
+                    'last_modified': int(time.time()),
+                }
+                cache.set(key, entry, page_timeout())
+
+            response = HttpResponse(entry['content'], content_type=entry['content_type'])
+            response['ETag'] = entry['etag']
+            response['Last-Modified'] = http_date(entry['last_modified'])
+            # El navegador puede guardarla, pero debe revalidar (barato: 304)
+            response['Cache-Control'] = 'public, max-age=0, must-revalidate'
+            patch_vary_headers(response, ('Cookie',))
+
+            return get_conditional_response(
+                request,
+                etag=entry['etag'],
+                last_modified=entry['last_modified'],
+                response=response,
+            )
+        return wrapper
+    return decorator
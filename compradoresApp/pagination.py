@@ -0,0 +1,199 @@
+# compradoresApp/pagination.py
+"""
+Paginación para listados grandes.
+
+- Por cursor (keyset): en lugar de COUNT(*) + OFFSET creciente, cada página
+  filtra por la clave de orden del último elemento visto, por lo que
+  cualquier página cuesta lo mismo sin importar su profundidad. Los cursores
+  son tokens firmados y opacos.
+- Con conteo estimado (listados del admin): la tabla completa, sin filtros,
+  toma el número de filas que el motor guarda en sus estadísticas en lugar
+  de recorrerla con COUNT(*).
+"""
+from django.core import signing
+from django.core.exceptions import ValidationError
+from django.core.paginator import EmptyPage, Paginator
+from django.db import connections
+from django.db.models import Q
+from django.utils.functional import cached_property
+
+CURSOR_SALT = 'compradoresApp.pagination.cursor'
+# Bajo este tamaño estimado se cuenta exacto: el COUNT(*) es barato y el total, preciso
+ESTIMATE_THRESHOLD = 100000
+
+
+class CursorPage:
+    def __init__(self, object_list, next_cursor=None, previous_cursor=None):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __bool__(self):
+        return bool(self.object_list)
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+class CursorPaginator:
+    """
+    Pagina ``queryset`` según ``ordering``, una tupla de campos al estilo
+    ``order_by`` que debe identificar cada fila de forma única (terminar en
+    ``id``), por ejemplo ``('-fecha_creacion', '-id')``.
+    """
+
+    def __init__(self, queryset, per_page, ordering=('-fecha_creacion', '-id')):
+        self.queryset = queryset
+        self.per_page = per_page
+        self.ordering = tuple(ordering)
+        self.fields = [o.lstrip('-') for o in self.ordering]
+        self.model_fields = [queryset.model._meta.get_field(f) for f in self.fields]
+
+    # ---- tokens ----
+    def encode_cursor(self, obj, backwards=False):
+        if isinstance(obj, dict):
+            # Filas de .values(): deben incluir los campos de orden
+            obj = self.queryset.model(**{f.attname: obj[n] for f, n in zip(self.model_fields, self.fields)})
+        values = [f.value_to_string(obj) for f in self.model_fields]
+        return signing.dumps({'v': values, 'b': backwards}, salt=CURSOR_SALT, compress=True)
+
+    def decode_cursor(self, token):
+        if not token:
+            return None, False
+        try:
+            data = signing.loads(token, salt=CURSOR_SALT)
+            values = [f.to_python(v) for f, v in zip(self.model_fields, data['v'])]
+        except (signing.BadSignature, KeyError, TypeError, ValueError, ValidationError):
+            # Cursor manipulado, de otra versión o de otro listado: se vuelve a la primera página
+            return None, False
+        if len(values) != len(self.fields):
+            return None, False
+        return values, bool(data.get('b'))
+
+    # ---- filtrado ----
+    def _seek(self, values, backwards):
+        # (a, b, c) > (x, y, z)  ==  a > x OR (a = x AND b > y) OR ...
+        condition = Q()
+        for i, order in enumerate(self.ordering):
+            descending = order.startswith('-')
+            lookup = 'gt' if descending == backwards else 'lt'
+            term = Q(**{f'{self.fields[i]}__{lookup}': values[i]})
+            for j in range(i):
+                term &= Q(**{self.fields[j]: values[j]})
+            condition |= term
+        return condition
+
+    def _reversed_ordering(self):
+        return [o[1:] if o.startswith('-') else f'-{o}' for o in self.ordering]
+
+    def page_queryset(self, values, backwards=False):
+        """Consulta de la página que sigue a `values` (o la primera), con el elemento extra."""
+        qs = self.queryset
+        if values is None:
+            qs = qs.order_by(*self.ordering)
+        elif backwards:
+            qs = qs.filter(self._seek(values, True)).order_by(*self._reversed_ordering())
+        else:
+            qs = qs.filter(self._seek(values, False)).order_by(*self.ordering)
+        # Se pide un elemento extra sólo para saber si hay más páginas
+        return qs[:self.per_page + 1]
+
+    def get_page(self, token=None):
+        values, backwards = self.decode_cursor(token)
+        items = list(self.page_queryset(values, backwards))
+        has_more = len(items) > self.per_page
+        items = items[:self.per_page]
+
+        if backwards:
+            items.reverse()
+            has_next, has_previous = True, has_more
+        else:
+            has_next, has_previous = has_more, values is not None
+
+        next_cursor = self.encode_cursor(items[-1]) if items and has_next else None
+        previous_cursor = self.encode_cursor(items[0], backwards=True) if items and has_previous else None
+        return CursorPage(items, next_cursor, previous_cursor)
+
+
+# --------------------------
+# CONTEO ESTIMADO
+# --------------------------
+def estimated_count(model, using='default'):
+    """Filas aproximadas de la tabla según las estadísticas del motor, o None si no hay."""
+    connection = connections[using]
+    table = model._meta.db_table
+    with connection.cursor() as cursor:
+        if connection.vendor == 'mysql':
+            # InnoDB: estimación del optimizador, se actualiza con ANALYZE TABLE
+            cursor.execute(
+                "SELECT table_rows FROM information_schema.tables "
+                "WHERE table_schema = DATABASE() AND table_name = %s", [table],
+            )
+        elif connection.vendor == 'sqlite':
+            # sqlite_stat1 existe sólo tras un ANALYZE; el primer número es el total de filas
+            cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'sqlite_stat1'")
+            if cursor.fetchone() is None:
+                return None
+            cursor.execute("SELECT stat FROM sqlite_stat1 WHERE tbl = %s LIMIT 1", [table])
+        else:
+            return None
+        row = cursor.fetchone()
+    if row is None or row[0] is None:
+        return None
+    return int(str(row[0]).split()[0])
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator para el admin: sin filtros ni búsqueda usa ``estimated_count``
+    si la tabla supera ``ESTIMATE_THRESHOLD``; con filtros cuenta exacto (los
+    ``list_filter`` van sobre columnas indexadas). Como el total es aproximado,
+    las páginas después de la última estimada no son un error: vienen vacías.
+    """
+    estimated = False
+
+    @cached_property
+    def count(self):
+        query = getattr(self.object_list, 'query', None)
+        if query is not None and not query.where and not query.distinct:
+            estimate = estimated_count(self.object_list.model, self.object_list.db)
+            if estimate is not None and estimate >= ESTIMATE_THRESHOLD:
+                self.estimated = True
+                return estimate
+        return super().count
+
+    def validate_number(self, number):
+        try:
+            return super().validate_number(number)
+        except EmptyPage:
+            if self.estimated and int(number) >= 1:
+                return int(number)
+            raise
+
+    def page(self, number):
+        number = self.validate_number(number)
+        if not self.estimated:
+            return super().page(number)
+        # Sin recortar al total estimado: la última página real puede quedar después
+        bottom = (number - 1) * self.per_page
+        return self._get_page(self.object_list[bottom:bottom + self.per_page], number, self)
+
+
+def query_without(request, *keys):
+    """Query string actual sin las claves de paginación, para armar enlaces."""
+    params = request.GET.copy()
+    for key in keys:
+        params.pop(key, None)
+    return params.urlencode()
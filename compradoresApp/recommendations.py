@@ -0,0 +1,197 @@
+# compradoresApp/recommendations.py
+"""
+Productos relacionados ("también te puede interesar"), calculados fuera de línea.
+
+`manage.py calcular_relacionados` arma dos matrices dispersas usuario × producto,
+una con favoritos y otra con compras (Order y Venta), y calcula la similitud
+coseno entre productos (Xᵀ·X con columnas normalizadas) por bloques de
+columnas. Los pares que comparten tienda o categoría reciben un pequeño
+refuerzo. Los productos con pocos vecinos se completan con los más populares
+de su tienda y luego de su categoría.
+
+El resultado son los TOP_K vecinos de cada producto en RelatedProduct; el
+detalle los lee con una sola consulta por el índice (product, rank). Las
+páginas cacheadas toman los vecinos nuevos al expirar (ANONYMOUS_PAGE_CACHE_TIMEOUT).
+
+Requiere numpy y scipy, sólo para el cálculo.
+"""
+from time import perf_counter
+
+from django.db import transaction
+
+from proyectoApp.models import Producto, Venta
+
+from .models import Favorite, Order, RelatedProduct
+
+try:
+    import numpy as np
+    from scipy import sparse
+except ImportError:  # numpy/scipy son opcionales: sólo los usa el cálculo
+    np = sparse = None
+
+TOP_K = 8
+WEIGHTS = {'favorites': 1.0, 'purchases': 2.0}
+SAME_SHOP_BOOST = 0.2
+SAME_CATEGORY_BOOST = 0.1
+# Usuarios con muchísimas interacciones dominarían Xᵀ·X (crece con n²)
+MAX_PER_USER = 300
+BLOCK_SIZE = 4000
+BATCH_SIZE = 5000
+
+
+class RecommendationError(Exception):
+    pass
+
+
+# --------------------------
+# LECTURA (product_detail)
+# --------------------------
+def related_products(product_id):
+    return list(
+        Producto.objects.filter(related_to__product_id=product_id)
+        .order_by('related_to__rank')
+        .only('id', 'nombre', 'precio', 'imagen', 'imagen_derivados')
+    )
+
+
+# --------------------------
+# CÁLCULO
+# --------------------------
+def _interactions(rows, ids):
+    """(usuario, producto) -> matriz binaria usuario × producto, columnas normalizadas."""
+    pairs = np.fromiter(
+        (v for row in rows for v in row), dtype=np.int64,
+    ).reshape(-1, 2)
+    if not len(pairs):
+        return sparse.csr_matrix((1, len(ids)), dtype=np.float32)
+
+    # Productos borrados entre la lectura de ids y la de interacciones se descartan
+    cols = np.searchsorted(ids, pairs[:, 1])
+    cols[cols == len(ids)] = 0
+    valid = ids[cols] == pairs[:, 1]
+    users, cols = pairs[valid, 0], cols[valid]
+
+    # Pares únicos, y a lo más MAX_PER_USER por usuario (elegidos al azar,
+    # con semilla fija para que dos corridas iguales den lo mismo)
+    key = np.unique(users * len(ids) + cols)
+    users, cols = key // len(ids), key % len(ids)
+    order = np.lexsort((np.random.default_rng(0).random(len(users)), users))
+    users, cols = users[order], cols[order]
+    starts = np.r_[0, np.flatnonzero(np.diff(users)) + 1]
+    position = np.arange(len(users)) - np.repeat(starts, np.diff(np.r_[starts, len(users)]))
+    keep = position < MAX_PER_USER
+    users, cols = users[keep], cols[keep]
+
+    _, rows_idx = np.unique(users, return_inverse=True)
+    matrix = sparse.csr_matrix(
+        (np.ones(len(cols), dtype=np.float32), (rows_idx, cols)),
+        shape=(rows_idx.max() + 1, len(ids)),
+    )
+    norms = np.sqrt(np.asarray(matrix.sum(axis=0)).ravel())
+    norms[norms == 0] = 1
+    return (matrix @ sparse.diags(1 / norms)).tocsc()
+
+
+def _top_k(block, offset, shops, categories, k):
+    """Vecinos de las filas del bloque: [(fila, [(columna, puntaje), ...]), ...]."""
+    block = block.tocoo()
+    rows = block.row + offset
+    data = block.data.astype(np.float32)
+    data *= 1 + SAME_SHOP_BOOST * (shops[rows] == shops[block.col]) \
+        + SAME_CATEGORY_BOOST * (categories[rows] == categories[block.col])
+    data[rows == block.col] = 0
+
+    block = sparse.csr_matrix((data, (block.row, block.col)), shape=block.shape)
+    block.eliminate_zeros()
+    result = []
+    for i in range(block.shape[0]):
+        start, end = block.indptr[i], block.indptr[i + 1]
+        if start == end:
+            continue
+        cols, scores = block.indices[start:end], block.data[start:end]
+        if end - start > k:
+            best = np.argpartition(-scores, k)[:k]
+            cols, scores = cols[best], scores[best]
+        order = np.argsort(-scores, kind='stable')
+        result.append((i + offset, list(zip(cols[order].tolist(), scores[order].tolist()))))
+    return result
+
+
+def _popular_by(groups, popularity, k):
+    """Para cada grupo, sus k+1 productos más populares (índices)."""
+    order = np.lexsort((-popularity, groups))
+    best = {}
+    for idx in order.tolist():
+        lst = best.setdefault(groups[idx], [])
+        if len(lst) <= k:
+            lst.append(idx)
+    return best
+
+
+def compute(k=TOP_K, block_size=BLOCK_SIZE):
+    """Devuelve (ids de producto, {índice: [(índice vecino, puntaje), ...]}) y estadísticas."""
+    if np is None:
+        raise RecommendationError("El cálculo de relacionados requiere numpy y scipy.")
+
+    inicio = perf_counter()
+    productos = list(Producto.objects.order_by('id').values_list('id', 'tienda_id', 'categoria', 'favoritos_total'))
+    if not productos:
+        return np.array([], dtype=np.int64), {}, {'interacciones': 0}
+    ids = np.array([p[0] for p in productos], dtype=np.int64)
+    shops = np.array([p[1] for p in productos], dtype=np.int64)
+    _, categories = np.unique([p[2].strip().lower() for p in productos], return_inverse=True)
+    popularity = np.array([p[3] for p in productos], dtype=np.int64)
+
+    favorites = list(Favorite.objects.values_list('user_id', 'product_id').iterator(chunk_size=BATCH_SIZE))
+    purchases = list(Order.objects.values_list('buyer_id', 'product_id').iterator(chunk_size=BATCH_SIZE))
+    purchases += Venta.objects.values_list('comprador_id', 'producto_id').iterator(chunk_size=BATCH_SIZE)
+    stats = {'interacciones': len(favorites) + len(purchases), 'lectura_s': perf_counter() - inicio}
+
+    fav = _interactions(favorites, ids)
+    buy = _interactions(purchases, ids)
+    del favorites, purchases
+
+    # Bloques de columnas: la matriz producto × producto completa no se arma nunca
+    neighbors = {}
+    for offset in range(0, len(ids), block_size):
+        cols = slice(offset, offset + block_size)
+        block = (WEIGHTS['favorites'] * (fav[:, cols].T @ fav)
+                 + WEIGHTS['purchases'] * (buy[:, cols].T @ buy))
+        neighbors.update(_top_k(block, offset, shops, categories, k))
+    stats['similitud_s'] = perf_counter() - inicio - stats['lectura_s']
+
+    # Relleno: populares de la misma tienda y luego de la misma categoría
+    by_shop = _popular_by(shops, popularity, k)
+    by_category = _popular_by(categories, popularity, k)
+    for i in range(len(ids)):
+        current = neighbors.get(i, [])
+        if len(current) >= k:
+            continue
+        seen = {i} | {c for c, _ in current}
+        for candidate in by_shop[shops[i]] + by_category[categories[i]]:
+            if len(current) >= k:
+                break
+            if candidate not in seen:
+                seen.add(candidate)
+                current.append((candidate, 0.0))
+        if current:
+            neighbors[i] = current
+    return ids, neighbors, stats
+
+
+@transaction.atomic
+def store(ids, neighbors):
+    """Reemplaza la tabla completa en una transacción: el detalle ve la versión vieja o la nueva."""
+    RelatedProduct.objects.all().delete()
+    batch, total = [], 0
+    for i, related in neighbors.items():
+        for rank, (j, score) in enumerate(related):
+            batch.append(RelatedProduct(
+                product_id=int(ids[i]), related_id=int(ids[j]), rank=rank, score=round(score, 4),
+            ))
+        if len(batch) >= BATCH_SIZE:
+            RelatedProduct.objects.bulk_create(batch)
+            total += len(batch)
+            batch = []
+    RelatedProduct.objects.bulk_create(batch)
+    return total + len(batch)
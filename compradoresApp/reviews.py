@@ -0,0 +1,68 @@
+# compradoresApp/reviews.py
+"""
+Reseñas de un producto: órdenes disponibles y distribución de calificaciones.
+
+Los tres órdenes se sirven con índices de (product, active, ...): el de fecha
+(review_prod_active_date_idx) y el de calificación (review_prod_rating_idx),
+recorrido hacia adelante para "peores" y hacia atrás para "mejores". Por eso
+"peores" desempata por la reseña más antigua.
+
+El histograma (1 a 5 estrellas, total y promedio) es un solo aggregate sobre
+ese índice y se guarda en caché con la versión del producto, que las señales
+de Review cambian al crear, editar o borrar una reseña.
+"""
+from django.core.cache import cache
+from django.db.models import Avg, Count, Q
+
+from proyectoApp.fragmentos import clave_producto
+
+from .models import Review
+from .page_cache import get_version
+
+HISTOGRAM_TIMEOUT = 60 * 60 * 24
+RATINGS = (5, 4, 3, 2, 1)
+
+REVIEW_ORDERINGS = {
+    'newest': ('-created_at', '-id'),
+    'highest': ('-rating', '-created_at', '-id'),
+    'lowest': ('rating', 'created_at', 'id'),
+}
+REVIEW_SORT_LABELS = (
+    ('newest', 'Más recientes'),
+    ('highest', 'Mejor calificadas'),
+    ('lowest', 'Peor calificadas'),
+)
+
+
+def review_ordering(sort):
+    """Normaliza ?sort= y devuelve (sort, ordering)."""
+    if sort not in REVIEW_ORDERINGS:
+        sort = 'newest'
+    return sort, REVIEW_ORDERINGS[sort]
+
+
+def _compute_histogram(product_id):
+    data = Review.objects.filter(product_id=product_id, active=True).aggregate(
+        total=Count('id'),
+        average=Avg('rating'),
+        **{f'r{n}': Count('id', filter=Q(rating=n)) for n in RATINGS},
+    )
+    total = data['total']
+    return {
+        'total': total,
+        'average': data['average'] or 0,
+        'bars': [
+            {'rating': n, 'count': data[f'r{n}'],
+             'percent': round(100 * data[f'r{n}'] / total) if total else 0}
+            for n in RATINGS
+        ],
+    }
+
+
+def rating_histogram(product_id):
+    key = f'resenas-histograma:{product_id}:{get_version(clave_producto(product_id))}'
+    histogram = cache.get(key)
+    if histogram is None:
+        histogram = _compute_histogram(product_id)
+        cache.set(key, histogram, HISTOGRAM_TIMEOUT)
+    return histogram
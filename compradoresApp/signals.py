@@ -0,0 +1,110 @@
+# compradoresApp/signals.py
+from django.db.models.signals import post_save, post_delete, pre_save
+from django.dispatch import receiver
+
+from proyectoApp import contadores, fragmentos
+from proyectoApp.models import Producto, Tienda, Venta
+
+from . import badges, facets, page_cache
+from .models import Favorite, Notification, Review
+
+
+# --------------------------
+# CONTADORES DE RESEÑAS
+# --------------------------
+@receiver(pre_save, sender=Review)
+def recordar_review(sender, instance, raw=False, **kwargs):
+    instance._anterior = None
+    if instance.pk and not raw:
+        instance._anterior = (
+            Review.objects.filter(pk=instance.pk)
+            .values_list('product_id', 'active', 'rating').first()
+        )
+
+
+@receiver(post_save, sender=Review)
+def contar_review(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    anterior = getattr(instance, '_anterior', None)
+    nuevo = (instance.active, instance.rating)
+    if anterior and anterior[0] != instance.product_id:
+        contadores.aplicar_cambio_resena(Producto, anterior[0], anterior[1:], (False, 0))
+        anterior = None
+    contadores.aplicar_cambio_resena(Producto, instance.product_id, anterior[1:] if anterior else (False, 0), nuevo)
+
+
+@receiver(post_delete, sender=Review)
+def descontar_review(sender, instance, **kwargs):
+    contadores.aplicar_cambio_resena(
+        Producto, instance.product_id, (instance.active, instance.rating), (False, 0)
+    )
+
+
+# --------------------------
+# CONTADORES DE FAVORITOS
+# --------------------------
+@receiver(post_save, sender=Favorite)
+def contar_favorito(sender, instance, created=False, raw=False, **kwargs):
+    if created and not raw:
+        contadores.aplicar_favorito(Producto, instance.product_id, 1)
+
+
+@receiver(post_delete, sender=Favorite)
+def descontar_favorito(sender, instance, **kwargs):
+    contadores.aplicar_favorito(Producto, instance.product_id, -1)
+
+
+# --------------------------
+# CACHÉ DE PÁGINAS ANÓNIMAS Y FACETAS
+# --------------------------
+@receiver(post_save, sender=Producto)
+@receiver(post_delete, sender=Producto)
+@receiver(post_save, sender=Tienda)
+@receiver(post_delete, sender=Tienda)
+def invalidar_catalogo(sender, **kwargs):
+    page_cache.bump_catalog_version()
+    facets.bump_facets_version()
+
+
+@receiver(post_save, sender=Review)
+@receiver(post_delete, sender=Review)
+def invalidar_paginas_review(sender, instance, **kwargs):
+    page_cache.bump_catalog_version()
+    fragmentos.invalidar_producto(instance.product_id)
+
+
+# --------------------------
+# BADGES DE LA BARRA DE NAVEGACIÓN
+# --------------------------
+@receiver(post_save, sender=Notification)
+def contar_notificacion(sender, instance, created=False, raw=False, **kwargs):
+    if created and not raw and not instance.read:
+        badges.notification_created(instance.user_id)
+
+
+@receiver(post_delete, sender=Notification)
+def olvidar_notificaciones(sender, instance, **kwargs):
+    badges.forget_notifications(instance.user_id)
+
+
+def _artesano_de(producto_id):
+    return (
+        Producto.objects.filter(pk=producto_id)
+        .values_list('tienda__artesano__user_id', flat=True).first()
+    )
+
+
+@receiver(post_save, sender=Venta)
+def contar_venta(sender, instance, created=False, raw=False, **kwargs):
+    if created and not raw and not instance.notificado:
+        user_id = _artesano_de(instance.producto_id)
+        if user_id:
+            badges.sale_created(user_id)
+
+
+@receiver(post_delete, sender=Venta)
+def olvidar_ventas(sender, instance, **kwargs):
+    user_id = _artesano_de(instance.producto_id)
+    if user_id:
+        badges.forget_sales(user_id)
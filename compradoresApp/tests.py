@@ -1,3 +1,675 @@
-from django.test import TestCase
+import threading
+import time
+from datetime import timedelta
+from io import StringIO
+from unittest import mock, skipIf
 
-# Create your tests here.
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core import signing
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.core.paginator import EmptyPage
+from django.db import DatabaseError, connection
+from django.test import Client, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from proyectoApp import fragmentos
+from proyectoApp.models import Perfil, Producto, Tienda
+
+from . import badges, facets, outbox, page_cache, recommendations, trending
+from .reviews import rating_histogram
+from .models import Favorite, Notification, NotificationOutbox, Order, RelatedProduct, Review
+from .pagination import (
+    CURSOR_SALT, ESTIMATE_THRESHOLD, CursorPaginator, EstimatedCountPaginator, estimated_count,
+)
+
+
+# Las pruebas no corren collectstatic: sin manifiesto de archivos con hash
+sin_manifiesto = override_settings(STORAGES={
+    **settings.STORAGES,
+    'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'},
+})
+
+
+def crear_producto(stock):
+    user = User.objects.create_user('artesano', password='clave12345')
+    perfil = Perfil.objects.create(user=user, rol='artesano')
+    tienda = Tienda.objects.create(artesano=perfil, nombre='Taller', ubicacion='Valparaíso')
+    return Producto.objects.create(
+        tienda=tienda, nombre='Vasija', descripcion='Greda', precio=15000,
+        categoria='Cerámica', stock=stock,
+    )
+
+
+@sin_manifiesto
+class CursorPaginatorTests(TestCase):
+    def setUp(self):
+        tienda = crear_producto(stock=None).tienda
+        # Precios repetidos: el desempate por id debe evitar saltos y duplicados
+        for i in range(6):
+            Producto.objects.create(
+                tienda=tienda, nombre=f'Pieza {i}', descripcion='', precio=1000 * (i // 2),
+                categoria='Cerámica',
+            )
+        self.paginator = CursorPaginator(Producto.objects.all(), 3, ordering=('precio', 'id'))
+        self.esperado = list(Producto.objects.order_by('precio', 'id'))
+
+    def test_recorre_todo_sin_repetir_y_vuelve(self):
+        paginas, token = [], None
+        while True:
+            pagina = self.paginator.get_page(token)
+            paginas.append(pagina)
+            if not pagina.has_next():
+                break
+            token = pagina.next_cursor
+        self.assertEqual([p for pagina in paginas for p in pagina], self.esperado)
+        self.assertFalse(paginas[0].has_previous())
+
+        anterior = self.paginator.get_page(paginas[-1].previous_cursor)
+        self.assertEqual(list(anterior), list(paginas[-2]))
+        self.assertTrue(anterior.has_next())
+
+    def test_cursor_manipulado_vuelve_a_la_primera_pagina(self):
+        token = self.paginator.get_page().next_cursor
+        for malo in (token[:-2] + 'xx', 'basura', signing.dumps({'v': ['1']}, salt='otra-sal')):
+            self.assertEqual(list(self.paginator.get_page(malo)), self.esperado[:3])
+
+    def test_cursor_de_otro_listado_vuelve_a_la_primera_pagina(self):
+        # Firmado con la misma sal pero con otra clave de orden (fecha, no precio)
+        ajeno = CursorPaginator(Producto.objects.all(), 3).get_page().next_cursor
+        self.assertEqual(list(self.paginator.get_page(ajeno)), self.esperado[:3])
+        corto = signing.dumps({'v': ['1000']}, salt=CURSOR_SALT, compress=True)
+        self.assertEqual(list(self.paginator.get_page(corto)), self.esperado[:3])
+
+        response = self.client.get(reverse('compradores:catalog'), {'cursor': 'basura'})
+        self.assertEqual(response.status_code, 200)
+
+
+@sin_manifiesto
+class AnonymousPageCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.producto = crear_producto(stock=None)
+        self.url = reverse('compradores:product_detail', args=[self.producto.pk])
+
+    def test_revalidacion_sin_consultas(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        with self.assertNumQueries(0):
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 304)
+
+    def test_cambios_del_producto_invalidan(self):
+        etag = self.client.get(self.url)['ETag']
+        self.producto.nombre = 'Vasija grande'
+        self.producto.save()
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'Vasija grande')
+
+        etag = response['ETag']
+        Review.objects.create(product=self.producto, author=User.objects.create_user('autor'), rating=4)
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_last_modified_avanza_con_cambios_sin_fecha(self):
+        with mock.patch('compradoresApp.page_cache.time.time', return_value=1_700_000_000):
+            anterior = self.client.get(self.url)['Last-Modified']
+        # Como un update() del admin: ninguna columna de fecha cambia
+        Producto.objects.filter(pk=self.producto.pk).update(nombre='Vasija grande')
+        fragmentos.invalidar_producto(self.producto.pk)
+
+        with mock.patch('compradoresApp.page_cache.time.time', return_value=1_700_000_060):
+            response = self.client.get(self.url, HTTP_IF_MODIFIED_SINCE=anterior)
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'Vasija grande')
+
+    def test_solo_visitantes_anonimos(self):
+        self.client.force_login(User.objects.create_user('rosa_quispe'))
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('ETag', response)
+        self.assertContains(response, 'rosa_quispe')
+        self.client.logout()
+
+        self.client.get(self.url)
+        with self.assertNumQueries(0):
+            response = self.client.get(self.url)
+        self.assertNotContains(response, 'rosa_quispe')
+
+
+@sin_manifiesto
+class CatalogQueryCountTests(TestCase):
+    """Las consultas del catálogo no crecen con las tarjetas de la página ni con los favoritos."""
+
+    def setUp(self):
+        self.tienda = crear_producto(stock=None).tienda
+
+    def agregar_productos(self, n):
+        Producto.objects.bulk_create([
+            Producto(tienda=self.tienda, nombre=f'Pieza {i}', descripcion='', precio=1000, categoria='Textil')
+            for i in range(n)
+        ])
+
+    def consultas(self):
+        # Caché vacío: ni la página, ni las facetas, ni las versiones de tarjeta vienen de antes
+        cache.clear()
+        with CaptureQueriesContext(connection) as consultas:
+            response = self.client.get(reverse('compradores:catalog'))
+        self.assertEqual(response.status_code, 200)
+        return len(consultas), response
+
+    def test_anonimo(self):
+        una, _ = self.consultas()
+        self.agregar_productos(11)
+        pagina_llena, response = self.consultas()
+
+        self.assertEqual(len(response.context['products']), 12)
+        self.assertEqual(pagina_llena, una)
+
+    def test_con_sesion_y_favoritos(self):
+        user = User.objects.create_user('rosa_quispe')
+        self.client.force_login(user)
+        Favorite.objects.create(user=user, product=Producto.objects.get())
+        una, _ = self.consultas()
+
+        self.agregar_productos(11)
+        piezas = Producto.objects.filter(nombre__startswith='Pieza')[:6]
+        Favorite.objects.bulk_create([Favorite(user=user, product=p) for p in piezas])
+        pagina_llena, response = self.consultas()
+
+        self.assertEqual(len(response.context['products']), 12)
+        self.assertEqual(sum(p.is_favorite for p in response.context['products']), 7)
+        self.assertEqual(pagina_llena, una)
+
+
+@sin_manifiesto
+class ProductDetailQueryTests(TestCase):
+    def test_tienda_en_la_misma_consulta(self):
+        producto = crear_producto(stock=None)
+        self.client.force_login(User.objects.create_user('rosa_quispe'))
+        cache.clear()
+        with CaptureQueriesContext(connection) as consultas:
+            response = self.client.get(reverse('compradores:product_detail', args=[producto.pk]))
+
+        self.assertContains(response, 'Valparaíso')
+        # Sin el select_related, p.tienda se cargaría aparte por su id
+        qn = connection.ops.quote_name
+        filtro = f'WHERE {qn(Tienda._meta.db_table)}.{qn("id")} ='
+        por_id = [q['sql'] for q in consultas if filtro in q['sql']]
+        self.assertEqual(por_id, [])
+
+
+class ApiTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.producto = crear_producto(stock=4)
+        self.otro = Producto.objects.create(
+            tienda=self.producto.tienda, nombre='Manta', descripcion='', precio=30000, categoria='Textil',
+        )
+        self.url = reverse('compradores:api_products')
+
+    def test_proyeccion_de_campos(self):
+        datos = self.client.get(self.url, {'fields': 'id, precio'}).json()
+        self.assertEqual(datos['results'], [
+            {'id': self.otro.pk, 'precio': 30000}, {'id': self.producto.pk, 'precio': 15000},
+        ])
+
+        response = self.client.get(self.url, {'fields': 'id,comprador'})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('comprador', response.json()['error'])
+
+    def test_filtros_y_cursor(self):
+        datos = self.client.get(self.url, {'category': 'Textil', 'fields': 'nombre'}).json()
+        self.assertEqual(datos['results'], [{'nombre': 'Manta'}])
+
+        primera = self.client.get(self.url, {'limit': 1, 'fields': 'id'}).json()
+        segunda = self.client.get(self.url, {'limit': 1, 'fields': 'id', 'cursor': primera['next']}).json()
+        self.assertEqual([primera['results'], segunda['results']],
+                         [[{'id': self.otro.pk}], [{'id': self.producto.pk}]])
+        self.assertIsNone(segunda['next'])
+
+    def test_etag_versionado(self):
+        url = reverse('compradores:api_product', args=[self.producto.pk])
+        response = self.client.get(url, {'fields': 'nombre,stock,tienda'})
+        self.assertEqual(response.json(), {'nombre': 'Vasija', 'stock': 4, 'tienda': 'Taller'})
+        etag = response['ETag']
+
+        with self.assertNumQueries(0):
+            response = self.client.get(url, {'fields': 'nombre,stock,tienda'}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+        self.producto.nombre = 'Vasija grande'
+        self.producto.save()
+        response = self.client.get(url, {'fields': 'nombre,stock,tienda'}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['nombre'], 'Vasija grande')
+
+    def test_tienda_y_errores(self):
+        datos = self.client.get(reverse('compradores:api_shop', args=[self.producto.tienda_id]),
+                                {'fields': 'nombre,productos_total'}).json()
+        self.assertEqual(datos, {'nombre': 'Taller', 'productos_total': 2})
+
+        self.assertEqual(self.client.get(reverse('compradores:api_product', args=[999999])).status_code, 404)
+        self.assertEqual(self.client.post(self.url).status_code, 405)
+
+
+class FacetTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        tienda = crear_producto(stock=None).tienda
+        otra = Tienda.objects.create(artesano=tienda.artesano, nombre='Sucursal', ubicacion='Chiloé')
+        for t, nombre, precio, categoria in ((tienda, 'Manta', 30000, 'Textil'),
+                                              (otra, 'Poncho', 60000, 'Textil'),
+                                              (otra, 'Cuenco', 4000, 'Cerámica')):
+            Producto.objects.create(tienda=t, nombre=nombre, descripcion='', precio=precio, categoria=categoria)
+
+    def test_cada_faceta_ignora_su_propio_filtro(self):
+        conteos = facets.facet_counts(facets.normalize_filters({'category': 'Textil'}))
+
+        self.assertEqual(conteos['category'], [('Cerámica', 2), ('Textil', 2)])
+        self.assertEqual(conteos['location'], [('Chiloé', 1), ('Valparaíso', 1)])
+        # (25000, 50000] y (50000, 100000]
+        self.assertEqual(conteos['price'], [(3, 1), (4, 1)])
+
+    def test_normaliza_los_filtros(self):
+        self.assertEqual(
+            facets.normalize_filters({'q': ' Manta ', 'min_price': '5000.00', 'location': 'Chiloé', 'page': '3'}),
+            {'q': 'manta', 'min_price': '5000', 'location': 'Chiloé'},
+        )
+        self.assertEqual(facets.normalize_filters({'min_price': 'barato'}), {})
+
+    def test_en_cache_hasta_que_cambia_un_producto(self):
+        facets.facet_counts({})
+        with self.assertNumQueries(0):
+            facets.facet_counts({})
+
+        Producto.objects.filter(nombre='Cuenco').get().delete()
+        self.assertEqual(facets.facet_counts({})['category'], [('Textil', 2), ('Cerámica', 1)])
+
+    @sin_manifiesto
+    def test_el_formulario_ofrece_los_valores_existentes(self):
+        response = self.client.get(reverse('compradores:catalog'), {'category': 'Textil'})
+
+        self.assertEqual(response.context['filter_choices'], {
+            'category': [('Cerámica', False), ('Textil', True)],
+            'location': [('Chiloé', False), ('Valparaíso', False)],
+        })
+        self.assertContains(response, '<option value="Textil" selected>Textil</option>', html=True)
+        self.assertNotContains(response, 'name="category" value=')
+        self.assertEqual({p.nombre for p in response.context['products']}, {'Manta', 'Poncho'})
+
+    def test_valor_actual_fuera_de_los_mas_frecuentes(self):
+        conteos = {'category': [('Textil', 2)], 'location': []}
+        self.assertEqual(facets.filter_choices(conteos, {'category': 'Orfebrería'}), {
+            'category': [('Orfebrería', True), ('Textil', False)],
+            'location': [],
+        })
+
+    @override_settings(CACHE_SHARED=False)
+    def test_precalcular_exige_cache_compartido(self):
+        with self.assertRaisesMessage(CommandError, 'compartido'):
+            call_command('precalcular_facetas')
+
+
+@sin_manifiesto
+@skipIf(recommendations.np is None, "calcular_relacionados requiere numpy y scipy")
+class RelatedProductsTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.vasija = crear_producto(stock=None)
+        tienda = self.vasija.tienda
+        otra = Tienda.objects.create(artesano=tienda.artesano, nombre='Sucursal', ubicacion='Chiloé')
+        self.plato, self.manta, self.telar = [
+            Producto.objects.create(tienda=t, nombre=nombre, descripcion='', precio=1000, categoria=categoria)
+            for t, nombre, categoria in ((tienda, 'Plato', 'Cerámica'), (tienda, 'Manta', 'Textil'),
+                                         (otra, 'Telar', 'Textil'))
+        ]
+        compradores = [User.objects.create_user(f'comprador{i}') for i in range(3)]
+        for user in compradores[:2]:
+            Favorite.objects.create(user=user, product=self.vasija)
+            Favorite.objects.create(user=user, product=self.telar)
+        for producto in (self.plato, self.manta):
+            Order.objects.create(buyer=compradores[2], product=producto)
+
+    def nombres(self, producto):
+        return [p.nombre for p in recommendations.related_products(producto.pk)]
+
+    def test_vecinos_y_relleno(self):
+        call_command('calcular_relacionados', top=2, stdout=StringIO())
+
+        # Co-favoritos, aunque sean de otra tienda; luego el más popular de la tienda
+        self.assertEqual(self.nombres(self.vasija), ['Telar', 'Plato'])
+        # Co-compra (con refuerzo por misma tienda) y relleno
+        self.assertEqual(self.nombres(self.plato), ['Manta', 'Vasija'])
+
+    def test_recalcular_reemplaza_la_tabla(self):
+        call_command('calcular_relacionados', top=2, stdout=StringIO())
+        total = RelatedProduct.objects.count()
+        call_command('calcular_relacionados', top=2, stdout=StringIO())
+        self.assertEqual(RelatedProduct.objects.count(), total)
+
+    def test_detalle_muestra_los_relacionados(self):
+        call_command('calcular_relacionados', top=2, stdout=StringIO())
+        response = self.client.get(reverse('compradores:product_detail', args=[self.vasija.pk]))
+        self.assertContains(response, reverse('compradores:product_detail', args=[self.telar.pk]))
+
+
+class TrendingTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.a = crear_producto(stock=None)
+        self.b, self.c = [
+            Producto.objects.create(tienda=self.a.tienda, nombre=nombre, descripcion='', precio=1000,
+                                    categoria='Textil')
+            for nombre in ('Manta', 'Poncho')
+        ]
+        self.usuarios = [User.objects.create_user(f'comprador{i}') for i in range(4)]
+
+    def evento(self, model, hace=timedelta(minutes=1), **campos):
+        # Más antiguo que COMMIT_LAG, para que el lote lo tome
+        obj = model.objects.create(**campos)
+        model.objects.filter(pk=obj.pk).update(created_at=timezone.now() - hace)
+        return obj
+
+    def test_orden_por_peso_del_evento(self):
+        self.evento(Order, buyer=self.usuarios[0], product=self.a, quantity=1)
+        self.evento(Favorite, user=self.usuarios[0], product=self.b)
+        self.evento(Review, author=self.usuarios[0], product=self.c, rating=5)
+
+        self.assertEqual(trending.process_batch(), 3)
+        self.assertEqual(trending.top_ids(), [self.a.pk, self.c.pk, self.b.pk])
+        # Ya procesados: un segundo lote no los vuelve a sumar
+        tendencia = Producto.objects.get(pk=self.a.pk).tendencia
+        self.assertEqual(trending.process_batch(), 0)
+        self.assertEqual(Producto.objects.get(pk=self.a.pk).tendencia, tendencia)
+
+    def test_eventos_nuevos_actualizan_el_top_en_cache(self):
+        self.evento(Order, buyer=self.usuarios[0], product=self.a, quantity=1)
+        trending.process_batch()
+        for user in self.usuarios:
+            self.evento(Favorite, user=user, product=self.b)
+        trending.process_batch()
+
+        self.assertEqual(trending.top_ids(), [self.b.pk, self.a.pk])
+        # Sin la lista en caché (expiró u otro proceso la escribió) se rehace desde la base
+        cache.clear()
+        self.assertEqual(trending.top_ids(), [self.b.pk, self.a.pk])
+
+    def test_los_eventos_antiguos_pesan_menos(self):
+        vida_media = trending.half_life()
+        for user in self.usuarios[:3]:
+            self.evento(Favorite, hace=vida_media * 2, user=user, product=self.a)
+        for user in self.usuarios[:2]:
+            self.evento(Favorite, user=user, product=self.b)
+
+        trending.process_batch()
+        self.assertEqual(trending.top_ids(), [self.b.pk, self.a.pk])
+        # El recálculo completo llega al mismo orden
+        trending.rebuild()
+        self.assertEqual(trending.top_ids(), [self.b.pk, self.a.pk])
+
+
+@sin_manifiesto
+class ReviewHistogramTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.producto = crear_producto(stock=None)
+        self.reviews = []
+        # Calificaciones en orden de creación; la última queda desactivada
+        for i, (rating, active) in enumerate(((4, True), (5, True), (1, True), (5, True), (2, False))):
+            review = Review.objects.create(
+                product=self.producto, author=User.objects.create_user(f'autor{i}'), rating=rating, active=active,
+            )
+            Review.objects.filter(pk=review.pk).update(created_at=timezone.now() - timedelta(days=10 - i))
+            self.reviews.append(review)
+
+    def test_histograma(self):
+        histograma = rating_histogram(self.producto.pk)
+
+        self.assertEqual((histograma['total'], histograma['average']), (4, 3.75))
+        self.assertEqual([(b['rating'], b['count'], b['percent']) for b in histograma['bars']],
+                         [(5, 2, 50), (4, 1, 25), (3, 0, 0), (2, 0, 0), (1, 1, 25)])
+        with self.assertNumQueries(0):
+            rating_histogram(self.producto.pk)
+
+    def test_cambios_en_resenas_invalidan_el_histograma(self):
+        rating_histogram(self.producto.pk)
+        self.reviews[0].rating = 3
+        self.reviews[0].save()
+        self.assertEqual(rating_histogram(self.producto.pk)['bars'][2]['count'], 1)
+
+        # Moderación masiva: un UPDATE sin señales
+        self.client.force_login(User.objects.create_superuser('admin', password='clave12345'))
+        self.client.post(reverse('admin:compradoresApp_review_changelist'), {
+            'action': 'deactivate_reviews', '_selected_action': [self.reviews[2].pk],
+        })
+        self.assertEqual(rating_histogram(self.producto.pk)['total'], 3)
+
+    def ordenadas(self, sort):
+        # Con sesión: la página no pasa por el caché anónimo y trae su contexto
+        response = self.client.get(reverse('compradores:product_detail', args=[self.producto.pk]), {'sort': sort})
+        return [r.pk for r in response.context['reviews']]
+
+    def test_ordenes_de_resenas(self):
+        self.client.force_login(User.objects.create_user('lector'))
+        r = [review.pk for review in self.reviews]
+
+        self.assertEqual(self.ordenadas('newest'), [r[3], r[2], r[1], r[0]])
+        # Empates: "mejores" muestra primero la más reciente, "peores" la más antigua
+        self.assertEqual(self.ordenadas('highest'), [r[3], r[1], r[0], r[2]])
+        self.assertEqual(self.ordenadas('lowest'), [r[2], r[0], r[1], r[3]])
+        self.assertEqual(self.ordenadas('cualquiera'), self.ordenadas('newest'))
+
+
+class ReviewModerationTests(TestCase):
+    """Las acciones masivas del admin no pasan por las señales de Review."""
+
+    def setUp(self):
+        self.producto = crear_producto(stock=None)
+        autores = [User.objects.create_user(f'autor{i}') for i in range(3)]
+        self.reviews = [
+            Review.objects.create(product=self.producto, author=autor, rating=rating)
+            for autor, rating in zip(autores, (5, 4, 1))
+        ]
+        self.client.force_login(User.objects.create_superuser('admin', password='clave12345'))
+        self.url = reverse('admin:compradoresApp_review_changelist')
+
+    def moderar(self, action, reviews):
+        return self.client.post(self.url, {
+            'action': action, '_selected_action': [r.pk for r in reviews],
+        })
+
+    def test_desactivar_y_activar_recalcula_contadores(self):
+        response = self.moderar('deactivate_reviews', self.reviews[1:])
+        self.assertEqual(response.status_code, 302)
+        self.producto.refresh_from_db()
+        self.assertEqual((self.producto.resenas_total, self.producto.resenas_suma), (1, 5))
+        self.assertEqual(self.producto.calificacion_promedio, 5)
+
+        self.moderar('activate_reviews', self.reviews)
+        self.producto.refresh_from_db()
+        self.assertEqual((self.producto.resenas_total, self.producto.resenas_suma), (3, 10))
+        self.assertAlmostEqual(self.producto.calificacion_promedio, 10 / 3)
+
+    def test_invalida_tarjetas_y_catalogo(self):
+        clave = fragmentos.clave_producto(self.producto.pk)
+        fragmentos.invalidar_producto(self.producto.pk)
+        version_producto = cache.get(clave)
+        version_catalogo = page_cache.get_version(page_cache.CATALOG_VERSION_KEY)
+
+        self.moderar('deactivate_reviews', self.reviews[:1])
+
+        self.assertNotEqual(cache.get(clave), version_producto)
+        self.assertNotEqual(page_cache.get_version(page_cache.CATALOG_VERSION_KEY), version_catalogo)
+
+
+class EstimatedCountPaginatorTests(TestCase):
+    def setUp(self):
+        producto = crear_producto(stock=None)
+        Review.objects.bulk_create([
+            Review(product=producto, author=User.objects.create_user(f'autor{i}'), rating=4) for i in range(5)
+        ])
+
+    def paginator(self, queryset=None):
+        return EstimatedCountPaginator(queryset or Review.objects.order_by('-id'), 2)
+
+    def test_tabla_chica_cuenta_exacto(self):
+        # Con estadísticas del motor, pero por debajo del umbral
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+        self.assertEqual(estimated_count(Review), 5)
+        paginator = self.paginator()
+        self.assertEqual((paginator.count, paginator.num_pages, paginator.estimated), (5, 3, False))
+        with self.assertRaises(EmptyPage):
+            paginator.page(4)
+
+    def test_tabla_grande_usa_la_estimacion(self):
+        with mock.patch('compradoresApp.pagination.estimated_count', return_value=ESTIMATE_THRESHOLD):
+            paginator = self.paginator()
+            self.assertEqual((paginator.count, paginator.estimated), (ESTIMATE_THRESHOLD, True))
+            # Más allá de las filas reales: página vacía, no un error
+            self.assertEqual(list(paginator.page(10)), [])
+
+            filtrado = self.paginator(Review.objects.filter(rating=4).order_by('-id'))
+            self.assertEqual((filtrado.count, filtrado.estimated), (5, False))
+
+
+@sin_manifiesto
+class CreateOrderTests(TestCase):
+    def setUp(self):
+        self.producto = crear_producto(stock=2)
+        self.buyer = User.objects.create_user('comprador', password='clave12345')
+        self.client.force_login(self.buyer)
+        self.url = reverse('compradores:create_order', args=[self.producto.pk])
+
+    def test_reserva_stock_y_crea_pedido(self):
+        self.client.post(self.url, {'quantity': 2})
+
+        self.producto.refresh_from_db()
+        self.assertEqual(self.producto.stock, 0)
+        self.assertEqual(Order.objects.get().quantity, 2)
+        self.assertEqual(NotificationOutbox.objects.count(), 1)
+
+    def test_sin_stock_suficiente_no_crea_pedido(self):
+        response = self.client.post(self.url, {'quantity': 3}, follow=True)
+
+        self.producto.refresh_from_db()
+        self.assertEqual(self.producto.stock, 2)
+        self.assertFalse(Order.objects.exists())
+        self.assertFalse(NotificationOutbox.objects.exists())
+        self.assertContains(response, "No hay stock suficiente")
+
+    def test_producto_sin_control_de_stock(self):
+        Producto.objects.filter(pk=self.producto.pk).update(stock=None)
+
+        self.client.post(self.url, {'quantity': 5})
+
+        self.producto.refresh_from_db()
+        self.assertIsNone(self.producto.stock)
+        self.assertEqual(Order.objects.get().quantity, 5)
+
+    def test_cantidad_invalida(self):
+        for quantity in ('0', '-1', 'x', '1000'):
+            self.client.post(self.url, {'quantity': quantity})
+
+        self.producto.refresh_from_db()
+        self.assertEqual(self.producto.stock, 2)
+        self.assertFalse(Order.objects.exists())
+
+
+class OutboxTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.producto = crear_producto(stock=None)
+        self.artesano = self.producto.tienda.artesano.user
+        self.evento = outbox.enqueue('order', self.producto, "Nuevo pedido", idempotency_key='order:1')
+
+    def test_entrega_una_notificacion_y_suma_al_badge(self):
+        self.assertEqual(badges.unread_notifications(self.artesano.pk), 0)
+
+        self.assertEqual(outbox.process_batch(), 1)
+
+        notificacion = Notification.objects.get()
+        self.assertEqual((notificacion.user, notificacion.idempotency_key), (self.artesano, 'order:1'))
+        self.assertEqual(badges.unread_notifications(self.artesano.pk), 1)
+        self.assertEqual(outbox.process_batch(), 0)
+
+    def test_reprocesar_no_duplica(self):
+        outbox.process_batch()
+        # El worker cayó antes de marcar el evento: vuelve a quedar pendiente
+        NotificationOutbox.objects.update(processed_at=None)
+
+        self.assertEqual(outbox.process_batch(), 1)
+        self.assertEqual(Notification.objects.count(), 1)
+        self.assertEqual(badges.unread_notifications(self.artesano.pk), 1)
+
+    def test_error_reintenta_mas_tarde(self):
+        with mock.patch.object(Notification.objects, 'bulk_create', side_effect=DatabaseError('caída')):
+            self.assertEqual(outbox.process_batch(), 0)
+
+        self.evento.refresh_from_db()
+        self.assertEqual(self.evento.attempts, 1)
+        self.assertIsNone(self.evento.processed_at)
+        self.assertIn('caída', self.evento.last_error)
+        # Con backoff: aún no está disponible
+        self.assertEqual(outbox.process_batch(), 0)
+        self.assertFalse(Notification.objects.exists())
+
+
+@sin_manifiesto
+class ConcurrentOrderTests(TransactionTestCase):
+    """Muchas compras simultáneas de un mismo producto contra la base de datos real."""
+    STOCK = 40
+    HILOS = 16
+    COMPRAS_POR_HILO = 5
+
+    def test_no_sobrevende(self):
+        if connection.vendor == 'sqlite' and connection.is_in_memory_db():
+            self.skipTest("La base SQLite en memoria no admite escrituras concurrentes "
+                          "entre hilos; use MySQL o un archivo (DATABASES['default']['TEST']['NAME']).")
+
+        producto = crear_producto(stock=self.STOCK)
+        url = reverse('compradores:create_order', args=[producto.pk])
+        barrera = threading.Barrier(self.HILOS)
+        errores = []
+
+        def comprar(numero):
+            try:
+                client = Client()
+                client.force_login(User.objects.create_user(f'comprador{numero}'))
+                barrera.wait()
+                for _ in range(self.COMPRAS_POR_HILO):
+                    response = client.post(url, {'quantity': 1})
+                    if response.status_code != 302:
+                        errores.append(response.status_code)
+            except Exception as e:
+                errores.append(e)
+            finally:
+                connection.close()
+
+        hilos = [threading.Thread(target=comprar, args=(i,)) for i in range(self.HILOS)]
+        inicio = time.perf_counter()
+        for hilo in hilos:
+            hilo.start()
+        for hilo in hilos:
+            hilo.join(timeout=60)
+        duracion = time.perf_counter() - inicio
+
+        self.assertFalse(any(hilo.is_alive() for hilo in hilos), "Las compras no terminaron (¿bloqueo?).")
+        self.assertEqual(errores, [])
+
+        # Se pidieron más unidades que el stock: se venden todas y ni una más
+        self.assertGreater(self.HILOS * self.COMPRAS_POR_HILO, self.STOCK)
+        producto.refresh_from_db()
+        self.assertEqual(producto.stock, 0)
+        self.assertEqual(Order.objects.filter(product=producto).count(), self.STOCK)
+        self.assertEqual(NotificationOutbox.objects.count(), self.STOCK)
+
+        # Rendimiento: el UPDATE condicional no debe serializar las compras en
+        # algo lento (cota amplia, pensada para detectar esperas por bloqueos)
+        compras_por_segundo = self.HILOS * self.COMPRAS_POR_HILO / duracion
+        self.assertGreater(compras_por_segundo, 10)
@@ -0,0 +1,202 @@
+# compradoresApp/trending.py
+"""
+Productos en tendencia: puntaje con decaimiento exponencial, mantenido por lotes.
+
+Se usa decaimiento "hacia adelante": un evento con peso w en el instante t
+suma w · 2^((t - L) / H) a Producto.tendencia, con L una fecha de referencia
+(TrendingState.landmark) y H la vida media. El puntaje actual de cualquier
+producto es tendencia · 2^(-(ahora - L) / H): el mismo factor para todos, así
+que ordenar por la columna ya es ordenar por el puntaje decaído y los
+productos sin eventos nuevos nunca hay que tocarlos.
+
+- `process_batch` (worker `manage.py procesar_tendencias`) lee los pedidos,
+  favoritos y reseñas nuevos por id creciente desde el último procesado,
+  suma los incrementos por producto y los aplica con un UPDATE por lote.
+- Como los puntajes sólo suben, el top-N en caché se actualiza mezclando la
+  lista actual con los productos tocados. Dura pocos minutos: si expira, o si
+  el worker escribió en otro caché (LocMemCache es por proceso), se rehace
+  desde la base con una consulta por el índice (tendencia, id).
+- Cuando L queda muy atrás, se adelanta y se reescalan todos los puntajes
+  (evita que los valores crezcan sin límite).
+- `manage.py recalcular_tendencias` recalcula todo desde las tablas de eventos.
+"""
+from collections import defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Case, F, FloatField, Value, When
+from django.utils import timezone
+
+from proyectoApp.models import Producto
+
+from .models import Favorite, Order, Review, TrendingState
+
+TOP_KEY = 'tendencias:top'
+TOP_N = 100
+# Corto: la lectura de respaldo por el índice es barata y acota cuánto dura una lista vieja
+TOP_TIMEOUT = 60 * 5
+BATCH_SIZE = 5000
+UPDATE_CHUNK = 500
+# Los eventos muy recientes esperan un poco: un id menor puede confirmarse
+# después que uno mayor y quedaría atrás del último procesado
+COMMIT_LAG = timedelta(seconds=5)
+# Se adelanta la referencia cada tantas vidas medias (2^30 ~ 1e9, lejos del límite del float)
+REBASE_HALF_LIVES = 30
+
+WEIGHTS = {'order': 3.0, 'favorite': 1.0, 'review': 2.0}
+MAX_ORDER_UNITS = 5
+
+
+def half_life():
+    return timedelta(hours=getattr(settings, 'TRENDING_HALF_LIFE_HOURS', 48))
+
+
+def _factor(when, landmark):
+    return 2 ** ((when - landmark) / half_life())
+
+
+# Fuente -> (modelo, campo de producto, columna de avance en TrendingState,
+#           columnas extra, peso del evento a partir de ellas)
+SOURCES = {
+    'order': (Order, 'product_id', 'last_order_id',
+              ('quantity',), lambda quantity: WEIGHTS['order'] * min(quantity, MAX_ORDER_UNITS)),
+    'favorite': (Favorite, 'product_id', 'last_favorite_id',
+                 (), lambda: WEIGHTS['favorite']),
+    'review': (Review, 'product_id', 'last_review_id',
+               ('rating',), lambda rating: WEIGHTS['review'] * rating / 5),
+}
+
+
+def _events(queryset, product_field, extra):
+    return queryset.order_by('pk').values_list('pk', product_field, 'created_at', *extra)
+
+
+def _increments(rows, weight, landmark, totals):
+    for _, product_id, created_at, *extra in rows:
+        totals[product_id] += weight(*extra) * _factor(created_at, landmark)
+
+
+def _apply(totals):
+    """tendencia += delta para cada producto, con un UPDATE ... CASE por bloque."""
+    items = list(totals.items())
+    for i in range(0, len(items), UPDATE_CHUNK):
+        chunk = items[i:i + UPDATE_CHUNK]
+        delta = Case(*[When(pk=pk, then=Value(d)) for pk, d in chunk], output_field=FloatField())
+        Producto.objects.filter(pk__in=[pk for pk, _ in chunk]).update(tendencia=F('tendencia') + delta)
+
+
+def _state():
+    state, _ = TrendingState.objects.select_for_update().get_or_create(
+        pk=1, defaults={'landmark': timezone.now()},
+    )
+    return state
+
+
+def _rebase(state, now):
+    """Adelanta la referencia a `now` y reescala todos los puntajes."""
+    scale = 1 / _factor(now, state.landmark)
+    Producto.objects.exclude(tendencia=0).update(tendencia=F('tendencia') * scale)
+    state.landmark = now
+    return scale
+
+
+# --------------------------
+# TOP-N EN CACHÉ
+# --------------------------
+def rebuild_top():
+    top = list(Producto.objects.order_by('-tendencia', '-id').filter(tendencia__gt=0)
+               .values_list('pk', 'tendencia')[:TOP_N])
+    cache.set(TOP_KEY, top, TOP_TIMEOUT)
+    return top
+
+
+def _merge_top(touched):
+    top = cache.get(TOP_KEY)
+    if top is None:
+        return rebuild_top()
+    scores = dict(top)
+    scores.update(Producto.objects.filter(pk__in=touched).values_list('pk', 'tendencia'))
+    top = sorted(scores.items(), key=lambda item: (-item[1], -item[0]))[:TOP_N]
+    cache.set(TOP_KEY, top, TOP_TIMEOUT)
+    return top
+
+
+def top_ids(n=TOP_N):
+    top = cache.get(TOP_KEY)
+    if top is None:
+        top = rebuild_top()
+    return [pk for pk, _ in top[:n]]
+
+
+def top_products(n=12):
+    """Los n productos en tendencia, en orden: una lectura al caché y una consulta por pk."""
+    ids = top_ids(n)
+    productos = Producto.objects.select_related('tienda').in_bulk(ids)
+    # Un producto borrado desde el último lote simplemente no aparece
+    return [productos[pk] for pk in ids if pk in productos]
+
+
+# --------------------------
+# LOTES
+# --------------------------
+def process_batch(batch_size=BATCH_SIZE):
+    """Aplica los eventos nuevos de cada fuente (hasta batch_size por fuente). Devuelve cuántos."""
+    now = timezone.now()
+    with transaction.atomic():
+        state = _state()
+        rescaled = False
+        if now - state.landmark > half_life() * REBASE_HALF_LIVES:
+            _rebase(state, now)
+            rescaled = True
+
+        totals = defaultdict(float)
+        processed = 0
+        for model, product_field, last_field, extra, weight in SOURCES.values():
+            rows = list(_events(
+                model.objects.filter(pk__gt=getattr(state, last_field)), product_field, extra,
+            )[:batch_size])
+            # Se corta en el primer evento demasiado reciente (los siguientes esperan con él)
+            cutoff = now - COMMIT_LAG
+            ready = next((i for i, row in enumerate(rows) if row[2] >= cutoff), len(rows))
+            rows = rows[:ready]
+            if rows:
+                _increments(rows, weight, state.landmark, totals)
+                setattr(state, last_field, rows[-1][0])
+                processed += len(rows)
+
+        _apply(totals)
+        if processed or rescaled:
+            state.save()
+
+    if rescaled:
+        rebuild_top()
+    elif totals:
+        _merge_top(list(totals))
+    return processed
+
+
+def rebuild(batch_size=BATCH_SIZE, window_half_lives=12):
+    """
+    Recalcula todos los puntajes desde Order, Favorite y Review. Los eventos de
+    más de `window_half_lives` vidas medias aportan < 2^-12 y se ignoran.
+    """
+    now = timezone.now()
+    since = now - half_life() * window_half_lives
+    with transaction.atomic():
+        state = _state()
+        state.landmark = now
+        totals = defaultdict(float)
+        for model, product_field, last_field, extra, weight in SOURCES.values():
+            # El worker sigue desde el último id visto aquí
+            last = model.objects.order_by('-pk').values_list('pk', flat=True).first() or 0
+            rows = _events(model.objects.filter(pk__lte=last, created_at__gte=since), product_field, extra)
+            _increments(rows.iterator(chunk_size=batch_size), weight, now, totals)
+            setattr(state, last_field, last)
+
+        Producto.objects.exclude(tendencia=0).update(tendencia=0)
+        _apply(totals)
+        state.save()
+    rebuild_top()
+    return len(totals)
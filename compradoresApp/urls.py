@@ -1,5 +1,5 @@
 from django.urls import path
-from . import views
+from . import api, views
 
 app_name = 'compradores'
 
@@ -19,4 +19,10 @@ urlpatterns = [
     path('favorites/', views.favorites_list, name='favorites'),
     path('notifications/', views.notifications_list, name='notifications'),
     path('returns/', views.returns_policy, name='returns'),
+
+    # API JSON de sólo lectura
+    path('api/products/', api.products, name='api_products'),
+    path('api/products/<int:pk>/', api.product, name='api_product'),
+    path('api/products/<int:pk>/reviews/', api.product_reviews, name='api_product_reviews'),
+    path('api/shops/<int:pk>/', api.shop, name='api_shop'),
 ]
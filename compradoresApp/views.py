@@ -5,11 +5,21 @@ from django.urls import reverse
 from django.contrib.auth.decorators import login_required
 from django.core.paginator import Paginator
 from django.contrib import messages
+from django.db import transaction
+from django.db.models import Exists, OuterRef, Value, BooleanField
 
+from . import badges, facets, outbox
+from .recommendations import related_products
+from .reviews import REVIEW_SORT_LABELS, rating_histogram, review_ordering
+from .catalog import catalog_ordering, filter_products
 from .models import Favorite, Order, Review, Notification
 from .forms import CompradorLoginForm, ReviewForm, FilterForm
+from .pagination import CursorPaginator, query_without
+from .page_cache import CATALOG_VERSION_KEY, anonymous_page_cache, get_version
 
 # IMPORTACIÓN CORRECTA desde proyectoApp
+from proyectoApp import inventario
+from proyectoApp.fragmentos import asignar_versiones, clave_producto
 from proyectoApp.models import Producto
 
 
@@ -37,47 +47,60 @@ def comprador_logout(request):
 # --------------------------
 # CATÁLOGO
 # --------------------------
+@anonymous_page_cache(version_func=lambda request: get_version(CATALOG_VERSION_KEY))
 def catalog(request):
-    qs = Producto.objects.all().order_by("-fecha_creacion")
     form = FilterForm(request.GET)
+    cursor_mode = 'cursor' in request.GET
+    sort, ordering = catalog_ordering(form)
 
-    if form.is_valid():
-        category = form.cleaned_data.get("category")
-        location = form.cleaned_data.get("location")
-        min_price = form.cleaned_data.get("min_price")
-        max_price = form.cleaned_data.get("max_price")
-
-        if category:
-            qs = qs.filter(categoria__icontains=category)
-        if location:
-            qs = qs.filter(tienda__ubicacion__icontains=location)
-        if min_price:
-            qs = qs.filter(precio__gte=min_price)
-        if max_price:
-            qs = qs.filter(precio__lte=max_price)
+    # select_related evita una consulta por tarjeta al leer p.tienda.ubicacion
+    qs = Producto.objects.select_related("tienda").order_by(*ordering)
 
+    # Texto libre ordenado por relevancia salvo que se pida otro orden (o en modo cursor)
+    qs = filter_products(qs, form, ranked=not (cursor_mode or sort))
+
+    # El estado de favorito se resuelve en la misma consulta de la página
+    # (EXISTS correlacionado), no con una consulta por producto.
     if request.user.is_authenticated:
-        for p in qs:
-            p.is_favorite = Favorite.objects.filter(user=request.user, product=p).exists()
+        qs = qs.annotate(is_favorite=Exists(
+            Favorite.objects.filter(user=request.user, product=OuterRef('pk'))
+        ))
+    else:
+        qs = qs.annotate(is_favorite=Value(False, output_field=BooleanField()))
+
+    # Modo cursor opcional (?cursor=): sin COUNT(*) ni OFFSET, costo
+    # constante en páginas profundas.
+    if cursor_mode:
+        paginator = CursorPaginator(qs, 12, ordering=ordering)
+        productos = paginator.get_page(request.GET.get('cursor'))
     else:
-        for p in qs:
-            p.is_favorite = False
+        paginator = Paginator(qs, 12)
+        page = request.GET.get('page')
+        productos = paginator.get_page(page)
+
+    # Versiones para el caché de fragmentos de las tarjetas (una lectura al caché)
+    productos.object_list = asignar_versiones(productos.object_list)
 
-    paginator = Paginator(qs, 12)
-    page = request.GET.get('page')
-    productos = paginator.get_page(page)
+    # Conteos por faceta para los filtros actuales (desde caché casi siempre)
+    filters = facets.normalize_filters(request.GET)
+    counts = facets.facet_counts(filters)
 
     return render(request, 'compradoresApp/catalog.html', {
         'products': productos,
-        'form': form
+        'form': form,
+        'facet_groups': facets.facet_links(request, counts, filters),
+        'filter_choices': facets.filter_choices(counts, filters),
+        'query': query_without(request, 'page', 'cursor'),
     })
 
 
 # --------------------------
 # DETALLE DE PRODUCTO
 # --------------------------
+@anonymous_page_cache(version_func=lambda request, pk: get_version(clave_producto(pk)))
 def product_detail(request, pk):
-    producto = get_object_or_404(Producto, pk=pk)
+    # La plantilla muestra la ubicación de la tienda: se trae con el producto
+    producto = get_object_or_404(Producto.objects.select_related('tienda'), pk=pk)
 
     review_form = ReviewForm()
 
@@ -85,11 +108,22 @@ def product_detail(request, pk):
     if request.user.is_authenticated:
         is_fav = Favorite.objects.filter(user=request.user, product=producto).exists()
 
-    reviews = Review.objects.filter(product=producto, active=True).order_by('-created_at')
+    # Página de reseñas con su autor en la misma consulta, en el orden pedido
+    review_sort, review_order = review_ordering(request.GET.get('sort'))
+    reviews_qs = Review.objects.filter(product=producto, active=True).select_related('author')
+    reviews = CursorPaginator(reviews_qs, 10, ordering=review_order).get_page(
+        request.GET.get('cursor')
+    )
 
     return render(request, 'compradoresApp/product_detail.html', {
         'product': producto,
         'reviews': reviews,
+        'review_sort': review_sort,
+        'review_sorts': REVIEW_SORT_LABELS,
+        'histogram': rating_histogram(producto.pk),
+        # Precalculados por `manage.py calcular_relacionados`: una consulta indexada
+        'related': related_products(producto.pk),
+        'query': query_without(request, 'cursor'),
         'review_form': review_form,
         'is_fav': is_fav
     })
@@ -108,13 +142,15 @@ def add_review(request, pk):
             rev = form.save(commit=False)
             rev.product = producto
             rev.author = request.user
-            rev.save()
 
-            # Notificar al ARTESANO REAL
-            Notification.objects.create(
-                user=producto.tienda.artesano.user,
-                message=f"Tu producto '{producto.nombre}' recibió una nueva reseña."
-            )
+            # La notificación al artesano va al outbox, en la misma transacción
+            with transaction.atomic():
+                rev.save()
+                outbox.enqueue(
+                    'review', producto,
+                    f"Tu producto '{producto.nombre}' recibió una nueva reseña.",
+                    idempotency_key=f'review:{rev.pk}',
+                )
 
             messages.success(request, "Reseña agregada exitosamente.")
 
@@ -147,7 +183,10 @@ def toggle_favorite(request, pk):
 # --------------------------
 @login_required
 def favorites_list(request):
-    favs = Favorite.objects.filter(user=request.user).select_related('product')
+    favs_qs = Favorite.objects.filter(user=request.user).select_related('product')
+    favs = CursorPaginator(favs_qs, 20, ordering=('-created_at', '-id')).get_page(
+        request.GET.get('cursor')
+    )
     return render(request, 'compradoresApp/favorites.html', {'favs': favs})
 
 
@@ -156,7 +195,12 @@ def favorites_list(request):
 # --------------------------
 @login_required
 def notifications_list(request):
-    notifs = Notification.objects.filter(user=request.user).order_by('-created_at')
+    notifs_qs = Notification.objects.filter(user=request.user)
+    notifs = CursorPaginator(notifs_qs, 20, ordering=('-created_at', '-id')).get_page(
+        request.GET.get('cursor')
+    )
+    # La página ya se cargó (y muestra cuáles eran nuevas); ahora se marcan leídas
+    badges.mark_notifications_read(request.user.pk)
     return render(request, 'compradoresApp/notifications.html', {'notifications': notifs})
 
 
@@ -167,21 +211,40 @@ def returns_policy(request):
 # --------------------------
 # COMPRAR PRODUCTO
 # --------------------------
+MAX_ORDER_QUANTITY = 20
+
+
 @login_required
 def create_order(request, pk):
     producto = get_object_or_404(Producto, pk=pk)
 
-    order = Order.objects.create(
-        buyer=request.user,
-        product=producto,
-        quantity=1,
-        status='P'
-    )
-
-    Notification.objects.create(
-        user=producto.tienda.artesano.user,
-        message=f"Nuevo pedido de '{producto.nombre}' por {request.user.username}."
-    )
+    try:
+        quantity = int(request.POST.get('quantity', 1))
+    except ValueError:
+        quantity = 0
+    if not 1 <= quantity <= MAX_ORDER_QUANTITY:
+        messages.error(request, f"La cantidad debe estar entre 1 y {MAX_ORDER_QUANTITY}.")
+        return redirect('compradores:product_detail', pk=pk)
+
+    # La reserva y el pedido van en la misma transacción: si algo falla,
+    # el stock se devuelve solo.
+    try:
+        with transaction.atomic():
+            inventario.reservar(producto.pk, quantity)
+            order = Order.objects.create(
+                buyer=request.user,
+                product=producto,
+                quantity=quantity,
+                status='P'
+            )
+            outbox.enqueue(
+                'order', producto,
+                f"Nuevo pedido de '{producto.nombre}' ({quantity}) por {request.user.username}.",
+                idempotency_key=f'order:{order.pk}',
+            )
+    except inventario.StockInsuficiente:
+        messages.error(request, "No hay stock suficiente para este pedido.")
+        return redirect('compradores:product_detail', pk=pk)
 
     messages.success(request, "Compra realizada con éxito.")
     return redirect('compradores:product_detail', pk=pk)
@@ -1,19 +1,108 @@
-from django.contrib import admin
-from .models import Perfil, Tienda, Producto
+from django.contrib import admin, messages
+from django.db import transaction
+
+from compradoresApp.pagination import EstimatedCountPaginator
+
+from . import artesano, contadores, fragmentos
+from .models import Perfil, Tienda, Producto, Resena
+
+# Los listados muestran las FK con select_related (un JOIN, no una consulta
+# por fila), filtran sólo por columnas indexadas y, en las tablas grandes, no
+# cuentan la tabla completa (EstimatedCountPaginator, sin show_full_result_count).
+# Las acciones masivas son un solo UPDATE; como no disparan señales, recalculan
+# contadores e invalidan cachés de las filas afectadas.
+
 
 @admin.register(Perfil)
 class PerfilAdmin(admin.ModelAdmin):
     list_display = ('user', 'rol', 'telefono', 'ciudad')
+    list_select_related = ('user',)
+    list_filter = ('rol',)
     search_fields = ('user__username', 'rol', 'ciudad')
+    raw_id_fields = ('user',)
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+
+# --------------------------
+# TIENDAS
+# --------------------------
+def _cambiar_aprobacion_tiendas(request, queryset, aprobada):
+    ids = list(queryset.exclude(aprobada=aprobada).values_list('pk', flat=True))
+    usuarios = Perfil.objects.filter(tienda__pk__in=ids).values_list('user_id', flat=True).distinct()
+    total = Tienda.objects.filter(pk__in=ids).update(aprobada=aprobada)
+    for user_id in usuarios:
+        artesano.invalidar(user_id)
+    for pk in ids:
+        fragmentos.invalidar_tienda(pk)
+    messages.success(request, f"{total} tiendas {'aprobadas' if aprobada else 'marcadas como no aprobadas'}.")
+
+
+@admin.action(description="Aprobar tiendas seleccionadas")
+def aprobar_tiendas(modeladmin, request, queryset):
+    _cambiar_aprobacion_tiendas(request, queryset, True)
+
+
+@admin.action(description="Quitar aprobación a tiendas seleccionadas")
+def rechazar_tiendas(modeladmin, request, queryset):
+    _cambiar_aprobacion_tiendas(request, queryset, False)
 
 
 @admin.register(Tienda)
 class TiendaAdmin(admin.ModelAdmin):
-    list_display = ('nombre', 'artesano', 'ubicacion', 'fecha_creacion')
+    list_display = ('nombre', 'artesano', 'ubicacion', 'aprobada', 'fecha_creacion')
+    list_select_related = ('artesano__user',)
+    list_filter = ('aprobada',)
     search_fields = ('nombre', 'artesano__user__username', 'ubicacion')
+    raw_id_fields = ('artesano',)
+    actions = (aprobar_tiendas, rechazar_tiendas)
 
 
 @admin.register(Producto)
 class ProductoAdmin(admin.ModelAdmin):
-    list_display = ('nombre', 'tienda', 'precio', 'categoria', 'fecha_creacion')
+    list_display = ('nombre', 'tienda', 'precio', 'stock', 'categoria', 'fecha_creacion')
+    list_select_related = ('tienda',)
+    # Por fecha usa producto_fecha_id_idx; categoría o tienda listarían todos los valores
+    list_filter = ('fecha_creacion',)
     search_fields = ('nombre', 'categoria', 'tienda__nombre')
+    raw_id_fields = ('tienda',)
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+
+# --------------------------
+# RESEÑAS DE TIENDA
+# --------------------------
+def _cambiar_aprobacion_resenas(request, queryset, aprobada):
+    with transaction.atomic():
+        cambiadas = queryset.exclude(aprobada=aprobada)
+        tiendas = list(cambiadas.order_by().values_list('tienda_id', flat=True).distinct())
+        total = cambiadas.update(aprobada=aprobada)
+        contadores.recontar(
+            Tienda.objects.filter(pk__in=tiendas),
+            **contadores.valores_resenas(Resena.objects.filter(aprobada=True), 'tienda', 'calificacion'),
+        )
+    for pk in tiendas:
+        fragmentos.invalidar_tienda(pk)
+    messages.success(request, f"{total} reseñas {'aprobadas' if aprobada else 'rechazadas'}.")
+
+
+@admin.action(description="Aprobar reseñas seleccionadas")
+def aprobar_resenas(modeladmin, request, queryset):
+    _cambiar_aprobacion_resenas(request, queryset, True)
+
+
+@admin.action(description="Rechazar reseñas seleccionadas")
+def rechazar_resenas(modeladmin, request, queryset):
+    _cambiar_aprobacion_resenas(request, queryset, False)
+
+
+@admin.register(Resena)
+class ResenaAdmin(admin.ModelAdmin):
+    list_display = ('tienda', 'usuario', 'calificacion', 'aprobada', 'fecha')
+    list_select_related = ('tienda', 'usuario')
+    list_filter = ('aprobada',)
+    raw_id_fields = ('tienda', 'usuario')
+    actions = (aprobar_resenas, rechazar_resenas)
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
@@ -0,0 +1,74 @@
+# proyectoApp/artesano.py
+"""
+Resolución del artesano actual (perfil + tienda) compartida por las vistas y
+el context processor.
+
+Se resuelve una sola vez por request, sólo cuando alguien la usa, y queda en
+caché por usuario hasta que las señales de Perfil/Tienda la invalidan.
+
+Las señales sólo limpian el caché del proceso que hizo el cambio si el caché
+no es compartido (LocMemCache): ahí la entrada dura unos segundos. Aun así,
+las decisiones de escritura (crear_tienda) se verifican en la base.
+"""
+from django.conf import settings
+from django.core.cache import cache
+
+from .models import Perfil, Tienda
+
+CACHE_TIMEOUT = 60 * 60 if settings.CACHE_SHARED else 10
+_SIN_PERFIL = 'sin-perfil'
+
+
+def cache_key(user_id):
+    return f'artesano-actual:{user_id}'
+
+
+class ArtesanoActual:
+    def __init__(self, perfil=None, tienda=None):
+        self.perfil = perfil
+        self.tienda = tienda
+
+    @property
+    def has_shop(self):
+        return self.tienda is not None
+
+    def __bool__(self):
+        return self.perfil is not None
+
+
+def _cargar(user):
+    # Artesano con tienda: una sola consulta con JOIN a Perfil
+    tienda = (
+        Tienda.objects.select_related('artesano')
+        .filter(artesano__user=user)
+        .order_by('id')
+        .first()
+    )
+    if tienda:
+        return tienda.artesano, tienda
+    return Perfil.objects.filter(user=user).first(), None
+
+
+def get_artesano(request):
+    if not hasattr(request, '_artesano_actual'):
+        user = request.user
+        if not user.is_authenticated:
+            request._artesano_actual = ArtesanoActual()
+            return request._artesano_actual
+
+        key = cache_key(user.pk)
+        datos = cache.get(key)
+        if datos is None:
+            perfil, tienda = _cargar(user)
+            datos = (perfil, tienda) if perfil else _SIN_PERFIL
+            cache.set(key, datos, CACHE_TIMEOUT)
+
+        if datos == _SIN_PERFIL:
+            request._artesano_actual = ArtesanoActual()
+        else:
+            request._artesano_actual = ArtesanoActual(*datos)
+    return request._artesano_actual
+
+
+def invalidar(user_id):
+    cache.delete(cache_key(user_id))
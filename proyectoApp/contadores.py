@@ -0,0 +1,93 @@
+# proyectoApp/contadores.py
+"""
+Contadores desnormalizados de calificación y popularidad.
+
+Producto guarda total/suma/promedio de sus Review activas y los totales de
+Favorite y Venta; Tienda guarda lo mismo para sus Resena aprobadas. Se actualizan con
+UPDATE ... SET x = x + n (expresiones F), sin leer la fila, desde las señales
+de cada modelo. `manage.py recalcular_contadores` los reconstruye si derivan,
+y las acciones masivas del admin (que no disparan señales) los recalculan
+para las filas afectadas con `recontar`.
+"""
+from django.db.models import Case, Count, F, FloatField, IntegerField, OuterRef, Subquery, Sum, Value, When
+from django.db.models.functions import Cast, Coalesce
+
+
+def aporte(activa, calificacion):
+    """Aporte de una reseña a los contadores: (total, suma)."""
+    if not activa:
+        return 0, 0
+    return 1, calificacion or 0
+
+
+def aplicar_resena(model, pk, delta_total, delta_suma):
+    if not delta_total and not delta_suma:
+        return
+    total = F('resenas_total') + delta_total
+    suma = F('resenas_suma') + delta_suma
+    model.objects.filter(pk=pk).update(
+        resenas_total=total,
+        resenas_suma=suma,
+        # El UPDATE evalúa todo con los valores anteriores de la fila
+        calificacion_promedio=Case(
+            When(resenas_total=-delta_total, then=Value(0.0)),
+            default=Cast(suma, FloatField()) / Cast(total, FloatField()),
+            output_field=FloatField(),
+        ),
+    )
+
+
+def aplicar_cambio_resena(model, pk, anterior, nuevo):
+    """anterior/nuevo: tuplas (activa, calificacion) antes y después del cambio."""
+    total_antes, suma_antes = aporte(*anterior)
+    total_despues, suma_despues = aporte(*nuevo)
+    aplicar_resena(model, pk, total_despues - total_antes, suma_despues - suma_antes)
+
+
+def aplicar_favorito(model, pk, delta):
+    model.objects.filter(pk=pk).update(favoritos_total=F('favoritos_total') + delta)
+
+
+def aplicar_venta(model, pk, delta):
+    model.objects.filter(pk=pk).update(ventas_total=F('ventas_total') + delta)
+
+
+# --------------------------
+# RECÁLCULO DESDE LAS TABLAS DE RESEÑAS
+# --------------------------
+def subconsulta(qs, campo_fk, agregado):
+    return Coalesce(
+        Subquery(
+            qs.filter(**{campo_fk: OuterRef('pk')})
+            .order_by()
+            .values(campo_fk)
+            .annotate(v=agregado)
+            .values('v')[:1],
+            output_field=IntegerField(),
+        ),
+        0,
+    )
+
+
+def promedio():
+    return Case(
+        When(resenas_total=0, then=Value(0.0)),
+        default=Cast(F('resenas_suma'), FloatField()) / Cast(F('resenas_total'), FloatField()),
+        output_field=FloatField(),
+    )
+
+
+def valores_resenas(resenas, campo_fk, campo_calificacion):
+    """resenas_total/resenas_suma como subconsultas sobre `resenas`, para un UPDATE."""
+    return {
+        'resenas_total': subconsulta(resenas, campo_fk, Count('id')),
+        'resenas_suma': subconsulta(resenas, campo_fk, Sum(campo_calificacion)),
+    }
+
+
+def recontar(queryset, **valores):
+    """Escribe `valores` en las filas de `queryset` y luego su promedio. Devuelve cuántas filas."""
+    total = queryset.update(**valores)
+    # El promedio se calcula a partir de los totales ya escritos
+    queryset.update(calificacion_promedio=promedio())
+    return total
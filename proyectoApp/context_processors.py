@@ -1,11 +1,12 @@
-from .models import Perfil, Tienda
+from django.utils.functional import SimpleLazyObject
+
+from .artesano import get_artesano
+
 
 def tienda_context(request):
-    if request.user.is_authenticated:
-        try:
-            perfil = Perfil.objects.get(user=request.user)
-            tienda = Tienda.objects.filter(artesano=perfil).first()
-            return {'tiene_tienda': bool(tienda)}
-        except Perfil.DoesNotExist:
-            return {'tiene_tienda': False}
-    return {'tiene_tienda': False}
+    # Perezoso: sólo se resuelve si la plantilla lo usa
+    artesano = SimpleLazyObject(lambda: get_artesano(request))
+    return {
+        'artesano': artesano,
+        'tiene_tienda': SimpleLazyObject(lambda: artesano.has_shop),
+    }
@@ -0,0 +1,141 @@
+# proyectoApp/exportacion.py
+"""
+Exportación del historial de ventas (Venta) y pedidos (compradoresApp.Order)
+de una tienda, en CSV o JSONL, generada fila a fila.
+
+Las filas se leen en lotes por id creciente (WHERE id > último ... LIMIT n)
+con proyecciones values_list: la memoria no depende del tamaño del historial
+y el resultado no se bufferea entero en el cliente de MySQL, como pasaría
+con un solo SELECT recorrido con iterator().
+"""
+import csv
+import json
+from datetime import datetime, time, timedelta
+
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+from .models import Venta
+
+TAMANO_LOTE = 2000
+FORMATOS = {
+    'csv': 'text/csv; charset=utf-8',
+    'jsonl': 'application/x-ndjson; charset=utf-8',
+}
+
+
+class ErrorExportacion(Exception):
+    pass
+
+
+def _ventas(tienda):
+    return Venta.objects.filter(tienda=tienda), 'fecha', (
+        ('id', 'id'),
+        ('fecha', 'fecha'),
+        ('producto_id', 'producto_id'),
+        ('producto', 'producto__nombre'),
+        ('precio', 'producto__precio'),
+        ('comprador', 'comprador__username'),
+        ('notificado', 'notificado'),
+    )
+
+
+def _pedidos(tienda):
+    from compradoresApp.models import Order
+    return Order.objects.filter(product__tienda=tienda), 'created_at', (
+        ('id', 'id'),
+        ('fecha', 'created_at'),
+        ('producto_id', 'product_id'),
+        ('producto', 'product__nombre'),
+        ('precio', 'product__precio'),
+        ('cantidad', 'quantity'),
+        ('estado', 'status'),
+        ('comprador', 'buyer__username'),
+    )
+
+
+TIPOS = {'ventas': _ventas, 'pedidos': _pedidos}
+
+
+def rango_fechas(desde, hasta):
+    """'AAAA-MM-DD' (ambos opcionales e inclusivos) -> datetimes [inicio, fin)."""
+    limites = []
+    for texto, dias in ((desde, 0), (hasta, 1)):
+        if not texto:
+            limites.append(None)
+            continue
+        try:
+            fecha = parse_date(texto)
+        except ValueError:
+            fecha = None
+        if fecha is None:
+            raise ErrorExportacion(f"Fecha inválida: {texto!r} (use AAAA-MM-DD).")
+        limites.append(timezone.make_aware(datetime.combine(fecha + timedelta(days=dias), time.min)))
+    return limites
+
+
+def _por_lotes(queryset, campos, tamano_lote):
+    ultimo = 0
+    while True:
+        lote = list(queryset.filter(pk__gt=ultimo).order_by('pk').values_list(*campos)[:tamano_lote])
+        yield from lote
+        if len(lote) < tamano_lote:
+            return
+        ultimo = lote[-1][0]
+
+
+def filas(tienda, tipo, desde=None, hasta=None, tamano_lote=TAMANO_LOTE):
+    """Devuelve (encabezados, iterador de tuplas)."""
+    if tipo not in TIPOS:
+        raise ErrorExportacion(f"Tipo de exportación desconocido: {tipo!r}.")
+    queryset, campo_fecha, columnas = TIPOS[tipo](tienda)
+    inicio, fin = rango_fechas(desde, hasta)
+    if inicio:
+        queryset = queryset.filter(**{f'{campo_fecha}__gte': inicio})
+    if fin:
+        queryset = queryset.filter(**{f'{campo_fecha}__lt': fin})
+    # El primer campo es siempre el id: lo usa la paginación por lotes
+    campos = [campo for _, campo in columnas]
+    return [nombre for nombre, _ in columnas], _por_lotes(queryset, campos, tamano_lote)
+
+
+class _Linea:
+    """Destino de csv.writer que devuelve la línea en vez de escribirla."""
+
+    def write(self, valor):
+        return valor
+
+
+def _celda_segura(valor):
+    # Evita que una hoja de cálculo interprete nombres como fórmulas
+    if isinstance(valor, str) and valor[:1] in ('=', '+', '-', '@'):
+        return "'" + valor
+    return valor
+
+
+def _valor_json(valor):
+    return valor.isoformat() if isinstance(valor, datetime) else valor
+
+
+def _lineas(encabezados, datos, formato):
+    if formato == 'csv':
+        writer = csv.writer(_Linea())
+        yield writer.writerow(encabezados)
+        for fila in datos:
+            yield writer.writerow([_celda_segura(v) for v in fila])
+    else:
+        for fila in datos:
+            yield json.dumps(
+                dict(zip(encabezados, map(_valor_json, fila))), ensure_ascii=False
+            ) + '\n'
+
+
+def exportar(tienda, tipo, formato, desde=None, hasta=None, tamano_lote=TAMANO_LOTE):
+    """
+    Valida los parámetros (ErrorExportacion) y devuelve un generador de
+    líneas de texto; las consultas se hacen a medida que se consume.
+    """
+    if formato not in FORMATOS:
+        raise ErrorExportacion(f"Formato desconocido: {formato!r}.")
+    encabezados, datos = filas(tienda, tipo, desde, hasta, tamano_lote)
+    return _lineas(encabezados, datos, formato)
@@ -0,0 +1,60 @@
+# proyectoApp/fragmentos.py
+"""
+Versiones de producto/tienda para el caché de fragmentos de las tarjetas.
+
+La clave de cada tarjeta en caché incluye `card_version`; las señales de
+Producto y Tienda la cambian al guardar o eliminar, y con eso el fragmento
+viejo deja de usarse (expira solo). Las versiones son marcas de tiempo en
+nanosegundos: si el caché pierde una, la nueva nunca choca con una anterior.
+"""
+import time
+
+from django.core.cache import cache
+
+TIMEOUT_VERSION = 60 * 60 * 24 * 30
+
+
+def clave_producto(pk):
+    return f'producto-version:{pk}'
+
+
+def clave_tienda(pk):
+    return f'tienda-version:{pk}'
+
+
+def invalidar_producto(pk):
+    cache.set(clave_producto(pk), time.time_ns(), TIMEOUT_VERSION)
+
+
+def invalidar_tienda(pk):
+    cache.set(clave_tienda(pk), time.time_ns(), TIMEOUT_VERSION)
+
+
+def invalidar_productos(pks):
+    """Varias versiones de producto con una sola escritura al caché."""
+    version = time.time_ns()
+    cache.set_many({clave_producto(i): version for i in pks}, TIMEOUT_VERSION)
+
+
+def invalidar_productos_de_tienda(pk):
+    # Para las páginas de detalle, que sólo miran la versión del producto
+    from .models import Producto
+    invalidar_productos(Producto.objects.filter(tienda_id=pk).values_list('pk', flat=True))
+
+
+def asignar_versiones(productos):
+    """Agrega `card_version` a cada producto con una sola lectura al caché."""
+    productos = list(productos)
+    claves = {p.pk: (clave_producto(p.pk), clave_tienda(p.tienda_id)) for p in productos}
+    todas = {c for par in claves.values() for c in par}
+    versiones = cache.get_many(todas)
+
+    faltantes = {c: time.time_ns() for c in todas if c not in versiones}
+    if faltantes:
+        cache.set_many(faltantes, TIMEOUT_VERSION)
+        versiones.update(faltantes)
+
+    for p in productos:
+        clave_p, clave_t = claves[p.pk]
+        p.card_version = f'{versiones[clave_p]}.{versiones[clave_t]}'
+    return productos
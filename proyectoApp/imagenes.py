@@ -0,0 +1,91 @@
+# proyectoApp/imagenes.py
+"""
+Derivados WebP de las imágenes de producto.
+
+Por cada imagen original se generan versiones reducidas junto al archivo
+(productos/gato.png -> productos/gato.png.320w.webp, productos/gato.png.800w.webp)
+que las plantillas sirven con srcset en vez del original. El nombre conserva
+la extensión del original: gato.png y gato.jpg son dos productos distintos.
+"""
+from io import BytesIO
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import Image, ImageOps
+
+# Ancho máximo de cada derivado, de menor a mayor
+ANCHOS = (320, 800)
+CALIDAD_WEBP = 80
+# Píxeles máximos de un original (~ 7000 x 5700): decodificar uno mayor puede
+# ocupar gigabytes aunque el archivo pese poco ("bomba de descompresión")
+MAX_PIXELES = 40_000_000
+
+
+def error_de_imagen(archivo):
+    """Mensaje de error si `archivo` (subido) no es una imagen aceptable, o None."""
+    try:
+        # open/verify leen sólo encabezados y estructura, no decodifican los píxeles
+        with Image.open(archivo) as imagen:
+            ancho, alto = imagen.size
+            imagen.verify()
+    except Image.DecompressionBombError:
+        return "La imagen tiene demasiados píxeles."
+    except Exception:
+        return "El archivo está dañado o no es una imagen."
+    finally:
+        archivo.seek(0)
+    if ancho * alto > MAX_PIXELES:
+        return "La imagen tiene demasiados píxeles."
+    return None
+
+
+def nombre_derivado(nombre, ancho):
+    return f'{nombre}.{ancho}w.webp'
+
+
+def _a_webp(imagen, ancho):
+    copia = imagen.copy()
+    copia.thumbnail((ancho, ancho * 4))
+    salida = BytesIO()
+    copia.save(salida, 'WEBP', quality=CALIDAD_WEBP, method=4)
+    return ContentFile(salida.getvalue())
+
+
+def generar_derivados(nombre, storage=default_storage):
+    """Genera (o reemplaza) los derivados de `nombre`. Devuelve True si pudo."""
+    try:
+        with storage.open(nombre, 'rb') as f:
+            imagen = Image.open(f)
+            # Se revisa antes de decodificar: las subidas ya se validan, pero no
+            # las imágenes que llegaron por otro camino
+            if imagen.width * imagen.height > MAX_PIXELES:
+                return False
+            imagen = ImageOps.exif_transpose(imagen)
+            imagen.load()
+    except (OSError, ValueError, Image.DecompressionBombError):
+        return False
+
+    if imagen.mode not in ('RGB', 'RGBA'):
+        imagen = imagen.convert('RGBA' if 'A' in imagen.getbands() or 'transparency' in imagen.info else 'RGB')
+
+    for ancho in ANCHOS:
+        destino = nombre_derivado(nombre, ancho)
+        if storage.exists(destino):
+            storage.delete(destino)
+        storage.save(destino, _a_webp(imagen, ancho))
+    return True
+
+
+def eliminar_derivados(nombre, storage=default_storage):
+    for ancho in ANCHOS:
+        destino = nombre_derivado(nombre, ancho)
+        if storage.exists(destino):
+            storage.delete(destino)
+
+
+def url_derivado(imagen, ancho):
+    return imagen.storage.url(nombre_derivado(imagen.name, ancho))
+
+
+def srcset(imagen):
+    return ', '.join(f'{url_derivado(imagen, ancho)} {ancho}w' for ancho in ANCHOS)
@@ -0,0 +1,235 @@
+# proyectoApp/importacion.py
+"""
+Importación masiva de productos desde CSV o JSONL, con un zip opcional de
+imágenes.
+
+El archivo se lee línea a línea (nunca entero en memoria) y cada fila se
+valida por separado: las válidas se insertan con bulk_create en lotes, una
+transacción por lote, y las inválidas se informan con su número de línea.
+bulk_create no emite señales, así que aquí se hace lo que harían las de
+Producto: índice de búsqueda, derivados de imagen y versión del catálogo.
+
+Columnas: nombre, precio, categoria, descripcion (opcional), stock (opcional)
+e imagen (opcional, nombre de un archivo dentro del zip).
+"""
+import codecs
+import csv
+import json
+import os
+import re
+import zipfile
+from io import BytesIO
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import DatabaseError, transaction
+from django.db.models import Max
+
+from . import imagenes
+from .models import Producto
+from .search import get_search_backend
+
+TAMANO_LOTE = 500
+# Se guardan sólo los primeros errores; el resto únicamente se cuenta
+MAX_ERRORES = 200
+MAX_BYTES_IMAGEN = 10 * 1024 * 1024
+EXTENSIONES_IMAGEN = ('.jpg', '.jpeg', '.png', '.webp', '.gif')
+FORMATOS = {'.csv': 'csv', '.jsonl': 'jsonl', '.ndjson': 'jsonl'}
+PRECIO = re.compile(r'\d{1,3}(\.\d{3})+|\d+')
+
+
+class ErrorImportacion(Exception):
+    pass
+
+
+class ResultadoImportacion:
+    def __init__(self):
+        self.creados = 0
+        self.errores = []
+        self.total_errores = 0
+
+    def error(self, linea, mensaje):
+        self.total_errores += 1
+        if len(self.errores) < MAX_ERRORES:
+            self.errores.append((linea, mensaje))
+
+
+def formato_de(nombre_archivo):
+    formato = FORMATOS.get(os.path.splitext(nombre_archivo or '')[1].lower())
+    if formato is None:
+        raise ErrorImportacion("El archivo debe ser .csv o .jsonl.")
+    return formato
+
+
+def leer_filas(archivo, formato):
+    """Itera (línea, fila) sobre un archivo binario, sin cargarlo completo."""
+    lineas = codecs.iterdecode(archivo, 'utf-8-sig')
+    if formato == 'csv':
+        lector = csv.DictReader(lineas)
+        for fila in lector:
+            yield lector.line_num, fila
+        return
+
+    for numero, linea in enumerate(lineas, 1):
+        if not linea.strip():
+            continue
+        try:
+            fila = json.loads(linea)
+        except ValueError:
+            fila = None
+        yield numero, fila if isinstance(fila, dict) else None
+
+
+def _texto(fila, campo):
+    valor = fila.get(campo)
+    return '' if valor is None else str(valor).strip()
+
+
+def validar_fila(fila):
+    """Devuelve (datos, error); `datos` es None si la fila no es válida."""
+    if fila is None:
+        return None, "La línea no es un objeto JSON válido."
+
+    nombre = _texto(fila, 'nombre')
+    categoria = _texto(fila, 'categoria')
+    precio = _texto(fila, 'precio')
+
+    if not nombre or len(nombre) > 100:
+        return None, "El nombre es obligatorio y tiene máximo 100 caracteres."
+    if not categoria or len(categoria) > 100:
+        return None, "La categoría es obligatoria y tiene máximo 100 caracteres."
+    # Pesos chilenos: sin decimales, con o sin separador de miles ("15.000")
+    if not PRECIO.fullmatch(precio) or int(precio.replace('.', '')) >= 2 ** 31:
+        return None, f"Precio inválido: {precio!r}."
+    stock = _texto(fila, 'stock')
+    if stock and (not stock.isdigit() or int(stock) >= 2 ** 31):
+        return None, f"Stock inválido: {stock!r}."
+
+    return {
+        'nombre': nombre,
+        'categoria': categoria,
+        'precio': int(precio.replace('.', '')),
+        'descripcion': _texto(fila, 'descripcion'),
+        'imagen': _texto(fila, 'imagen'),
+        'stock': int(stock) if stock else None,
+    }, None
+
+
+class ImagenesZip:
+    """Imágenes referenciadas por nombre dentro de un zip."""
+
+    def __init__(self, archivo):
+        try:
+            self.zip = zipfile.ZipFile(archivo)
+        except zipfile.BadZipFile:
+            raise ErrorImportacion("El archivo de imágenes no es un zip válido.")
+        # Sólo los metadatos del índice del zip, no el contenido
+        self.entradas = {
+            os.path.basename(info.filename): info
+            for info in self.zip.infolist() if not info.is_dir()
+        }
+        # Guardadas para el lote en curso: se borran si el lote no se inserta
+        self.pendientes = []
+
+    def guardar(self, nombre):
+        """
+        Devuelve (nombre en el storage, error). Cada fila recibe su propia
+        copia: los derivados se borran junto con el producto.
+        """
+        info = self.entradas.get(nombre)
+        if info is None:
+            return None, f"La imagen {nombre!r} no está en el zip."
+        if not nombre.lower().endswith(EXTENSIONES_IMAGEN):
+            return None, f"Formato de imagen no permitido: {nombre!r}."
+        if info.file_size > MAX_BYTES_IMAGEN:
+            return None, f"La imagen {nombre!r} supera los 10 MB."
+
+        datos = self.zip.read(info)
+        error = imagenes.error_de_imagen(BytesIO(datos))
+        if error:
+            return None, f"{nombre!r}: {error}"
+
+        destino = Producto._meta.get_field('imagen').generate_filename(None, nombre)
+        guardada = default_storage.save(destino, ContentFile(datos))
+        self.pendientes.append(guardada)
+        return guardada, None
+
+    def confirmar(self):
+        self.pendientes.clear()
+
+    def descartar(self):
+        for guardada in self.pendientes:
+            default_storage.delete(guardada)
+        self.pendientes.clear()
+
+
+def _ids_creados(tienda, objetos, ultimo_id):
+    if all(o.pk for o in objetos):
+        return [o.pk for o in objetos]
+    # MySQL no devuelve los ids de un INSERT de varias filas
+    return list(tienda.producto_set.filter(pk__gt=ultimo_id).values_list('pk', flat=True))
+
+
+def _insertar_lote(tienda, lote, zip_imagenes, resultado, derivados):
+    objetos = [obj for _, obj in lote]
+    con_imagen = {obj.imagen.name for obj in objetos if obj.imagen}
+    try:
+        with transaction.atomic():
+            ultimo_id = tienda.producto_set.aggregate(m=Max('pk'))['m'] or 0
+            Producto.objects.bulk_create(objetos)
+            ids = _ids_creados(tienda, objetos, ultimo_id)
+            get_search_backend().index_many(ids)
+    except DatabaseError as exc:
+        if zip_imagenes:
+            zip_imagenes.descartar()
+        resultado.error(
+            f"{lote[0][0]}-{lote[-1][0]}", f"No se pudo guardar el lote: {exc}"
+        )
+        return
+
+    if zip_imagenes:
+        zip_imagenes.confirmar()
+    resultado.creados += len(objetos)
+    if derivados and con_imagen:
+        listas = [nombre for nombre in con_imagen if imagenes.generar_derivados(nombre)]
+        Producto.objects.filter(pk__in=ids, imagen__in=listas).update(imagen_derivados=True)
+
+
+def importar_productos(tienda, archivo, formato, archivo_imagenes=None,
+                       tamano_lote=TAMANO_LOTE, derivados=True):
+    """
+    Importa los productos de `archivo` (binario) a `tienda`. Si `derivados`
+    es False, las miniaturas quedan para `manage.py generar_miniaturas`.
+    """
+    from compradoresApp.facets import bump_facets_version
+    from compradoresApp.page_cache import bump_catalog_version
+
+    zip_imagenes = ImagenesZip(archivo_imagenes) if archivo_imagenes else None
+    resultado = ResultadoImportacion()
+    lote = []
+
+    try:
+        for linea, fila in leer_filas(archivo, formato):
+            datos, error = validar_fila(fila)
+            if error is None and datos['imagen']:
+                if zip_imagenes is None:
+                    error = "La fila indica una imagen pero no se subió el zip."
+                else:
+                    datos['imagen'], error = zip_imagenes.guardar(datos['imagen'])
+            if error:
+                resultado.error(linea, error)
+                continue
+
+            lote.append((linea, Producto(tienda=tienda, **datos)))
+            if len(lote) >= tamano_lote:
+                _insertar_lote(tienda, lote, zip_imagenes, resultado, derivados)
+                lote = []
+    except (UnicodeDecodeError, csv.Error) as exc:
+        resultado.error('-', f"No se pudo leer el resto del archivo: {exc}")
+
+    if lote:
+        _insertar_lote(tienda, lote, zip_imagenes, resultado, derivados)
+    if resultado.creados:
+        bump_catalog_version()
+        bump_facets_version()
+    return resultado
@@ -0,0 +1,30 @@
+# proyectoApp/inventario.py
+"""
+Reserva de stock sin sobreventa.
+
+Cada reserva es un solo UPDATE condicional (stock = stock - n WHERE stock >= n):
+la base de datos lo serializa sobre la fila, así que compras simultáneas nunca
+dejan el stock negativo y no hace falta SELECT ... FOR UPDATE. Debe llamarse
+dentro de la transacción que crea el pedido, para que si ésta falla el stock
+vuelva a su valor.
+"""
+from django.db import transaction
+from django.db.models import F
+
+from . import fragmentos
+from .models import Producto
+
+
+class StockInsuficiente(Exception):
+    pass
+
+
+def reservar(producto_id, cantidad):
+    """Descuenta `cantidad` del stock; los productos sin control de stock (None) no cambian."""
+    if Producto.objects.filter(pk=producto_id, stock__gte=cantidad).update(stock=F('stock') - cantidad):
+        # update() no emite señales: la página del producto muestra el stock
+        transaction.on_commit(lambda: fragmentos.invalidar_producto(producto_id))
+        return
+    # Ninguna fila: no alcanza el stock, o el producto no lo controla
+    if not Producto.objects.filter(pk=producto_id, stock__isnull=True).exists():
+        raise StockInsuficiente
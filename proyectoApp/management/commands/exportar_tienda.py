@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from proyectoApp.exportacion import FORMATOS, TAMANO_LOTE, TIPOS, ErrorExportacion, exportar
+from proyectoApp.models import Tienda
+
+
+class Command(BaseCommand):
+    help = "Exporta las ventas o pedidos de una tienda en CSV o JSONL, sin cargarlos en memoria."
+
+    def add_arguments(self, parser):
+        parser.add_argument('tienda', type=int, help="Id de la tienda.")
+        parser.add_argument('--tipo', choices=sorted(TIPOS), default='ventas')
+        parser.add_argument('--formato', choices=sorted(FORMATOS), default='csv')
+        parser.add_argument('--desde', help="Fecha inicial inclusiva (AAAA-MM-DD).")
+        parser.add_argument('--hasta', help="Fecha final inclusiva (AAAA-MM-DD).")
+        parser.add_argument('--salida', help="Archivo de salida (por defecto, la salida estándar).")
+        parser.add_argument('--lote', type=int, default=TAMANO_LOTE, help="Filas por consulta.")
+
+    def handle(self, *args, **options):
+        tienda = Tienda.objects.filter(pk=options['tienda']).first()
+        if tienda is None:
+            raise CommandError(f"No existe la tienda {options['tienda']}.")
+
+        try:
+            lineas = exportar(
+                tienda, options['tipo'], options['formato'],
+                options['desde'], options['hasta'], options['lote'],
+            )
+        except ErrorExportacion as e:
+            raise CommandError(str(e))
+
+        if not options['salida']:
+            for linea in lineas:
+                self.stdout.write(linea, ending='')
+            return
+
+        with open(options['salida'], 'w', encoding='utf-8', newline='') as f:
+            f.writelines(lineas)
+        self.stderr.write(self.style.SUCCESS(f"Exportación escrita en {options['salida']}."))
@@ -0,0 +1,256 @@
+import itertools
+import random
+import secrets
+from contextlib import contextmanager
+from datetime import timedelta
+from time import perf_counter
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from compradoresApp.models import Favorite, Notification, Order, Review
+from proyectoApp.models import Perfil, Producto, Tienda, Venta
+
+CIUDADES = ('Santiago', 'Valparaíso', 'Concepción', 'La Serena', 'Temuco', 'Antofagasta',
+            'Puerto Montt', 'Arica', 'Valdivia', 'Punta Arenas', 'Chillán', 'Rancagua')
+CATEGORIAS = ('Cerámica', 'Joyería', 'Textil', 'Madera', 'Cuero', 'Cestería', 'Vidrio',
+              'Papelería', 'Decoración', 'Cosmética natural')
+PRODUCTOS = ('Vasija', 'Collar', 'Chal', 'Tabla', 'Billetera', 'Canasto', 'Jarrón', 'Cuaderno',
+             'Aros', 'Manta', 'Taza', 'Pulsera', 'Cojín', 'Jabón', 'Lámpara', 'Bolso')
+ADJETIVOS = ('rústico', 'andino', 'de greda', 'tejido a mano', 'de cobre', 'mapuche', 'de lana',
+             'pintado', 'reciclado', 'de raulí', 'chilote', 'de piedra', 'artesanal')
+PALABRAS = ('hecho', 'a', 'mano', 'con', 'materiales', 'locales', 'pieza', 'única', 'tradición',
+            'taller', 'familiar', 'natural', 'diseño', 'original', 'regalo', 'durable', 'color')
+COMENTARIOS = ('Excelente calidad', 'Llegó rápido', 'Muy bonito', 'Tal como en la foto',
+               'Podría mejorar el empaque', 'Lo recomiendo', 'No era lo que esperaba', 'Precioso')
+
+
+@contextmanager
+def fechas_manuales(*campos):
+    """Desactiva auto_now_add mientras se insertan fechas repartidas en el tiempo."""
+    for campo in campos:
+        campo.auto_now_add = False
+    try:
+        yield
+    finally:
+        for campo in campos:
+            campo.auto_now_add = True
+
+
+class Zipf:
+    """Elige elementos con probabilidad ~ 1/rango^s: pocos concentran la mayoría."""
+
+    def __init__(self, elementos, s, rng):
+        self.elementos = list(elementos)
+        self.rng = rng
+        self.acumulados = list(itertools.accumulate(1 / (i + 1) ** s for i in range(len(self.elementos))))
+
+    def elegir(self, k=1):
+        return self.rng.choices(self.elementos, cum_weights=self.acumulados, k=k)
+
+
+class Command(BaseCommand):
+    help = (
+        "Genera datos sintéticos con distribuciones sesgadas (bulk_create por lotes). "
+        "Pensado para bases vacías o de prueba: agrega datos, no borra nada."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--artesanos', type=int, default=50)
+        parser.add_argument('--compradores', type=int, default=1000)
+        parser.add_argument('--productos', type=int, default=20000)
+        parser.add_argument('--ventas', type=int, default=100000)
+        parser.add_argument('--pedidos', type=int, default=50000)
+        parser.add_argument('--resenas', type=int, default=50000)
+        parser.add_argument('--favoritos', type=int, default=50000)
+        parser.add_argument('--notificaciones', type=int, default=50000)
+        parser.add_argument('--escala', type=float, default=1.0,
+                            help="Multiplica todas las cantidades (p. ej. 50 para millones de filas).")
+        parser.add_argument('--lote', type=int, default=5000, help="Filas por bulk_create.")
+        parser.add_argument('--semilla', type=int, default=42, help="Semilla aleatoria (datos reproducibles).")
+        parser.add_argument('--dias', type=int, default=365, help="Antigüedad máxima de las fechas.")
+
+    def handle(self, *args, **options):
+        escala = options['escala']
+        cantidades = {
+            k: max(int(options[k] * escala), 0)
+            for k in ('artesanos', 'compradores', 'productos', 'ventas', 'pedidos',
+                      'resenas', 'favoritos', 'notificaciones')
+        }
+        if cantidades['artesanos'] < 1 or cantidades['compradores'] < 1:
+            raise CommandError("Se necesita al menos un artesano y un comprador.")
+        if cantidades['productos'] < 1:
+            raise CommandError("Se necesita al menos un producto.")
+
+        self.rng = random.Random(options['semilla'])
+        self.lote = options['lote']
+        self.ahora = timezone.now()
+        self.dias = options['dias']
+        # El prefijo no sale de la semilla: se puede generar dos veces en la misma base
+        self.prefijo = f"gen{secrets.token_hex(3)}"
+        inicio = perf_counter()
+
+        artesanos, tiendas = self._artesanos(cantidades['artesanos'])
+        compradores = self._usuarios('comprador', cantidades['compradores'])
+        productos = self._productos(tiendas, cantidades['productos'])
+
+        # Popularidad de productos y actividad de compradores, ambas sesgadas
+        populares = Zipf(productos, 1.1, self.rng)
+        activos = Zipf(compradores, 0.8, self.rng)
+
+        self._ventas(populares, activos, cantidades['ventas'])
+        self._pedidos(populares, activos, cantidades['pedidos'])
+        self._resenas(populares, activos, cantidades['resenas'])
+        self._favoritos(populares, activos, cantidades['favoritos'])
+        self._notificaciones(artesanos, activos, cantidades['notificaciones'])
+
+        # bulk_create no emite señales: contadores e índice se reconstruyen al final
+        self.stdout.write("Recalculando contadores e índice de búsqueda...")
+        call_command('recalcular_contadores', lote=self.lote, stdout=self.stdout)
+        call_command('reindexar_busqueda', stdout=self.stdout)
+
+        from compradoresApp.facets import bump_facets_version
+        from compradoresApp.page_cache import bump_catalog_version
+        bump_catalog_version()
+        bump_facets_version()
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Datos generados en {perf_counter() - inicio:.1f} s (prefijo de usuarios {self.prefijo}). "
+            f"Contraseña de todos los usuarios: {self.prefijo}"
+        ))
+
+    # ---- utilidades ----
+    def _fecha(self, sesgo=1.0):
+        # sesgo > 1 concentra las fechas en el pasado reciente
+        dias = self.dias * self.rng.random() ** sesgo
+        return self.ahora - timedelta(days=dias)
+
+    def _insertar(self, modelo, filas, total, **kwargs):
+        """Inserta el iterable `filas` en lotes, cada uno en su transacción."""
+        inicio = perf_counter()
+        insertadas = 0
+        filas = iter(filas)
+        while True:
+            lote = list(itertools.islice(filas, self.lote))
+            if not lote:
+                break
+            with transaction.atomic():
+                modelo.objects.bulk_create(lote, **kwargs)
+            insertadas += len(lote)
+            self.stdout.write(f"\r{modelo.__name__}: {insertadas}/{total}", ending='')
+        segundos = perf_counter() - inicio
+        self.stdout.write(f"\r{modelo.__name__}: {insertadas} filas en {segundos:.1f} s")
+
+    def _usuarios(self, tipo, n):
+        # Un solo hash para todos: make_password por usuario tomaría minutos
+        password = make_password(self.prefijo)
+        prefijo = f'{self.prefijo}_{tipo}_'
+        self._insertar(User, (
+            User(username=f'{prefijo}{i}', email=f'{prefijo}{i}@example.com', password=password)
+            for i in range(n)
+        ), n)
+        # MySQL no devuelve los ids de bulk_create: se leen de vuelta
+        return list(User.objects.filter(username__startswith=prefijo).values_list('pk', flat=True))
+
+    # ---- entidades ----
+    def _artesanos(self, n):
+        usuarios = self._usuarios('artesano', n)
+        self._insertar(Perfil, (
+            Perfil(user_id=u, rol='artesano', ciudad=self.rng.choice(CIUDADES)) for u in usuarios
+        ), n)
+        perfiles = dict(Perfil.objects.filter(user_id__in=usuarios).values_list('pk', 'user_id'))
+
+        tienda = Tienda._meta.get_field('fecha_creacion')
+        with fechas_manuales(tienda):
+            self._insertar(Tienda, (
+                Tienda(
+                    artesano_id=perfil, nombre=f'Taller {self.rng.choice(ADJETIVOS)} {i}',
+                    descripcion=' '.join(self.rng.choices(PALABRAS, k=12)),
+                    ubicacion=self.rng.choice(CIUDADES), aprobada=True,
+                    fecha_creacion=self._fecha(),
+                )
+                for i, perfil in enumerate(perfiles)
+            ), n)
+        tiendas = list(Tienda.objects.filter(artesano_id__in=perfiles).values_list('pk', flat=True))
+        return list(perfiles.values()), tiendas
+
+    def _productos(self, tiendas, n):
+        # Pocas tiendas grandes y muchas pequeñas
+        por_tienda = Zipf(tiendas, 1.0, self.rng)
+        antes = Producto.objects.order_by('-pk').values_list('pk', flat=True).first() or 0
+
+        def filas():
+            for tienda in por_tienda.elegir(n):
+                yield Producto(
+                    tienda_id=tienda,
+                    nombre=f'{self.rng.choice(PRODUCTOS)} {self.rng.choice(ADJETIVOS)}',
+                    descripcion=' '.join(self.rng.choices(PALABRAS, k=self.rng.randint(8, 40))),
+                    # Precios log-normales, redondeados a la centena (CLP)
+                    precio=int(min(self.rng.lognormvariate(9.6, 0.8), 2_000_000) // 100 * 100),
+                    categoria=self.rng.choice(CATEGORIAS),
+                    stock=self.rng.choice((None, None, self.rng.randint(0, 200))),
+                    fecha_creacion=self._fecha(),
+                )
+
+        with fechas_manuales(Producto._meta.get_field('fecha_creacion')):
+            self._insertar(Producto, filas(), n)
+        return list(Producto.objects.filter(pk__gt=antes, tienda_id__in=tiendas).values_list('pk', flat=True))
+
+    def _ventas(self, populares, activos, n):
+        # bulk_create no pasa por Venta.save(): la tienda se copia aquí
+        ids = populares.elementos
+        tiendas = dict(Producto.objects.filter(pk__gte=min(ids), pk__lte=max(ids)).values_list('pk', 'tienda_id'))
+        with fechas_manuales(Venta._meta.get_field('fecha')):
+            self._insertar(Venta, (
+                Venta(producto_id=p, tienda_id=tiendas[p], comprador_id=c, fecha=self._fecha(3),
+                      notificado=self.rng.random() < 0.9)
+                for p, c in zip(populares.elegir(n), activos.elegir(n))
+            ), n)
+
+    def _pedidos(self, populares, activos, n):
+        estados = ('P', 'C', 'R')
+        with fechas_manuales(Order._meta.get_field('created_at')):
+            self._insertar(Order, (
+                Order(
+                    product_id=p, buyer_id=c, quantity=self.rng.choice((1, 1, 1, 2, 3)),
+                    status=self.rng.choices(estados, weights=(2, 7, 1))[0], created_at=self._fecha(3),
+                )
+                for p, c in zip(populares.elegir(n), activos.elegir(n))
+            ), n)
+
+    def _resenas(self, populares, activos, n):
+        with fechas_manuales(Review._meta.get_field('created_at')):
+            self._insertar(Review, (
+                Review(
+                    product_id=p, author_id=c,
+                    rating=self.rng.choices((1, 2, 3, 4, 5), weights=(1, 1, 3, 8, 12))[0],
+                    comment=self.rng.choice(COMENTARIOS), active=self.rng.random() < 0.95,
+                    created_at=self._fecha(2),
+                )
+                for p, c in zip(populares.elegir(n), activos.elegir(n))
+            ), n)
+
+    def _favoritos(self, populares, activos, n):
+        # Pares (usuario, producto) únicos: los repetidos se descartan en la inserción
+        with fechas_manuales(Favorite._meta.get_field('created_at')):
+            self._insertar(Favorite, (
+                Favorite(product_id=p, user_id=c, created_at=self._fecha(2))
+                for p, c in zip(populares.elegir(n), activos.elegir(n))
+            ), n, ignore_conflicts=True)
+
+    def _notificaciones(self, artesanos, activos, n):
+        # La mayoría para artesanos (ventas y reseñas), el resto para compradores
+        def filas():
+            for c in activos.elegir(n):
+                usuario = self.rng.choice(artesanos) if self.rng.random() < 0.7 else c
+                yield Notification(
+                    user_id=usuario, message=f"{self.rng.choice(COMENTARIOS)} ({self.rng.choice(PRODUCTOS)})",
+                    read=self.rng.random() < 0.7, created_at=self._fecha(3),
+                )
+
+        with fechas_manuales(Notification._meta.get_field('created_at')):
+            self._insertar(Notification, filas(), n)
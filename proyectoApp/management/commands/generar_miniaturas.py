@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand
+
+from proyectoApp import imagenes
+from proyectoApp.models import Producto
+
+
+class Command(BaseCommand):
+    help = "Genera los derivados WebP de las imágenes de producto existentes."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--todas', action='store_true',
+                            help="Regenera también los productos que ya tienen derivados.")
+
+    def handle(self, *args, **options):
+        qs = Producto.objects.exclude(imagen='').exclude(imagen__isnull=True)
+        if not options['todas']:
+            qs = qs.filter(imagen_derivados=False)
+
+        generados = fallidos = 0
+        for pk, nombre in qs.values_list('pk', 'imagen').iterator(chunk_size=500):
+            if imagenes.generar_derivados(nombre):
+                Producto.objects.filter(pk=pk).update(imagen_derivados=True)
+                generados += 1
+            else:
+                fallidos += 1
+                self.stderr.write(f"No se pudo procesar la imagen de producto {pk}: {nombre}")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Derivados generados para {generados} productos ({fallidos} con error)."
+        ))
@@ -0,0 +1,49 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from proyectoApp.importacion import TAMANO_LOTE, ErrorImportacion, formato_de, importar_productos
+from proyectoApp.models import Tienda
+
+
+class Command(BaseCommand):
+    help = "Importa productos a una tienda desde un archivo CSV o JSONL (y un zip de imágenes opcional)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('tienda', type=int, help="Id de la tienda destino.")
+        parser.add_argument('archivo', help="Ruta del archivo .csv o .jsonl.")
+        parser.add_argument('--imagenes', help="Zip con las imágenes referenciadas en la columna imagen.")
+        parser.add_argument('--formato', choices=('csv', 'jsonl'),
+                            help="Formato del archivo (por defecto, según la extensión).")
+        parser.add_argument('--lote', type=int, default=TAMANO_LOTE,
+                            help="Filas por bulk_create/transacción.")
+        parser.add_argument('--sin-derivados', action='store_true',
+                            help="No genera las miniaturas WebP (ver generar_miniaturas).")
+
+    def handle(self, *args, **options):
+        tienda = Tienda.objects.filter(pk=options['tienda']).first()
+        if tienda is None:
+            raise CommandError(f"No existe la tienda {options['tienda']}.")
+
+        imagenes = open(options['imagenes'], 'rb') if options['imagenes'] else None
+        try:
+            with open(options['archivo'], 'rb') as archivo:
+                resultado = importar_productos(
+                    tienda, archivo,
+                    options['formato'] or formato_de(options['archivo']),
+                    imagenes,
+                    tamano_lote=options['lote'],
+                    derivados=not options['sin_derivados'],
+                )
+        except (ErrorImportacion, OSError) as e:
+            raise CommandError(str(e))
+        finally:
+            if imagenes:
+                imagenes.close()
+
+        for linea, mensaje in resultado.errores:
+            self.stderr.write(f"Línea {linea}: {mensaje}")
+        if resultado.total_errores > len(resultado.errores):
+            self.stderr.write(f"... y {resultado.total_errores - len(resultado.errores)} errores más.")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Productos importados: {resultado.creados} ({resultado.total_errores} filas con error)."
+        ))
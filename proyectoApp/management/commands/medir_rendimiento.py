@@ -0,0 +1,243 @@
+import json
+import subprocess
+import urllib.error
+import urllib.request
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+from time import perf_counter
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import Count
+from django.test import Client
+from django.urls import reverse
+
+from compradoresApp.models import Favorite, Notification, Review
+from proyectoApp.models import Producto, Tienda, Venta
+from proyectoIntegrado.metrics import ConsultasDelRequest
+
+PERCENTILES = (50, 95, 99)
+CON_SESION = {'catalogo_sesion', 'detalle_producto_sesion', 'mi_tienda', 'notificaciones'}
+
+
+def percentil(valores, p):
+    """Percentil por rango más cercano de una lista ya ordenada."""
+    if not valores:
+        return None
+    indice = max(0, min(len(valores) - 1, round(p / 100 * len(valores) + 0.5) - 1))
+    return valores[indice]
+
+
+def commit_actual():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=settings.BASE_DIR,
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'desconocido'
+
+
+def objetivos():
+    """Elige datos representativos: el producto, la tienda y los usuarios más activos."""
+    producto = Producto.objects.order_by('-favoritos_total', '-resenas_total', '-id').first()
+    if producto is None:
+        raise CommandError("No hay productos: ejecute antes `manage.py generar_datos`.")
+    tienda = Tienda.objects.annotate(n=Count('producto')).order_by('-n').select_related('artesano').first()
+    notificado = (Notification.objects.values('user_id').annotate(n=Count('id'))
+                  .order_by('-n').values_list('user_id', flat=True).first())
+    comprador = (Favorite.objects.values('user_id').annotate(n=Count('id'))
+                 .order_by('-n').values_list('user_id', flat=True).first())
+    return {
+        'producto': producto,
+        'palabra': producto.nombre.split()[0],
+        'artesano': tienda.artesano.user_id if tienda else None,
+        'notificado': notificado,
+        'comprador': comprador,
+    }
+
+
+def _url(ruta, **params):
+    # urlencode: las categorías llevan tildes y urllib no acepta URLs sin codificar
+    return f'{ruta}?{urlencode(params)}' if params else ruta
+
+
+def escenarios(o):
+    """(nombre, usuario o None para anónimo, url)."""
+    catalogo = reverse('compradores:catalog')
+    detalle = reverse('compradores:product_detail', args=[o['producto'].pk])
+    categoria = o['producto'].categoria
+    return [
+        ('catalogo', None, catalogo),
+        ('catalogo_categoria', None, _url(catalogo, category=categoria)),
+        ('catalogo_busqueda', None, _url(catalogo, q=o['palabra'])),
+        ('catalogo_precio_calificacion', None, _url(catalogo, min_price=5000, max_price=50000, sort='rating')),
+        ('catalogo_pagina_profunda', None, _url(catalogo, page=200)),
+        ('catalogo_cursor', None, _url(catalogo, cursor='', sort='popular')),
+        ('catalogo_sesion', o['comprador'], _url(catalogo, category=categoria)),
+        ('detalle_producto', None, detalle),
+        ('detalle_producto_sesion', o['comprador'], detalle),
+        ('mi_tienda', o['artesano'], reverse('mi_tienda')),
+        ('notificaciones', o['notificado'], reverse('compradores:notifications')),
+        ('api_productos', None, _url(reverse('compradores:api_products'), category=categoria)),
+    ]
+
+
+class Command(BaseCommand):
+    help = (
+        "Mide latencia (p50/p95/p99) y consultas por request de las vistas principales, "
+        "con el cliente de pruebas o contra un servidor (--url), y guarda el resultado "
+        "en JSON para comparar entre commits (--comparar)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeticiones', type=int, default=50, help="Requests medidos por escenario.")
+        parser.add_argument('--calentamiento', type=int, default=3, help="Requests previos sin medir.")
+        parser.add_argument('--escenarios', help="Nombres separados por coma (por defecto todos).")
+        parser.add_argument('--frio', action='store_true',
+                            help="Vacía el caché antes de cada request (con --url, sólo si el caché es compartido).")
+        parser.add_argument('--url', help="Servidor ya levantado, p. ej. http://127.0.0.1:8000 (sin conteo de consultas).")
+        parser.add_argument('--host', default='localhost', help="Cabecera Host del cliente de pruebas.")
+        parser.add_argument('--salida', help="Archivo JSON (por defecto benchmarks/<fecha>-<commit>.json).")
+        parser.add_argument('--comparar', help="JSON de una ejecución anterior para mostrar diferencias.")
+        parser.add_argument('--listar', action='store_true', help="Muestra los escenarios y termina.")
+
+    def handle(self, *args, **options):
+        todos = escenarios(objetivos())
+        if options['listar']:
+            for nombre, usuario, url in todos:
+                self.stdout.write(f"{nombre:32} {'sesión' if usuario else 'anónimo':8} {url}")
+            return
+
+        elegidos = todos
+        if options['escenarios']:
+            nombres = {n.strip() for n in options['escenarios'].split(',') if n.strip()}
+            desconocidos = nombres - {n for n, _, _ in todos}
+            if desconocidos:
+                raise CommandError(f"Escenarios desconocidos: {', '.join(sorted(desconocidos))}.")
+            elegidos = [e for e in todos if e[0] in nombres]
+
+        anterior = None
+        if options['comparar']:
+            try:
+                anterior = json.loads(Path(options['comparar']).read_text())
+            except (OSError, ValueError) as e:
+                raise CommandError(f"No se pudo leer {options['comparar']}: {e}")
+
+        medir = self._medir_url if options['url'] else self._medir_cliente
+        resultados = {}
+        for nombre, usuario, url in elegidos:
+            if usuario is None and nombre in CON_SESION:
+                self.stderr.write(f"{nombre}: sin usuario adecuado en los datos, se omite.")
+                continue
+            resultados[nombre] = medir(url, usuario, options)
+
+        informe = {
+            'commit': commit_actual(),
+            'fecha': datetime.now().isoformat(timespec='seconds'),
+            'destino': options['url'] or 'cliente de pruebas',
+            'base_de_datos': connection.vendor,
+            'frio': options['frio'],
+            'repeticiones': options['repeticiones'],
+            'filas': {
+                'productos': Producto.objects.count(),
+                'ventas': Venta.objects.count(),
+                'resenas': Review.objects.count(),
+                'notificaciones': Notification.objects.count(),
+            },
+            'escenarios': resultados,
+        }
+        self._imprimir(informe, anterior)
+
+        salida = Path(options['salida'] or Path(settings.BASE_DIR) / 'benchmarks' /
+                      f"{datetime.now():%Y%m%d-%H%M%S}-{informe['commit']}.json")
+        salida.parent.mkdir(parents=True, exist_ok=True)
+        salida.write_text(json.dumps(informe, indent=2, ensure_ascii=False))
+        self.stdout.write(self.style.SUCCESS(f"Resultados guardados en {salida}"))
+
+    # ---- medición ----
+    def _resumen(self, url, tiempos, consultas, estados):
+        tiempos.sort()
+        resumen = {'url': url, 'estados': dict(Counter(estados))}
+        for p in PERCENTILES:
+            resumen[f'p{p}_ms'] = round(percentil(tiempos, p) * 1000, 2)
+        resumen['media_ms'] = round(sum(tiempos) / len(tiempos) * 1000, 2)
+        if consultas:
+            resumen['consultas_media'] = round(sum(consultas) / len(consultas), 1)
+            resumen['consultas_max'] = max(consultas)
+        return resumen
+
+    def _cliente(self, usuario, host):
+        client = Client(HTTP_HOST=host)
+        if usuario is not None:
+            client.force_login(User.objects.get(pk=usuario))
+        return client
+
+    def _medir_cliente(self, url, usuario, options):
+        client = self._cliente(usuario, options['host'])
+        tiempos, consultas, estados = [], [], []
+        for i in range(options['calentamiento'] + options['repeticiones']):
+            if options['frio']:
+                cache.clear()
+            contador = ConsultasDelRequest()
+            inicio = perf_counter()
+            with connection.execute_wrapper(contador):
+                response = client.get(url)
+            segundos = perf_counter() - inicio
+            if i >= options['calentamiento']:
+                tiempos.append(segundos)
+                consultas.append(contador.total)
+                estados.append(response.status_code)
+        return self._resumen(url, tiempos, consultas, estados)
+
+    def _medir_url(self, url, usuario, options):
+        headers = {}
+        if usuario is not None:
+            # La sesión se crea aquí: el servidor debe compartir la base (o el caché) de sesiones
+            client = self._cliente(usuario, options['host'])
+            cookie = client.cookies[settings.SESSION_COOKIE_NAME].value
+            headers['Cookie'] = f'{settings.SESSION_COOKIE_NAME}={cookie}'
+        completa = options['url'].rstrip('/') + url
+        tiempos, estados = [], []
+        for i in range(options['calentamiento'] + options['repeticiones']):
+            if options['frio']:
+                cache.clear()
+            inicio = perf_counter()
+            try:
+                with urllib.request.urlopen(urllib.request.Request(completa, headers=headers)) as response:
+                    response.read()
+                    estado = response.status
+            except urllib.error.HTTPError as e:
+                estado = e.code
+            except urllib.error.URLError as e:
+                raise CommandError(f"No se pudo conectar con {completa}: {e.reason}")
+            segundos = perf_counter() - inicio
+            if i >= options['calentamiento']:
+                tiempos.append(segundos)
+                estados.append(estado)
+        return self._resumen(url, tiempos, [], estados)
+
+    # ---- informe ----
+    def _imprimir(self, informe, anterior):
+        previos = (anterior or {}).get('escenarios', {})
+        columnas = [f'p{p}_ms' for p in PERCENTILES] + ['consultas_media']
+        self.stdout.write(f"Commit {informe['commit']} ({informe['base_de_datos']}, "
+                          f"{informe['filas']['productos']} productos)"
+                          + (f" comparado con {anterior.get('commit')}" if anterior else ''))
+        self.stdout.write(f"{'escenario':30}" + ''.join(f'{c:>22}' for c in columnas) + '  estados')
+        for nombre, r in informe['escenarios'].items():
+            celdas = []
+            for c in columnas:
+                valor = r.get(c)
+                previo = previos.get(nombre, {}).get(c)
+                texto = '-' if valor is None else f'{valor:g}'
+                if valor is not None and previo:
+                    texto += f' ({(valor - previo) / previo * 100:+.0f}%)'
+                celdas.append(f'{texto:>22}')
+            estados = ','.join(f'{k}x{v}' for k, v in r['estados'].items())
+            self.stdout.write(f'{nombre:30}' + ''.join(celdas) + f'  {estados}')
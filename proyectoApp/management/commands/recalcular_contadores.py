@@ -0,0 +1,49 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count
+
+from compradoresApp.models import Favorite, Review
+from proyectoApp import contadores
+from proyectoApp.models import Producto, Resena, Tienda, Venta
+
+
+class Command(BaseCommand):
+    help = "Reconstruye los contadores de calificación, favoritos y ventas de Producto y Tienda."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--lote', type=int, default=5000,
+                            help="Filas por UPDATE (acota bloqueos en tablas grandes).")
+
+    def _por_lotes(self, model, lote, **valores):
+        total = 0
+        ids = model.objects.order_by('pk').values_list('pk', flat=True)
+        ultimo = 0
+        while True:
+            tope = ids.filter(pk__gt=ultimo)[lote - 1:lote].first()
+            rango = model.objects.filter(pk__gt=ultimo)
+            if tope is not None:
+                rango = rango.filter(pk__lte=tope)
+            with transaction.atomic():
+                total += contadores.recontar(rango, **valores)
+            if tope is None:
+                return total
+            ultimo = tope
+
+    def handle(self, *args, **options):
+        lote = options['lote']
+        reviews = Review.objects.filter(active=True)
+        resenas = Resena.objects.filter(aprobada=True)
+
+        productos = self._por_lotes(
+            Producto, lote,
+            **contadores.valores_resenas(reviews, 'product', 'rating'),
+            favoritos_total=contadores.subconsulta(Favorite.objects.all(), 'product', Count('id')),
+            ventas_total=contadores.subconsulta(Venta.objects.all(), 'producto', Count('id')),
+        )
+        tiendas = self._por_lotes(
+            Tienda, lote,
+            **contadores.valores_resenas(resenas, 'tienda', 'calificacion'),
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f"Contadores recalculados: {productos} productos, {tiendas} tiendas."
+        ))
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from proyectoApp.search import get_search_backend
+
+
+class Command(BaseCommand):
+    help = "Reconstruye el índice de búsqueda de productos desde cero."
+
+    def handle(self, *args, **options):
+        backend = get_search_backend()
+        with transaction.atomic():
+            total = backend.rebuild()
+        self.stdout.write(self.style.SUCCESS(
+            f"Índice reconstruido con {backend.__class__.__name__}: {total} productos."
+        ))
@@ -0,0 +1,153 @@
+import json
+import re
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import Count
+
+from compradoresApp.catalog import catalog_ordering, filter_products
+from compradoresApp.forms import FilterForm
+from compradoresApp.models import Favorite, Notification, Review
+from compradoresApp.pagination import CursorPaginator
+from proyectoApp.models import Perfil, Producto, Tienda, Venta
+
+
+def _catalogo(datos, cursor_desde=None):
+    """
+    La consulta de una página del catálogo, armada como la arma la vista
+    (FilterForm, filter_products, catalog_ordering y su paginador).
+    """
+    form = FilterForm(datos)
+    sort, ordering = catalog_ordering(form)
+    qs = Producto.objects.select_related('tienda').order_by(*ordering)
+    qs = filter_products(qs, form, ranked=not (cursor_desde or sort))
+    if cursor_desde is None:
+        return qs[:12]
+    paginator = CursorPaginator(qs, 12, ordering=ordering)
+    valores = [getattr(cursor_desde, f) for f in paginator.fields]
+    return paginator.page_queryset(valores)
+
+
+def consultas_principales():
+    """Consultas principales de cada vista, con valores representativos."""
+    producto = Producto.objects.select_related('tienda').order_by('id').first()
+    tienda = Tienda.objects.order_by('id').first()
+    perfil = Perfil.objects.order_by('id').first()
+    user = User.objects.order_by('id').first()
+
+    producto_id = producto.pk if producto else 1
+    categoria = producto.categoria if producto else 'x'
+    ubicacion = producto.tienda.ubicacion if producto else 'x'
+    tienda_id = tienda.pk if tienda else 1
+    perfil_id = perfil.pk if perfil else 1
+    user_id = user.pk if user else 1
+
+    productos_tienda = Producto.objects.filter(tienda_id=tienda_id)
+
+    return [
+        ('catalog', _catalogo({})),
+        # COUNT(*) del Paginator con filtro (sin filtro siempre recorre la tabla)
+        ('catalog (conteo, categoría)', filter_products(Producto.objects.order_by(), FilterForm({'category': categoria}))),
+        ('catalog (categoría)', _catalogo({'category': categoria})),
+        ('catalog (ubicación)', _catalogo({'location': ubicacion})),
+        ('catalog (precio)', _catalogo({'min_price': 1000, 'max_price': 5000})),
+        ('catalog (mejor calificados)', _catalogo({'sort': 'rating'})),
+        ('catalog (populares)', _catalogo({'sort': 'popular'})),
+        ('catalog (tendencia)', _catalogo({'sort': 'trending'})),
+        ('catalog (cursor)', _catalogo({}, cursor_desde=producto) if producto else _catalogo({})),
+        ('catalog (categoría, cursor)', _catalogo({'category': categoria}, cursor_desde=producto)
+            if producto else _catalogo({'category': categoria})),
+        ('tienda_context', Tienda.objects.filter(artesano_id=perfil_id)[:1]),
+        ('mi_tienda productos', CursorPaginator(productos_tienda, 24).page_queryset(None)),
+        ('mi_tienda ventas', CursorPaginator(Venta.objects.filter(tienda_id=tienda_id), 20,
+                                             ordering=('-fecha', '-id')).page_queryset(None)),
+        ('mi_tienda no notificadas', Venta.objects.filter(producto_id=producto_id, notificado=False)),
+        ('mi_tienda no notificadas (tienda)', Venta.objects.filter(tienda_id=tienda_id, notificado=False)),
+        ('product_detail reseñas', Review.objects.filter(product_id=producto_id, active=True)
+            .order_by('-created_at', '-id')[:11]),
+        ('product_detail reseñas (mejores)', Review.objects.filter(product_id=producto_id, active=True)
+            .order_by('-rating', '-created_at', '-id')[:11]),
+        ('product_detail reseñas (peores)', Review.objects.filter(product_id=producto_id, active=True)
+            .order_by('rating', 'created_at', 'id')[:11]),
+        ('histograma de reseñas', Review.objects.filter(product_id=producto_id, active=True)
+            .values('rating').annotate(n=Count('id'))),
+        ('favorites_list', Favorite.objects.filter(user_id=user_id).order_by('-created_at', '-id')[:21]),
+        ('notifications_list', Notification.objects.filter(user_id=user_id).order_by('-created_at', '-id')[:21]),
+        ('notificaciones sin leer', Notification.objects.filter(user_id=user_id, read=False)),
+        ('badge ventas sin revisar', Venta.objects.filter(
+            tienda__artesano__user_id=user_id, notificado=False)),
+    ]
+
+
+def escaneos_completos(plan):
+    """Devuelve las tablas recorridas completas según el plan del motor."""
+    vendor = connection.vendor
+    if vendor == 'mysql':
+        tablas = []
+
+        def recorrer(nodo):
+            if isinstance(nodo, dict):
+                if nodo.get('access_type') == 'ALL':
+                    tablas.append(nodo.get('table_name', '?'))
+                for valor in nodo.values():
+                    recorrer(valor)
+            elif isinstance(nodo, list):
+                for valor in nodo:
+                    recorrer(valor)
+
+        recorrer(json.loads(plan))
+        return tablas
+    if vendor == 'sqlite':
+        # "SCAN tabla" sin índice; "SCAN tabla USING INDEX" recorre un índice
+        return [
+            m.group(1) for m in re.finditer(r'SCAN (\S+)(.*)', plan)
+            if 'USING' not in m.group(2) and 'VIRTUAL TABLE' not in m.group(2)
+        ]
+    if vendor == 'postgresql':
+        return re.findall(r'Seq Scan on (\S+)', plan)
+    return []
+
+
+class Command(BaseCommand):
+    help = (
+        "Ejecuta EXPLAIN sobre las consultas principales de las vistas y "
+        "señala los recorridos completos de tabla."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--strict', action='store_true',
+            help="Termina con error si alguna consulta hace un recorrido completo.",
+        )
+        parser.add_argument(
+            '--verbose-plan', action='store_true',
+            help="Muestra el plan completo de cada consulta.",
+        )
+
+    def handle(self, *args, **options):
+        formato = {'format': 'json'} if connection.vendor == 'mysql' else {}
+        problemas = []
+
+        for nombre, qs in consultas_principales():
+            plan = qs.explain(**formato)
+            tablas = escaneos_completos(plan)
+
+            if tablas:
+                problemas.append(nombre)
+                self.stdout.write(self.style.WARNING(
+                    f"[FULL SCAN] {nombre}: {', '.join(tablas)}"
+                ))
+            else:
+                self.stdout.write(self.style.SUCCESS(f"[OK] {nombre}"))
+
+            if options['verbose_plan']:
+                self.stdout.write(plan)
+
+        if problemas:
+            # Con tablas casi vacías el planificador puede preferir un
+            # recorrido completo aunque exista el índice.
+            mensaje = f"{len(problemas)} consulta(s) con recorrido completo de tabla."
+            if options['strict']:
+                raise CommandError(mensaje)
+            self.stdout.write(self.style.WARNING(mensaje))
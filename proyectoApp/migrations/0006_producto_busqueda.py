@@ -0,0 +1,68 @@
+# Índice de búsqueda de texto completo para Producto (ver proyectoApp/search.py)
+
+from django.db import migrations
+
+# Copia fija de proyectoApp/search.py al momento de esta migración: no se
+# importa el código de la app, que puede cambiar después.
+TABLA_FTS = 'proyectoApp_producto_fts'
+TABLA_FULLTEXT = 'proyectoApp_producto_busqueda'
+COLUMNAS = ('nombre', 'descripcion', 'categoria', 'ubicacion')
+
+
+def _llenar(apps, schema_editor, tabla, clave):
+    qn = schema_editor.connection.ops.quote_name
+    Producto = apps.get_model('proyectoApp', 'Producto')
+    Tienda = apps.get_model('proyectoApp', 'Tienda')
+    schema_editor.execute(
+        f"INSERT INTO {qn(tabla)} ({clave}, {', '.join(COLUMNAS)}) "
+        f"SELECT p.id, p.nombre, p.descripcion, p.categoria, t.ubicacion "
+        f"FROM {qn(Producto._meta.db_table)} p "
+        f"INNER JOIN {qn(Tienda._meta.db_table)} t ON t.id = p.tienda_id"
+    )
+
+
+def crear_indice(apps, schema_editor):
+    connection = schema_editor.connection
+    qn = connection.ops.quote_name
+
+    if connection.vendor == 'sqlite':
+        schema_editor.execute(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {qn(TABLA_FTS)} USING fts5("
+            f"{', '.join(COLUMNAS)}, tokenize = 'unicode61 remove_diacritics 2')"
+        )
+        schema_editor.execute(f"DELETE FROM {qn(TABLA_FTS)}")
+        _llenar(apps, schema_editor, TABLA_FTS, 'rowid')
+    elif connection.vendor == 'mysql':
+        schema_editor.execute(
+            f"CREATE TABLE IF NOT EXISTS {qn(TABLA_FULLTEXT)} ("
+            f"producto_id BIGINT NOT NULL PRIMARY KEY, "
+            f"nombre VARCHAR(100) NOT NULL, "
+            f"descripcion LONGTEXT NOT NULL, "
+            f"categoria VARCHAR(100) NOT NULL, "
+            f"ubicacion VARCHAR(100) NOT NULL, "
+            f"FULLTEXT KEY producto_busqueda_ft ({', '.join(COLUMNAS)})"
+            f") ENGINE=InnoDB DEFAULT CHARSET=utf8mb4"
+        )
+        schema_editor.execute(f"DELETE FROM {qn(TABLA_FULLTEXT)}")
+        _llenar(apps, schema_editor, TABLA_FULLTEXT, 'producto_id')
+
+
+def eliminar_indice(apps, schema_editor):
+    connection = schema_editor.connection
+    qn = connection.ops.quote_name
+
+    if connection.vendor == 'sqlite':
+        schema_editor.execute(f"DROP TABLE IF EXISTS {qn(TABLA_FTS)}")
+    elif connection.vendor == 'mysql':
+        schema_editor.execute(f"DROP TABLE IF EXISTS {qn(TABLA_FULLTEXT)}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('proyectoApp', '0005_rename_verificado_perfil_correo_validado_and_more'),
+    ]
+
+    operations = [
+        migrations.RunPython(crear_indice, eliminar_indice),
+    ]
@@ -0,0 +1,82 @@
+# Generated by Django 5.0.14 on 2026-10-18 18:41
+
+from django.db import migrations, models
+from django.db.models import Count
+
+from proyectoApp import contadores
+
+
+def completar(apps, schema_editor):
+    # Los contadores nuevos parten con los valores actuales (como recalcular_contadores)
+    db = schema_editor.connection.alias
+    Producto = apps.get_model('proyectoApp', 'Producto')
+    Tienda = apps.get_model('proyectoApp', 'Tienda')
+    Resena = apps.get_model('proyectoApp', 'Resena')
+    Review = apps.get_model('compradoresApp', 'Review')
+    Favorite = apps.get_model('compradoresApp', 'Favorite')
+
+    contadores.recontar(
+        Producto.objects.using(db),
+        **contadores.valores_resenas(Review.objects.using(db).filter(active=True), 'product', 'rating'),
+        favoritos_total=contadores.subconsulta(Favorite.objects.using(db), 'product', Count('id')),
+    )
+    contadores.recontar(
+        Tienda.objects.using(db),
+        **contadores.valores_resenas(Resena.objects.using(db).filter(aprobada=True), 'tienda', 'calificacion'),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('proyectoApp', '0007_indices_consultas'),
+        # Review y Favorite, para completar los contadores
+        ('compradoresApp', '0003_indices_consultas'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='producto',
+            name='calificacion_promedio',
+            field=models.FloatField(default=0),
+        ),
+        migrations.AddField(
+            model_name='producto',
+            name='favoritos_total',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='producto',
+            name='resenas_suma',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='producto',
+            name='resenas_total',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='tienda',
+            name='calificacion_promedio',
+            field=models.FloatField(default=0),
+        ),
+        migrations.AddField(
+            model_name='tienda',
+            name='resenas_suma',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='tienda',
+            name='resenas_total',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(completar, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='producto',
+            index=models.Index(fields=['calificacion_promedio', 'id'], name='producto_calificacion_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='producto',
+            index=models.Index(fields=['favoritos_total', 'id'], name='producto_favoritos_idx'),
+        ),
+    ]
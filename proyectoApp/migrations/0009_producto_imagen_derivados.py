@@ -0,0 +1,18 @@
+# Generated by Django 5.0.14 on 2026-10-18 18:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('proyectoApp', '0008_contadores_calificacion'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='producto',
+            name='imagen_derivados',
+            field=models.BooleanField(default=False, editable=False),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.0.14 on 2026-10-18 18:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('proyectoApp', '0009_producto_imagen_derivados'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='producto',
+            name='stock',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+    ]
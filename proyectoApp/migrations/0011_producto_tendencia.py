@@ -0,0 +1,22 @@
+# Generated by Django 5.0.14 on 2026-10-18 19:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('proyectoApp', '0010_producto_stock'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='producto',
+            name='tendencia',
+            field=models.FloatField(default=0),
+        ),
+        migrations.AddIndex(
+            model_name='producto',
+            index=models.Index(fields=['tendencia', 'id'], name='producto_tendencia_idx'),
+        ),
+    ]
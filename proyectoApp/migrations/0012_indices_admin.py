@@ -0,0 +1,27 @@
+# Generated by Django 5.0.14 on 2026-10-18 19:15
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('proyectoApp', '0011_producto_tendencia'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='perfil',
+            index=models.Index(fields=['rol'], name='perfil_rol_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='resena',
+            index=models.Index(fields=['aprobada'], name='resena_aprobada_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='tienda',
+            index=models.Index(fields=['aprobada'], name='tienda_aprobada_idx'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.0.14 on 2026-10-18 19:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('proyectoApp', '0012_indices_admin'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='tienda',
+            index=models.Index(fields=['ubicacion'], name='tienda_ubicacion_idx'),
+        ),
+    ]
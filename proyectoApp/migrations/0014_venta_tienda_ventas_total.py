@@ -0,0 +1,55 @@
+# Venta.tienda (copia de producto.tienda) y Producto.ventas_total, con sus
+# valores para las filas existentes.
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def completar(apps, schema_editor):
+    db = schema_editor.connection.alias
+    Producto = apps.get_model('proyectoApp', 'Producto')
+    Venta = apps.get_model('proyectoApp', 'Venta')
+    Venta.objects.using(db).update(tienda_id=Subquery(
+        Producto.objects.using(db).filter(pk=OuterRef('producto_id')).values('tienda_id')[:1]
+    ))
+    Producto.objects.using(db).update(ventas_total=Coalesce(Subquery(
+        Venta.objects.using(db).filter(producto_id=OuterRef('pk')).order_by()
+        .values('producto_id').annotate(n=Count('id')).values('n')[:1],
+        output_field=IntegerField(),
+    ), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('proyectoApp', '0013_tienda_ubicacion'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='producto',
+            name='ventas_total',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='venta',
+            name='tienda',
+            field=models.ForeignKey(db_index=False, editable=False, null=True, on_delete=django.db.models.deletion.CASCADE, to='proyectoApp.tienda'),
+        ),
+        migrations.RunPython(completar, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='venta',
+            name='tienda',
+            field=models.ForeignKey(db_index=False, editable=False, on_delete=django.db.models.deletion.CASCADE, to='proyectoApp.tienda'),
+        ),
+        migrations.AddIndex(
+            model_name='venta',
+            index=models.Index(fields=['tienda', 'fecha', 'id'], name='venta_tienda_fecha_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='venta',
+            index=models.Index(fields=['tienda', 'notificado'], name='venta_tienda_notif_idx'),
+        ),
+    ]
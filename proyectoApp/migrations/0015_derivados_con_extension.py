@@ -0,0 +1,23 @@
+# Los derivados ahora conservan la extensión del original (foto.jpg.320w.webp):
+# los generados con el nombre anterior ya no se encuentran. Los productos
+# vuelven a usar el original hasta que `manage.py generar_miniaturas` los rehaga.
+
+from django.db import migrations
+
+
+def marcar_sin_derivados(apps, schema_editor):
+    Producto = apps.get_model('proyectoApp', 'Producto')
+    Producto.objects.using(schema_editor.connection.alias).filter(imagen_derivados=True).update(
+        imagen_derivados=False,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('proyectoApp', '0014_venta_tienda_ventas_total'),
+    ]
+
+    operations = [
+        migrations.RunPython(marcar_sin_derivados, migrations.RunPython.noop),
+    ]
@@ -1,6 +1,8 @@
 from django.db import models
 from django.contrib.auth.models import User
 
+from . import imagenes
+
 # PERFIL DE USUARIO
 class Perfil(models.Model):
     ROLES = [
@@ -18,6 +20,12 @@ class Perfil(models.Model):
     correo_validado = models.BooleanField(default=False)
     telefono_validado = models.BooleanField(default=False)
 
+    class Meta:
+        indexes = [
+            # Filtro por rol del admin
+            models.Index(fields=['rol'], name='perfil_rol_idx'),
+        ]
+
     def __str__(self):
         return f"{self.user.username} ({self.rol})"
 
@@ -34,6 +42,19 @@ class Tienda(models.Model):
     activa = models.BooleanField(default=True)
     aprobada = models.BooleanField(default=False)
 
+    # Contadores desnormalizados (ver proyectoApp/contadores.py)
+    resenas_total = models.PositiveIntegerField(default=0)
+    resenas_suma = models.PositiveIntegerField(default=0)
+    calificacion_promedio = models.FloatField(default=0)
+
+    class Meta:
+        indexes = [
+            # Tiendas pendientes de aprobación (filtro del admin)
+            models.Index(fields=['aprobada'], name='tienda_aprobada_idx'),
+            # Filtro de ubicación del catálogo (valor exacto, ver compradoresApp/catalog.py)
+            models.Index(fields=['ubicacion'], name='tienda_ubicacion_idx'),
+        ]
+
     def __str__(self):
         return self.nombre
 
@@ -46,19 +67,78 @@ class Producto(models.Model):
     precio = models.IntegerField()
     categoria = models.CharField(max_length=100)
     imagen = models.ImageField(upload_to='productos/', blank=True, null=True)
+    # True cuando existen los derivados WebP de la imagen (ver proyectoApp/imagenes.py)
+    imagen_derivados = models.BooleanField(default=False, editable=False)
     fecha_creacion = models.DateTimeField(auto_now_add=True)
+    # Unidades disponibles; None = sin control de stock (ver proyectoApp/inventario.py)
+    stock = models.PositiveIntegerField(blank=True, null=True)
+
+    # Contadores desnormalizados (ver proyectoApp/contadores.py)
+    resenas_total = models.PositiveIntegerField(default=0)
+    resenas_suma = models.PositiveIntegerField(default=0)
+    calificacion_promedio = models.FloatField(default=0)
+    favoritos_total = models.PositiveIntegerField(default=0)
+    ventas_total = models.PositiveIntegerField(default=0)
+    # Puntaje de tendencia con decaimiento exponencial (ver compradoresApp/trending.py)
+    tendencia = models.FloatField(default=0)
+
+    class Meta:
+        indexes = [
+            # Catálogo: orden por fecha y paginación por cursor (fecha, id)
+            models.Index(fields=['fecha_creacion', 'id'], name='producto_fecha_id_idx'),
+            models.Index(fields=['categoria', 'fecha_creacion'], name='producto_cat_fecha_idx'),
+            models.Index(fields=['precio'], name='producto_precio_idx'),
+            # Mi tienda: productos de una tienda, más recientes primero
+            models.Index(fields=['tienda', 'fecha_creacion'], name='producto_tienda_fecha_idx'),
+            # Orden por calificación y popularidad
+            models.Index(fields=['calificacion_promedio', 'id'], name='producto_calificacion_idx'),
+            models.Index(fields=['favoritos_total', 'id'], name='producto_favoritos_idx'),
+            models.Index(fields=['tendencia', 'id'], name='producto_tendencia_idx'),
+        ]
 
     def __str__(self):
         return self.nombre
 
+    # Miniatura para tarjetas; usa el original si aún no hay derivados
+    @property
+    def imagen_thumb_url(self):
+        if not self.imagen:
+            return ''
+        if self.imagen_derivados:
+            return imagenes.url_derivado(self.imagen, imagenes.ANCHOS[0])
+        return self.imagen.url
+
+    @property
+    def imagen_srcset(self):
+        if self.imagen and self.imagen_derivados:
+            return imagenes.srcset(self.imagen)
+        return ''
+
 
 # VENTAS
 class Venta(models.Model):
     producto = models.ForeignKey('Producto', on_delete=models.CASCADE)
+    # Copia de producto.tienda: las ventas de una tienda se leen sin JOIN y por
+    # índice. Sin índice propio: lo cubren los de (tienda, ...)
+    tienda = models.ForeignKey(Tienda, on_delete=models.CASCADE, editable=False, db_index=False)
     comprador = models.ForeignKey(User, on_delete=models.CASCADE)
     fecha = models.DateTimeField(auto_now_add=True)
     notificado = models.BooleanField(default=False)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['producto', 'fecha'], name='venta_producto_fecha_idx'),
+            models.Index(fields=['producto', 'notificado', 'fecha'], name='venta_prod_notif_fecha_idx'),
+            # Mi tienda: ventas recientes por cursor (fecha, id) y las sin revisar
+            models.Index(fields=['tienda', 'fecha', 'id'], name='venta_tienda_fecha_idx'),
+            models.Index(fields=['tienda', 'notificado'], name='venta_tienda_notif_idx'),
+        ]
+
+    def save(self, *args, **kwargs):
+        if self.tienda_id is None:
+            self.tienda_id = self.producto.tienda_id
+        super().save(*args, **kwargs)
+
     def __str__(self):
         return f"Venta de {self.producto.nombre} a {self.comprador.username}"
 
@@ -74,5 +154,11 @@ class Resena(models.Model):
     # Aprobación admin
     aprobada = models.BooleanField(default=False)
 
+    class Meta:
+        indexes = [
+            # Reseñas pendientes de aprobación (filtro del admin)
+            models.Index(fields=['aprobada'], name='resena_aprobada_idx'),
+        ]
+
     def __str__(self):
         return f"Reseña de {self.usuario.username} en {self.tienda.nombre}"
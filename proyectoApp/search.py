@@ -0,0 +1,210 @@
+# proyectoApp/search.py
+"""
+Búsqueda de texto completo sobre Producto (nombre, descripción, categoría y
+ubicación de la tienda) respaldada por un índice.
+
+El backend se elige según el motor de base de datos (o con
+settings.PRODUCT_SEARCH_BACKEND):
+- MySQL: tabla espejo con índice FULLTEXT.
+- SQLite: tabla virtual FTS5 (entorno local y pruebas).
+- Otros: icontains, sin índice.
+
+El índice se mantiene al día con las señales de Producto/Tienda
+(ver proyectoApp/signals.py) y se reconstruye con `manage.py reindexar_busqueda`.
+"""
+import re
+from functools import lru_cache
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import Q
+from django.utils.module_loading import import_string
+
+TABLA_FTS = 'proyectoApp_producto_fts'
+TABLA_FULLTEXT = 'proyectoApp_producto_busqueda'
+COLUMNAS = ('nombre', 'descripcion', 'categoria', 'ubicacion')
+
+# Límite de términos por consulta, para acotar el costo de un MATCH
+MAX_TERMINOS = 8
+
+
+def terminos(texto):
+    return re.findall(r'\w+', texto or '')[:MAX_TERMINOS]
+
+
+def _qn(nombre):
+    return connection.ops.quote_name(nombre)
+
+
+def _tabla_producto():
+    from .models import Producto
+    return Producto._meta.db_table
+
+
+class BaseSearchBackend:
+    def index(self, producto):
+        pass
+
+    def remove(self, producto_id):
+        pass
+
+    def index_many(self, producto_ids):
+        pass
+
+    def update_ubicacion(self, tienda):
+        pass
+
+    def rebuild(self):
+        return 0
+
+    def search(self, queryset, texto, ranked=True):
+        raise NotImplementedError
+
+
+class IContainsSearchBackend(BaseSearchBackend):
+    """Sin índice: sólo para motores sin soporte de texto completo."""
+
+    def search(self, queryset, texto, ranked=True):
+        for t in terminos(texto):
+            queryset = queryset.filter(
+                Q(nombre__icontains=t) | Q(descripcion__icontains=t)
+                | Q(categoria__icontains=t) | Q(tienda__ubicacion__icontains=t)
+            )
+        return queryset
+
+
+class _TablaIndiceBackend(BaseSearchBackend):
+    """Lógica común de los backends que mantienen una tabla de índice aparte."""
+    tabla = None
+    clave = None
+
+    def _insert_sql(self):
+        raise NotImplementedError
+
+    def index(self, producto):
+        tienda = producto.tienda
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"DELETE FROM {_qn(self.tabla)} WHERE {self.clave} = %s", [producto.pk]
+            )
+            cursor.execute(self._insert_sql(), [
+                producto.pk, producto.nombre, producto.descripcion,
+                producto.categoria, tienda.ubicacion,
+            ])
+
+    def remove(self, producto_id):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"DELETE FROM {_qn(self.tabla)} WHERE {self.clave} = %s", [producto_id]
+            )
+
+    def _insert_select_sql(self, where=''):
+        from .models import Tienda
+        return (
+            f"INSERT INTO {_qn(self.tabla)} ({self.clave}, {', '.join(COLUMNAS)}) "
+            f"SELECT p.id, p.nombre, p.descripcion, p.categoria, t.ubicacion "
+            f"FROM {_qn(_tabla_producto())} p "
+            f"INNER JOIN {_qn(Tienda._meta.db_table)} t ON t.id = p.tienda_id{where}"
+        )
+
+    def index_many(self, producto_ids):
+        # Para cargas masivas (bulk_create no emite señales): dos sentencias por lote
+        producto_ids = list(producto_ids)
+        if not producto_ids:
+            return
+        marcas = ', '.join(['%s'] * len(producto_ids))
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"DELETE FROM {_qn(self.tabla)} WHERE {self.clave} IN ({marcas})", producto_ids
+            )
+            cursor.execute(self._insert_select_sql(f" WHERE p.id IN ({marcas})"), producto_ids)
+
+    def update_ubicacion(self, tienda):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"UPDATE {_qn(self.tabla)} SET ubicacion = %s "
+                f"WHERE {self.clave} IN (SELECT id FROM {_qn(_tabla_producto())} WHERE tienda_id = %s)",
+                [tienda.ubicacion, tienda.pk],
+            )
+
+    def rebuild(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {_qn(self.tabla)}")
+            cursor.execute(self._insert_select_sql())
+            return cursor.rowcount
+
+
+class SQLiteFTS5SearchBackend(_TablaIndiceBackend):
+    tabla = TABLA_FTS
+    clave = 'rowid'
+
+    def _insert_sql(self):
+        return (
+            f"INSERT INTO {_qn(self.tabla)} (rowid, {', '.join(COLUMNAS)}) "
+            f"VALUES (%s, %s, %s, %s, %s)"
+        )
+
+    def search(self, queryset, texto, ranked=True):
+        palabras = terminos(texto)
+        if not palabras:
+            return queryset
+        # Cada término como prefijo entre comillas: evita errores de sintaxis
+        # de FTS5 con lo que escriba el usuario.
+        match = ' '.join('"%s"*' % p for p in palabras)
+        fts = _qn(self.tabla)
+        queryset = queryset.extra(
+            tables=[self.tabla],
+            where=[f"{fts}.rowid = {_qn(_tabla_producto())}.id", f"{fts} MATCH %s"],
+            params=[match],
+            # bm25 es negativo: mientras más bajo, más relevante
+            select={'relevancia': f"-bm25({fts})"} if ranked else None,
+        )
+        if ranked:
+            queryset = queryset.order_by('-relevancia', '-id')
+        return queryset
+
+
+class MySQLFullTextSearchBackend(_TablaIndiceBackend):
+    tabla = TABLA_FULLTEXT
+    clave = 'producto_id'
+
+    def _insert_sql(self):
+        return (
+            f"INSERT INTO {_qn(self.tabla)} (producto_id, {', '.join(COLUMNAS)}) "
+            f"VALUES (%s, %s, %s, %s, %s)"
+        )
+
+    def search(self, queryset, texto, ranked=True):
+        palabras = terminos(texto)
+        if not palabras:
+            return queryset
+        boolean = ' '.join('+%s*' % p for p in palabras)
+        idx = _qn(self.tabla)
+        match = f"MATCH({', '.join(f'{idx}.{c}' for c in COLUMNAS)})"
+        queryset = queryset.extra(
+            tables=[self.tabla],
+            where=[
+                f"{idx}.producto_id = {_qn(_tabla_producto())}.id",
+                f"{match} AGAINST (%s IN BOOLEAN MODE)",
+            ],
+            params=[boolean],
+            select={'relevancia': f"{match} AGAINST (%s IN NATURAL LANGUAGE MODE)"} if ranked else None,
+            select_params=[' '.join(palabras)] if ranked else None,
+        )
+        if ranked:
+            queryset = queryset.order_by('-relevancia', '-id')
+        return queryset
+
+
+BACKENDS_POR_MOTOR = {
+    'sqlite': 'proyectoApp.search.SQLiteFTS5SearchBackend',
+    'mysql': 'proyectoApp.search.MySQLFullTextSearchBackend',
+}
+
+
+@lru_cache(maxsize=None)
+def get_search_backend():
+    ruta = getattr(settings, 'PRODUCT_SEARCH_BACKEND', None) or BACKENDS_POR_MOTOR.get(
+        connection.vendor, 'proyectoApp.search.IContainsSearchBackend'
+    )
+    return import_string(ruta)()
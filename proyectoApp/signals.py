@@ -0,0 +1,139 @@
+# proyectoApp/signals.py
+from django.db.models.signals import post_save, post_delete, pre_save
+from django.dispatch import receiver
+
+from . import artesano, contadores, fragmentos, imagenes
+from .models import Perfil, Producto, Resena, Tienda, Venta
+from .search import get_search_backend
+
+
+# --------------------------
+# ÍNDICE DE BÚSQUEDA
+# --------------------------
+@receiver(post_save, sender=Producto)
+def indexar_producto(sender, instance, raw=False, **kwargs):
+    if not raw:
+        get_search_backend().index(instance)
+
+
+@receiver(post_delete, sender=Producto)
+def desindexar_producto(sender, instance, **kwargs):
+    get_search_backend().remove(instance.pk)
+
+
+# --------------------------
+# DERIVADOS DE IMAGEN
+# --------------------------
+@receiver(pre_save, sender=Producto)
+def detectar_imagen_nueva(sender, instance, raw=False, **kwargs):
+    # Un archivo recién subido aún no está "committed" antes de guardar
+    instance._imagen_nueva = bool(instance.imagen) and not instance.imagen._committed and not raw
+    instance._imagen_anterior = None
+    if instance._imagen_nueva and instance.pk:
+        instance._imagen_anterior = (
+            Producto.objects.filter(pk=instance.pk).values_list('imagen', flat=True).first()
+        )
+
+
+@receiver(post_save, sender=Producto)
+def generar_derivados_imagen(sender, instance, **kwargs):
+    if not getattr(instance, '_imagen_nueva', False):
+        return
+    if instance._imagen_anterior:
+        imagenes.eliminar_derivados(instance._imagen_anterior)
+    instance.imagen_derivados = imagenes.generar_derivados(instance.imagen.name)
+    Producto.objects.filter(pk=instance.pk).update(imagen_derivados=instance.imagen_derivados)
+    instance._imagen_nueva = False
+
+
+@receiver(post_delete, sender=Producto)
+def eliminar_derivados_imagen(sender, instance, **kwargs):
+    if instance.imagen and instance.imagen_derivados:
+        imagenes.eliminar_derivados(instance.imagen.name)
+
+
+@receiver(post_save, sender=Tienda)
+def reindexar_ubicacion(sender, instance, created=False, raw=False, **kwargs):
+    # Una tienda nueva aún no tiene productos que actualizar
+    if not raw and not created:
+        get_search_backend().update_ubicacion(instance)
+
+
+# --------------------------
+# ARTESANO ACTUAL (caché por usuario)
+# --------------------------
+@receiver(post_save, sender=Perfil)
+@receiver(post_delete, sender=Perfil)
+def invalidar_artesano_perfil(sender, instance, **kwargs):
+    artesano.invalidar(instance.user_id)
+
+
+@receiver(post_save, sender=Tienda)
+@receiver(post_delete, sender=Tienda)
+def invalidar_artesano_tienda(sender, instance, **kwargs):
+    user_id = Perfil.objects.filter(pk=instance.artesano_id).values_list('user_id', flat=True).first()
+    if user_id is not None:
+        artesano.invalidar(user_id)
+
+
+# --------------------------
+# CONTADORES DE RESEÑAS DE TIENDA
+# --------------------------
+@receiver(pre_save, sender=Resena)
+def recordar_resena(sender, instance, raw=False, **kwargs):
+    instance._anterior = None
+    if instance.pk and not raw:
+        instance._anterior = (
+            Resena.objects.filter(pk=instance.pk)
+            .values_list('tienda_id', 'aprobada', 'calificacion').first()
+        )
+
+
+@receiver(post_save, sender=Resena)
+def contar_resena(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    anterior = getattr(instance, '_anterior', None)
+    nuevo = (instance.aprobada, instance.calificacion)
+    if anterior and anterior[0] != instance.tienda_id:
+        contadores.aplicar_cambio_resena(Tienda, anterior[0], anterior[1:], (False, 0))
+        anterior = None
+    contadores.aplicar_cambio_resena(Tienda, instance.tienda_id, anterior[1:] if anterior else (False, 0), nuevo)
+
+
+@receiver(post_delete, sender=Resena)
+def descontar_resena(sender, instance, **kwargs):
+    contadores.aplicar_cambio_resena(
+        Tienda, instance.tienda_id, (instance.aprobada, instance.calificacion), (False, 0)
+    )
+
+
+# --------------------------
+# CONTADOR DE VENTAS
+# --------------------------
+@receiver(post_save, sender=Venta)
+def contar_venta(sender, instance, created=False, raw=False, **kwargs):
+    if created and not raw:
+        contadores.aplicar_venta(Producto, instance.producto_id, 1)
+
+
+@receiver(post_delete, sender=Venta)
+def descontar_venta(sender, instance, **kwargs):
+    contadores.aplicar_venta(Producto, instance.producto_id, -1)
+
+
+# --------------------------
+# VERSIONES PARA CACHÉ DE TARJETAS
+# --------------------------
+@receiver(post_save, sender=Producto)
+@receiver(post_delete, sender=Producto)
+def versionar_producto(sender, instance, **kwargs):
+    fragmentos.invalidar_producto(instance.pk)
+
+
+@receiver(post_save, sender=Tienda)
+@receiver(post_delete, sender=Tienda)
+def versionar_tienda(sender, instance, created=False, **kwargs):
+    fragmentos.invalidar_tienda(instance.pk)
+    if not created:
+        fragmentos.invalidar_productos_de_tienda(instance.pk)
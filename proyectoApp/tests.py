@@ -1,3 +1,650 @@
-from django.test import TestCase
+import csv
+import json
+import os
+import shutil
+import tempfile
+import zipfile
+from datetime import datetime
+from io import BytesIO, StringIO
+from types import SimpleNamespace
+from unittest import mock
 
-# Create your tests here.
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.db.models.signals import pre_save
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from PIL import Image
+
+from compradoresApp import badges
+from compradoresApp.models import Favorite, Order, Review
+
+from . import artesano, fragmentos, imagenes
+from .models import Perfil, Producto, Resena, Tienda, Venta
+from .search import get_search_backend
+
+
+def crear_tienda(usuario='artesano', ubicacion='Valparaíso'):
+    user = User.objects.create_user(usuario, password='clave12345')
+    perfil = Perfil.objects.create(user=user, rol='artesano')
+    return Tienda.objects.create(artesano=perfil, nombre=f'Taller de {usuario}', ubicacion=ubicacion)
+
+
+# Las pruebas no corren collectstatic: sin manifiesto de archivos con hash
+sin_manifiesto = override_settings(STORAGES={
+    **settings.STORAGES,
+    'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'},
+})
+
+
+def media_temporal(test):
+    """MEDIA_ROOT en un directorio temporal que se borra al terminar la prueba."""
+    directorio = tempfile.mkdtemp()
+    test.addCleanup(shutil.rmtree, directorio)
+    media = override_settings(MEDIA_ROOT=os.path.join(directorio, 'media'))
+    media.enable()
+    test.addCleanup(media.disable)
+    return directorio
+
+
+def imagen(ancho=8, alto=8, formato='PNG'):
+    salida = BytesIO()
+    Image.new('RGB', (ancho, alto), 'red').save(salida, formato)
+    return salida.getvalue()
+
+
+def crear_producto(tienda, nombre='Vasija', **campos):
+    campos = {'descripcion': 'Greda cocida', 'precio': 15000, 'categoria': 'Cerámica', **campos}
+    return Producto.objects.create(tienda=tienda, nombre=nombre, **campos)
+
+
+class BusquedaTests(TestCase):
+    """El índice de búsqueda se mantiene con las señales de Producto y Tienda."""
+
+    def setUp(self):
+        self.tienda = crear_tienda()
+        self.vasija = crear_producto(self.tienda, 'Vasija de greda')
+        self.manta = crear_producto(self.tienda, 'Manta', descripcion='Lana de oveja', categoria='Textil')
+
+    def buscar(self, texto, ranked=True):
+        return list(get_search_backend().search(Producto.objects.all(), texto, ranked=ranked))
+
+    def test_busca_por_columnas_y_prefijo(self):
+        self.assertEqual(self.buscar('vasi'), [self.vasija])
+        self.assertEqual(self.buscar('lana'), [self.manta])
+        self.assertEqual(self.buscar('textil'), [self.manta])
+        self.assertCountEqual(self.buscar('valpara'), [self.vasija, self.manta])
+        # Todos los términos deben aparecer
+        self.assertEqual(self.buscar('manta greda'), [])
+
+    def test_sintaxis_del_usuario_no_rompe_la_consulta(self):
+        self.assertEqual(self.buscar('"vasija" -(*'), [self.vasija])
+        self.assertEqual(len(self.buscar('   ')), 2)
+
+    def test_editar_y_eliminar_actualizan_el_indice(self):
+        self.vasija.nombre = 'Cántaro'
+        self.vasija.save()
+        self.assertEqual(self.buscar('vasija'), [])
+        self.assertEqual(self.buscar('cántaro'), [self.vasija])
+
+        self.vasija.delete()
+        self.assertEqual(self.buscar('cántaro'), [])
+
+    def test_cambio_de_ubicacion_de_la_tienda(self):
+        self.tienda.ubicacion = 'Chiloé'
+        self.tienda.save()
+        self.assertEqual(len(self.buscar('chiloé', ranked=False)), 2)
+        self.assertEqual(self.buscar('valparaíso'), [])
+
+    def test_reconstruir_el_indice(self):
+        # bulk_create no emite señales: el producto queda fuera hasta reindexar
+        suelto, = Producto.objects.bulk_create([
+            Producto(tienda=self.tienda, nombre='Cuchara de raulí', descripcion='', precio=3000,
+                     categoria='Madera'),
+        ])
+        self.assertEqual(self.buscar('raulí'), [])
+        self.assertEqual(get_search_backend().rebuild(), 3)
+        self.assertEqual([p.pk for p in self.buscar('raulí')], [suelto.pk])
+
+
+class ArtesanoActualTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user('artesano', password='clave12345')
+        self.perfil = Perfil.objects.create(user=self.user, rol='artesano')
+
+    def resolver(self):
+        return artesano.get_artesano(SimpleNamespace(user=self.user))
+
+    def test_queda_en_cache_por_usuario(self):
+        self.assertFalse(self.resolver().has_shop)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.resolver().perfil, self.perfil)
+
+    def test_crear_y_eliminar_tienda_invalida(self):
+        self.resolver()
+        tienda = Tienda.objects.create(artesano=self.perfil, nombre='Taller', ubicacion='Valparaíso')
+        self.assertEqual(self.resolver().tienda, tienda)
+
+        tienda.delete()
+        self.assertFalse(self.resolver().has_shop)
+
+    def test_eliminar_perfil_invalida(self):
+        self.resolver()
+        self.perfil.delete()
+        self.assertFalse(self.resolver())
+
+    def test_cache_desactualizado_no_permite_una_segunda_tienda(self):
+        self.client.force_login(self.user)
+        self.resolver()
+        # Tienda creada sin pasar por las señales: el caché sigue diciendo "sin tienda"
+        Tienda.objects.bulk_create([Tienda(artesano=self.perfil, nombre='Taller', ubicacion='Valparaíso')])
+        self.assertFalse(self.resolver().has_shop)
+
+        response = self.client.post(reverse('crear_tienda'), {
+            'nombre': 'Otra', 'descripcion': '', 'ubicacion': 'Chiloé',
+        })
+        self.assertRedirects(response, reverse('mi_tienda'), fetch_redirect_response=False)
+        self.assertEqual(Tienda.objects.filter(artesano=self.perfil).count(), 1)
+        self.assertTrue(self.resolver().has_shop)
+
+
+class ContadoresTests(TestCase):
+    """Los contadores desnormalizados siguen a las filas que resumen."""
+
+    def setUp(self):
+        self.tienda = crear_tienda()
+        self.producto = crear_producto(self.tienda)
+        self.compradores = [User.objects.create_user(f'comprador{i}') for i in range(3)]
+
+    def contadores(self, obj=None):
+        obj = obj or self.producto
+        obj.refresh_from_db()
+        return obj.resenas_total, obj.resenas_suma, obj.calificacion_promedio
+
+    def test_resenas_de_producto(self):
+        a, b = [Review.objects.create(product=self.producto, author=u, rating=r)
+                for u, r in zip(self.compradores, (5, 2))]
+        self.assertEqual(self.contadores(), (2, 7, 3.5))
+
+        b.rating = 4
+        b.save()
+        self.assertEqual(self.contadores(), (2, 9, 4.5))
+
+        a.active = False
+        a.save()
+        self.assertEqual(self.contadores(), (1, 4, 4.0))
+
+        b.delete()
+        self.assertEqual(self.contadores(), (0, 0, 0.0))
+        # Borrar una desactivada no descuenta nada
+        a.delete()
+        self.assertEqual(self.contadores(), (0, 0, 0.0))
+
+    def test_favoritos(self):
+        favoritos = [Favorite.objects.create(user=u, product=self.producto) for u in self.compradores]
+        self.producto.refresh_from_db()
+        self.assertEqual(self.producto.favoritos_total, 3)
+
+        favoritos[0].delete()
+        self.producto.refresh_from_db()
+        self.assertEqual(self.producto.favoritos_total, 2)
+
+    def test_resenas_de_tienda_cuentan_al_aprobarse(self):
+        resena = Resena.objects.create(tienda=self.tienda, usuario=self.compradores[0],
+                                       calificacion=4, comentario='Muy bueno')
+        self.assertEqual(self.contadores(self.tienda), (0, 0, 0.0))
+
+        resena.aprobada = True
+        resena.save()
+        self.assertEqual(self.contadores(self.tienda), (1, 4, 4.0))
+
+        resena.delete()
+        self.assertEqual(self.contadores(self.tienda), (0, 0, 0.0))
+
+    def test_editar_producto_no_pisa_los_contadores(self):
+        self.client.force_login(self.tienda.artesano.user)
+
+        def favorito_concurrente(sender, instance, **kwargs):
+            # Otro request marca favorito después de que la vista leyó el producto
+            Favorite.objects.create(user=self.compradores[0], product=instance)
+
+        pre_save.connect(favorito_concurrente, sender=Producto)
+        try:
+            self.client.post(reverse('editar_producto', args=[self.producto.pk]), {
+                'nombre': 'Vasija grande', 'precio': '18000', 'categoria': 'Cerámica',
+                'descripcion': 'Greda', 'stock': '', 'stock_original': '',
+            })
+        finally:
+            pre_save.disconnect(favorito_concurrente, sender=Producto)
+
+        self.producto.refresh_from_db()
+        self.assertEqual(self.producto.nombre, 'Vasija grande')
+        self.assertEqual(self.producto.favoritos_total, 1)
+
+    def test_recalcular_contadores_corrige_desvios(self):
+        Review.objects.create(product=self.producto, author=self.compradores[0], rating=3)
+        Favorite.objects.create(user=self.compradores[0], product=self.producto)
+        Producto.objects.update(resenas_total=9, resenas_suma=1, calificacion_promedio=0.1, favoritos_total=0)
+
+        call_command('recalcular_contadores', lote=1, stdout=StringIO())
+
+        self.assertEqual(self.contadores(), (1, 3, 3.0))
+        self.assertEqual(self.producto.favoritos_total, 1)
+
+
+class ImportarProductosTests(TestCase):
+    def setUp(self):
+        self.tienda = crear_tienda()
+        self.dir = media_temporal(self)
+
+    def archivo(self, nombre, contenido):
+        ruta = os.path.join(self.dir, nombre)
+        with open(ruta, 'wb') as f:
+            f.write(contenido.encode() if isinstance(contenido, str) else contenido)
+        return ruta
+
+    def importar(self, *args, **opciones):
+        salida, errores = StringIO(), StringIO()
+        call_command('importar_productos', str(self.tienda.pk), *args, stdout=salida, stderr=errores, **opciones)
+        return salida.getvalue(), errores.getvalue()
+
+    def test_csv_con_filas_invalidas(self):
+        ruta = self.archivo('productos.csv', (
+            'nombre,precio,categoria,descripcion,stock\n'
+            'Vasija,15.000,Cerámica,Greda,3\n'
+            ',1000,Cerámica,,\n'
+            'Manta,caro,Textil,,\n'
+            'Telar,42000,Textil,Lana de oveja,\n'
+        ))
+
+        salida, errores = self.importar(ruta, lote=1)
+
+        self.assertIn('Productos importados: 2 (2 filas con error)', salida)
+        self.assertIn('Línea 3: El nombre es obligatorio', errores)
+        self.assertIn("Línea 4: Precio inválido: 'caro'", errores)
+        vasija = Producto.objects.get(nombre='Vasija')
+        self.assertEqual((vasija.precio, vasija.stock, vasija.tienda), (15000, 3, self.tienda))
+        self.assertIsNone(Producto.objects.get(nombre='Telar').stock)
+        # bulk_create no emite señales: el importador indexa por su cuenta
+        busqueda = get_search_backend().search(Producto.objects.all(), 'oveja')
+        self.assertEqual([p.nombre for p in busqueda], ['Telar'])
+
+    def test_jsonl_con_zip_de_imagenes(self):
+        zip_imagenes = os.path.join(self.dir, 'imagenes.zip')
+        with zipfile.ZipFile(zip_imagenes, 'w') as zf:
+            zf.writestr('fotos/vasija.png', imagen())
+            zf.writestr('falsa.png', b'no es una imagen')
+        ruta = self.archivo('productos.jsonl', (
+            '{"nombre": "Vasija", "precio": 15000, "categoria": "Cerámica", "imagen": "vasija.png"}\n'
+            '\n'
+            '{"nombre": "Falsa", "precio": 1, "categoria": "Otros", "imagen": "falsa.png"}\n'
+            '{"nombre": "Perdida", "precio": 1, "categoria": "Otros", "imagen": "no-existe.png"}\n'
+            '[1, 2]\n'
+        ))
+
+        salida, errores = self.importar(ruta, imagenes=zip_imagenes, sin_derivados=True)
+
+        self.assertIn('Productos importados: 1 (3 filas con error)', salida)
+        self.assertIn("Línea 3: 'falsa.png'", errores)
+        self.assertIn("no está en el zip", errores)
+        self.assertIn("Línea 5: La línea no es un objeto JSON válido", errores)
+        vasija = Producto.objects.get()
+        self.assertTrue(vasija.imagen.storage.exists(vasija.imagen.name))
+        # Sólo quedó guardada la imagen del producto creado
+        self.assertEqual(len(os.listdir(os.path.dirname(vasija.imagen.path))), 1)
+
+    def test_tienda_o_formato_invalidos(self):
+        ruta = self.archivo('productos.txt', 'nombre,precio,categoria\n')
+        with self.assertRaisesMessage(CommandError, 'debe ser .csv o .jsonl'):
+            self.importar(ruta)
+        with self.assertRaisesMessage(CommandError, 'No existe la tienda'):
+            call_command('importar_productos', '999999', ruta)
+
+
+@sin_manifiesto
+class ModeracionResenasTests(TestCase):
+    """Las acciones masivas del admin recuentan la tienda sin pasar por las señales de Resena."""
+
+    def setUp(self):
+        cache.clear()
+        self.tienda = crear_tienda()
+        self.resenas = [
+            Resena.objects.create(tienda=self.tienda, usuario=User.objects.create_user(f'cliente{i}'),
+                                  calificacion=calificacion, comentario='Bueno')
+            for i, calificacion in enumerate((5, 4, 3))
+        ]
+        self.client.force_login(User.objects.create_superuser('admin', password='clave12345'))
+
+    def moderar(self, accion, resenas):
+        return self.client.post(reverse('admin:proyectoApp_resena_changelist'), {
+            'action': accion, '_selected_action': [r.pk for r in resenas],
+        }, follow=True)
+
+    def contadores(self):
+        self.tienda.refresh_from_db()
+        return self.tienda.resenas_total, self.tienda.resenas_suma, self.tienda.calificacion_promedio
+
+    def test_aprobar_y_rechazar_recalcula_la_tienda(self):
+        response = self.moderar('aprobar_resenas', self.resenas)
+        self.assertContains(response, '3 reseñas aprobadas.')
+        self.assertEqual(self.contadores(), (3, 12, 4.0))
+
+        response = self.moderar('rechazar_resenas', self.resenas[:1])
+        self.assertContains(response, '1 reseñas rechazadas.')
+        self.assertEqual(self.contadores(), (2, 7, 3.5))
+
+        # Sólo cuentan las que cambian de estado
+        response = self.moderar('aprobar_resenas', self.resenas)
+        self.assertContains(response, '1 reseñas aprobadas.')
+        self.assertEqual(self.contadores(), (3, 12, 4.0))
+
+    def test_invalida_las_tarjetas_de_la_tienda(self):
+        fragmentos.invalidar_tienda(self.tienda.pk)
+        version = cache.get(fragmentos.clave_tienda(self.tienda.pk))
+
+        self.moderar('aprobar_resenas', self.resenas[:1])
+        self.assertNotEqual(cache.get(fragmentos.clave_tienda(self.tienda.pk)), version)
+
+
+class ExportarTiendaTests(TestCase):
+    def setUp(self):
+        self.tienda = crear_tienda()
+        self.producto = crear_producto(self.tienda, '=SUMA(A1)')
+        ajeno = crear_producto(crear_tienda('otro'), 'Ajeno')
+        comprador = User.objects.create_user('comprador')
+        for dia in (1, 2, 3):
+            venta = Venta.objects.create(producto=self.producto, comprador=comprador)
+            fecha = timezone.make_aware(datetime(2025, 3, dia, 12))
+            Venta.objects.filter(pk=venta.pk).update(fecha=fecha)
+        Venta.objects.create(producto=ajeno, comprador=comprador)
+        Order.objects.create(product=self.producto, buyer=comprador, quantity=2)
+        Order.objects.create(product=ajeno, buyer=comprador)
+
+    def exportar(self, *args):
+        salida = StringIO()
+        call_command('exportar_tienda', str(self.tienda.pk), *args, stdout=salida)
+        return salida.getvalue()
+
+    def test_ventas_csv_por_lotes(self):
+        filas = list(csv.reader(StringIO(self.exportar('--lote', '1'))))
+
+        self.assertEqual(filas[0], ['id', 'fecha', 'producto_id', 'producto', 'precio', 'comprador', 'notificado'])
+        self.assertEqual(len(filas), 4)
+        self.assertEqual({f[2] for f in filas[1:]}, {str(self.producto.pk)})
+        # Nombres que una hoja de cálculo tomaría como fórmula
+        self.assertEqual(filas[1][3], "'=SUMA(A1)")
+
+    def test_rango_de_fechas_inclusivo(self):
+        filas = self.exportar('--formato', 'jsonl', '--desde', '2025-03-02', '--hasta', '2025-03-03').splitlines()
+
+        fechas = [json.loads(f)['fecha'][:10] for f in filas]
+        self.assertEqual(fechas, ['2025-03-02', '2025-03-03'])
+
+    def test_pedidos_jsonl(self):
+        pedido, = [json.loads(f) for f in self.exportar('--tipo', 'pedidos', '--formato', 'jsonl').splitlines()]
+        self.assertEqual((pedido['producto'], pedido['cantidad'], pedido['estado']), ('=SUMA(A1)', 2, 'P'))
+
+    def test_parametros_invalidos(self):
+        with self.assertRaisesMessage(CommandError, 'Fecha inválida'):
+            self.exportar('--desde', '03/02/2025')
+
+    def test_la_vista_exporta_solo_la_tienda_propia(self):
+        self.client.force_login(self.tienda.artesano.user)
+        response = self.client.get(reverse('exportar_tienda'), {'formato': 'jsonl'})
+
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson; charset=utf-8')
+        filas = b''.join(response.streaming_content).decode().splitlines()
+        self.assertEqual(len(filas), 3)
+
+
+class ImagenesTests(TestCase):
+    def setUp(self):
+        media_temporal(self)
+        self.tienda = crear_tienda()
+
+    def derivados(self, producto):
+        return [imagenes.nombre_derivado(producto.imagen.name, ancho) for ancho in imagenes.ANCHOS]
+
+    def test_derivados_de_originales_con_el_mismo_nombre_base(self):
+        jpg = crear_producto(self.tienda, imagen=SimpleUploadedFile('foto.jpg', imagen(900, 600, 'JPEG')))
+        png = crear_producto(self.tienda, imagen=SimpleUploadedFile('foto.png', imagen(900, 600)))
+        storage = jpg.imagen.storage
+
+        self.assertTrue(jpg.imagen_derivados and png.imagen_derivados)
+        self.assertTrue(set(self.derivados(jpg)).isdisjoint(self.derivados(png)))
+        with storage.open(self.derivados(png)[0]) as f, Image.open(f) as miniatura:
+            self.assertEqual((miniatura.format, miniatura.width), ('WEBP', 320))
+
+        jpg.delete()
+        self.assertFalse(any(storage.exists(n) for n in self.derivados(jpg)))
+        self.assertTrue(all(storage.exists(n) for n in self.derivados(png)))
+        self.assertIn(self.derivados(png)[0], png.imagen_thumb_url)
+
+    def test_reemplazar_la_imagen_borra_los_derivados_anteriores(self):
+        producto = crear_producto(self.tienda, imagen=SimpleUploadedFile('foto.jpg', imagen(400, 400, 'JPEG')))
+        anteriores = self.derivados(producto)
+
+        producto.imagen = SimpleUploadedFile('otra.png', imagen(400, 400))
+        producto.save()
+
+        self.assertFalse(any(producto.imagen.storage.exists(n) for n in anteriores))
+        self.assertTrue(all(producto.imagen.storage.exists(n) for n in self.derivados(producto)))
+
+    def test_rechaza_archivos_que_no_son_imagen_y_bombas(self):
+        self.assertIsNone(imagenes.error_de_imagen(BytesIO(imagen())))
+        self.assertIn('no es una imagen', imagenes.error_de_imagen(BytesIO(b'GIF89a basura')))
+        with mock.patch.object(imagenes, 'MAX_PIXELES', 63):
+            self.assertIn('demasiados píxeles', imagenes.error_de_imagen(BytesIO(imagen())))
+        # Pillow la rechaza al abrirla (más del doble de MAX_IMAGE_PIXELS)
+        with mock.patch.object(Image, 'MAX_IMAGE_PIXELS', 10):
+            self.assertIn('demasiados píxeles', imagenes.error_de_imagen(BytesIO(imagen())))
+            self.assertFalse(imagenes.generar_derivados(
+                crear_producto(self.tienda, imagen=SimpleUploadedFile('foto.png', imagen())).imagen.name
+            ))
+
+    def test_crear_producto_con_una_bomba_no_guarda_nada(self):
+        self.client.force_login(self.tienda.artesano.user)
+        with mock.patch.object(imagenes, 'MAX_PIXELES', 63):
+            response = self.client.post(reverse('crear_producto'), {
+                'nombre': 'Vasija', 'precio': '15000', 'categoria': 'Cerámica', 'descripcion': '',
+                'imagen': SimpleUploadedFile('bomba.png', imagen()),
+            })
+
+        self.assertRedirects(response, reverse('crear_producto'), fetch_redirect_response=False)
+        self.assertFalse(Producto.objects.exists())
+
+
+@sin_manifiesto
+class StockFormularioTests(TestCase):
+    def setUp(self):
+        self.tienda = crear_tienda()
+        self.producto = crear_producto(self.tienda, stock=5)
+        self.client.force_login(self.tienda.artesano.user)
+        self.editar = reverse('editar_producto', args=[self.producto.pk])
+
+    def datos(self, **campos):
+        return {'nombre': 'Vasija grande', 'precio': '18000', 'categoria': 'Cerámica',
+                'descripcion': 'Greda', 'stock': '5', 'stock_original': '5', **campos}
+
+    def test_crear_con_stock_invalido(self):
+        for stock in ('abc', '-1', '2.5', str(2 ** 31)):
+            response = self.client.post(reverse('crear_producto'), self.datos(stock=stock), follow=True)
+            self.assertRedirects(response, reverse('crear_producto'))
+            self.assertContains(response, 'El stock debe ser un número entero')
+        self.assertEqual(Producto.objects.count(), 1)
+
+        self.client.post(reverse('crear_producto'), self.datos(stock=''))
+        self.assertIsNone(Producto.objects.get(nombre='Vasija grande').stock)
+
+    def test_editar_con_stock_invalido_no_guarda_nada(self):
+        for campos in ({'stock': 'abc'}, {'stock': '-3'}, {'stock_original': 'x'}, {'stock_original': '-1'}):
+            response = self.client.post(self.editar, self.datos(**campos), follow=True)
+            self.assertRedirects(response, self.editar)
+            self.assertContains(response, 'El stock debe ser un número entero')
+
+        self.producto.refresh_from_db()
+        self.assertEqual((self.producto.nombre, self.producto.stock), ('Vasija', 5))
+
+    def test_editar_stock(self):
+        self.client.post(self.editar, self.datos(stock='8'))
+        self.producto.refresh_from_db()
+        self.assertEqual(self.producto.stock, 8)
+
+    def test_una_compra_mientras_se_edita_no_se_pisa(self):
+        Producto.objects.filter(pk=self.producto.pk).update(stock=4)
+
+        response = self.client.post(self.editar, self.datos(stock='8'), follow=True)
+
+        self.assertRedirects(response, self.editar)
+        self.assertContains(response, 'El stock cambió mientras editabas (ahora 4)')
+        self.producto.refresh_from_db()
+        self.assertEqual((self.producto.nombre, self.producto.stock), ('Vasija grande', 4))
+
+
+@sin_manifiesto
+class FragmentosTests(TestCase):
+    """Las tarjetas se reusan del caché hasta que cambia su producto o su tienda."""
+
+    def setUp(self):
+        cache.clear()
+        self.tienda = crear_tienda()
+        self.producto = crear_producto(self.tienda)
+        self.catalogo = reverse('compradores:catalog')
+        # Con sesión: el catálogo no sale del caché de páginas anónimas
+        self.client.force_login(User.objects.create_user('rosa_quispe'))
+
+    def renombrar_sin_senales(self, nombre):
+        Producto.objects.filter(pk=self.producto.pk).update(nombre=nombre)
+
+    def test_catalogo_reusa_la_tarjeta(self):
+        self.assertContains(self.client.get(self.catalogo), 'Vasija')
+        self.renombrar_sin_senales('Jarro')
+
+        response = self.client.get(self.catalogo)
+        self.assertContains(response, 'Vasija')
+        self.assertNotContains(response, 'Jarro')
+
+    def test_editar_producto_renderiza_la_tarjeta_de_nuevo(self):
+        self.client.get(self.catalogo)
+        self.producto.refresh_from_db()
+        self.producto.nombre = 'Jarro'
+        self.producto.save()
+
+        response = self.client.get(self.catalogo)
+        self.assertContains(response, 'Jarro')
+        self.assertNotContains(response, 'Vasija')
+
+    def test_editar_tienda_renderiza_sus_tarjetas_de_nuevo(self):
+        self.assertContains(self.client.get(self.catalogo), 'Valparaíso')
+        self.tienda.ubicacion = 'Chiloé'
+        self.tienda.save()
+
+        response = self.client.get(self.catalogo)
+        self.assertContains(response, 'Chiloé')
+        self.assertNotContains(response, 'Valparaíso')
+
+    def test_mi_tienda_reusa_la_tarjeta_hasta_una_venta(self):
+        self.client.force_login(self.tienda.artesano.user)
+        self.assertContains(self.client.get(reverse('mi_tienda')), '<strong>Ventas:</strong> 0')
+        self.renombrar_sin_senales('Jarro')
+        self.assertContains(self.client.get(reverse('mi_tienda')), '<h3>Vasija</h3>')
+
+        # Las ventas son parte de la clave: el contador nunca queda viejo
+        self.client.get(reverse('simular_venta', args=[self.producto.pk]))
+        response = self.client.get(reverse('mi_tienda'))
+        self.assertContains(response, '<h3>Jarro</h3>')
+        self.assertContains(response, '<strong>Ventas:</strong> 1 (1 sin revisar)')
+
+
+@sin_manifiesto
+class MiTiendaTests(TestCase):
+    """Mi tienda: totales desde contadores, dos listados por cursor y ventas marcadas como vistas."""
+
+    def setUp(self):
+        cache.clear()
+        self.tienda = crear_tienda()
+        self.comprador = User.objects.create_user('rosa_quispe')
+        self.client.force_login(self.tienda.artesano.user)
+
+    def vender(self, producto, veces=1):
+        for _ in range(veces):
+            Venta.objects.create(producto=producto, comprador=self.comprador)
+
+    def ver(self, **params):
+        response = self.client.get(reverse('mi_tienda'), params)
+        self.assertEqual(response.status_code, 200)
+        return response
+
+    def test_totales_por_producto_y_de_la_tienda(self):
+        vasija, manta = crear_producto(self.tienda), crear_producto(self.tienda, 'Manta')
+        self.vender(vasija, 3)
+        self.vender(manta)
+        revisada = Venta.objects.filter(producto=vasija).first()
+        Venta.objects.filter(pk=revisada.pk).update(notificado=True)
+        # Las ventas de otra tienda no cuentan
+        self.vender(crear_producto(crear_tienda('otro')), 2)
+
+        response = self.ver()
+        totales = {p.nombre: (p.ventas_total, p.ventas_pendientes) for p in response.context['productos']}
+        self.assertEqual(totales, {'Vasija': (3, 2), 'Manta': (1, 1)})
+        self.assertEqual(response.context['notificaciones'], 3)
+        self.assertContains(response, 'Tienes 3 nuevas ventas sin revisar')
+
+    def test_productos_y_ventas_por_cursor(self):
+        productos = [crear_producto(self.tienda, f'Pieza {i}') for i in range(30)]
+        for producto in productos[:25]:
+            self.vender(producto)
+
+        primera = self.ver()
+        pagina_productos = primera.context['productos']
+        pagina_ventas = primera.context['ventas']
+        self.assertEqual((len(pagina_productos.object_list), len(pagina_ventas.object_list)), (24, 20))
+
+        # Cada listado avanza con su propio parámetro sin mover al otro
+        siguiente = self.ver(productos=pagina_productos.next_cursor, cursor=pagina_ventas.next_cursor)
+        vistos = [*pagina_productos, *siguiente.context['productos']]
+        self.assertEqual(vistos, sorted(productos, key=lambda p: (p.fecha_creacion, p.pk), reverse=True))
+        self.assertFalse(siguiente.context['productos'].has_next())
+
+        ventas = [*pagina_ventas, *siguiente.context['ventas']]
+        self.assertEqual(ventas, list(Venta.objects.order_by('-fecha', '-id')))
+        self.assertFalse(siguiente.context['ventas'].has_next())
+
+        solo_ventas = self.ver(cursor=pagina_ventas.next_cursor)
+        self.assertEqual(list(solo_ventas.context['productos']), list(pagina_productos))
+
+    def test_las_ventas_quedan_vistas(self):
+        self.vender(crear_producto(self.tienda), 2)
+        user_id = self.tienda.artesano.user_id
+        self.assertEqual(badges.unseen_sales(user_id), 2)
+
+        response = self.ver()
+        self.assertContains(response, '<strong>Nueva</strong>', count=2)
+        self.assertFalse(Venta.objects.filter(notificado=False).exists())
+        self.assertEqual(badges.unseen_sales(user_id), 0)
+
+        response = self.ver()
+        self.assertEqual(response.context['notificaciones'], 0)
+        self.assertNotContains(response, '<strong>Nueva</strong>')
+        self.assertContains(response, 'Revisada', count=2)
+
+    def test_consultas_no_crecen_con_productos_ni_ventas(self):
+        def consultas():
+            cache.clear()
+            with CaptureQueriesContext(connection) as capturadas:
+                self.ver()
+            return len(capturadas)
+
+        self.vender(crear_producto(self.tienda))
+        pocas = consultas()
+
+        for i in range(40):
+            self.vender(crear_producto(self.tienda, f'Pieza {i}'), 2)
+        self.assertEqual(consultas(), pocas)
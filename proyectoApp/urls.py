@@ -26,6 +26,8 @@ urlpatterns = [
     path('crear_tienda/', views.crear_tienda, name='crear_tienda'),
     path('mi_tienda/', views.mi_tienda, name='mi_tienda'),  
     path('crear_producto/', views.crear_producto, name='crear_producto'),
+    path('importar_productos/', views.importar_productos, name='importar_productos'),
+    path('exportar/', views.exportar_tienda, name='exportar_tienda'),
     path('editar_producto/<int:producto_id>/', views.editar_producto, name='editar_producto'),
     path('eliminar_producto/<int:producto_id>/', views.eliminar_producto, name='eliminar_producto'),
     path('simular_venta/<int:producto_id>/', views.simular_venta, name='simular_venta'),
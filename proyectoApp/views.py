@@ -1,14 +1,24 @@
 from django.shortcuts import render
 from django.contrib.auth import authenticate, login, logout
 from django.contrib.auth.models import User
-from django.http import HttpResponseRedirect
+from django.http import HttpResponseRedirect, StreamingHttpResponse
 from django.urls import reverse
 from django.contrib import messages
+from . import imagenes
 from .models import Tienda, Perfil, Producto, Venta
+from .artesano import get_artesano, invalidar as invalidar_artesano
+from .fragmentos import asignar_versiones
+from .exportacion import FORMATOS, ErrorExportacion, exportar
+from .importacion import ErrorImportacion, formato_de, importar_productos as importar
 from django.shortcuts import get_object_or_404
+from django.db import transaction
+from django.db.models import Count
+from compradoresApp import badges, trending
+from compradoresApp.pagination import CursorPaginator, query_without
 # Página principal
 def home(request):
-    return render(request, 'home.html')
+    # Top de tendencias desde caché: una consulta por pk, sin agregaciones
+    return render(request, 'home.html', {'tendencias': trending.top_products(6)})
 
 
 # Login 
@@ -88,11 +98,14 @@ def registro_artesano(request):
 
 # Crear tienda formulario y guardado
 def crear_tienda(request):
-    perfil = Perfil.objects.get(user=request.user)
-    tienda_existente = Tienda.objects.filter(artesano=perfil).first()
+    artesano = get_artesano(request)
+    if not artesano:
+        messages.error(request, "Debes iniciar sesión como artesano.")
+        return HttpResponseRedirect(reverse('login'))
+    perfil = artesano.perfil
 
     # Si ya tiene una tienda, lo redirigimos directamente
-    if tienda_existente:
+    if artesano.has_shop:
         messages.info(request, "Ya tienes una tienda creada.")
         return HttpResponseRedirect(reverse('mi_tienda'))
 
@@ -101,13 +114,22 @@ def crear_tienda(request):
         descripcion = request.POST.get('descripcion')
         ubicacion = request.POST.get('ubicacion')
 
-        # Crear la tienda asociada al artesano
-        Tienda.objects.create(
-            artesano=perfil,
-            nombre=nombre,
-            descripcion=descripcion,
-            ubicacion=ubicacion
-        )
+        with transaction.atomic():
+            # El artesano en caché puede estar desactualizado: se verifica en la
+            # base, con el perfil bloqueado para que dos envíos no creen dos tiendas
+            Perfil.objects.select_for_update().filter(pk=perfil.pk).first()
+            if Tienda.objects.filter(artesano=perfil).exists():
+                invalidar_artesano(request.user.pk)
+                messages.info(request, "Ya tienes una tienda creada.")
+                return HttpResponseRedirect(reverse('mi_tienda'))
+
+            # Crear la tienda asociada al artesano
+            Tienda.objects.create(
+                artesano=perfil,
+                nombre=nombre,
+                descripcion=descripcion,
+                ubicacion=ubicacion
+            )
 
         messages.success(request, "Tienda creada correctamente 🎉")
         return HttpResponseRedirect(reverse('mi_tienda'))
@@ -117,35 +139,71 @@ def crear_tienda(request):
 
 # Mi Tienda
 def mi_tienda(request):
-    perfil = Perfil.objects.get(user=request.user)
-    tienda = Tienda.objects.filter(artesano=perfil).first()
+    artesano = get_artesano(request)
+    if not artesano:
+        messages.error(request, "Debes iniciar sesión como artesano.")
+        return HttpResponseRedirect(reverse('login'))
+    tienda = artesano.tienda
 
     if not tienda:
         messages.info(request, "Aún no tienes una tienda. ¡Crea una ahora!")
         return render(request, 'crear_tienda.html')
 
-    # Productos del artesano
-    productos = tienda.producto_set.all()
-
-    # Ventas asociadas a esos productos
-    ventas = Venta.objects.filter(producto__in=productos).order_by('-fecha')
-
-    # Notificaciones (ventas no notificadas)
-    notificaciones = Venta.objects.filter(producto__in=productos, notificado=False).count()
+    # Productos paginados por cursor (índice tienda, fecha_creacion); el total
+    # de ventas es el contador Producto.ventas_total, no un COUNT del historial
+    productos = CursorPaginator(
+        tienda.producto_set.all(), 24, ordering=('-fecha_creacion', '-id'),
+    ).get_page(request.GET.get('productos'))
+    productos.object_list = asignar_versiones(productos.object_list)
+
+    # Ventas sin revisar: por producto sólo los de esta página, y el total de la tienda
+    pendientes = dict(
+        Venta.objects.filter(producto_id__in=[p.pk for p in productos], notificado=False)
+        .order_by().values('producto_id').annotate(n=Count('id')).values_list('producto_id', 'n')
+    )
+    for producto in productos:
+        producto.ventas_pendientes = pendientes.get(producto.pk, 0)
+    notificaciones = Venta.objects.filter(tienda=tienda, notificado=False).count()
+
+    # Ventas recientes paginadas por cursor sobre el índice (tienda, fecha, id)
+    ventas_qs = Venta.objects.filter(tienda=tienda).select_related('producto', 'comprador')
+    ventas = CursorPaginator(ventas_qs, 20, ordering=('-fecha', '-id')).get_page(request.GET.get('cursor'))
+
+    # Ya se mostraron como nuevas: se marcan revisadas y el badge vuelve a cero
+    if notificaciones:
+        badges.mark_sales_seen(request.user.pk, tienda)
 
     context = {
         'tienda': tienda,
         'productos': productos,
         'ventas': ventas,
-        'notificaciones': notificaciones
+        'notificaciones': notificaciones,
+        'query_productos': query_without(request, 'productos'),
+        'query_ventas': query_without(request, 'cursor'),
     }
     return render(request, 'mi_tienda.html', context)
 
 
+def _stock(valor):
+    """Vacío = sin control de stock; si no, un entero >= 0 (ValueError si no lo es)."""
+    if valor in (None, ''):
+        return None
+    stock = int(valor)
+    if not 0 <= stock < 2 ** 31:
+        raise ValueError(valor)
+    return stock
+
+
+ERROR_STOCK = "El stock debe ser un número entero mayor o igual a 0, o quedar vacío."
+
+
 # crear producto
 def crear_producto(request):
-    perfil = Perfil.objects.get(user=request.user)
-    tienda = Tienda.objects.filter(artesano=perfil).first()
+    artesano = get_artesano(request)
+    if not artesano:
+        messages.error(request, "Debes iniciar sesión como artesano.")
+        return HttpResponseRedirect(reverse('login'))
+    tienda = artesano.tienda
 
     if not tienda:
         messages.error(request, "Primero debes crear tu tienda antes de agregar productos.")
@@ -158,13 +216,25 @@ def crear_producto(request):
         descripcion = request.POST.get('descripcion')
         imagen = request.FILES.get('imagen')
 
+        try:
+            stock = _stock(request.POST.get('stock'))
+        except ValueError:
+            messages.error(request, ERROR_STOCK)
+            return HttpResponseRedirect(reverse('crear_producto'))
+
+        error = imagen and imagenes.error_de_imagen(imagen)
+        if error:
+            messages.error(request, error)
+            return HttpResponseRedirect(reverse('crear_producto'))
+
         Producto.objects.create(
             tienda=tienda,
             nombre=nombre,
             precio=precio,
             categoria=categoria,
             descripcion=descripcion,
-            imagen=imagen
+            imagen=imagen,
+            stock=stock
         )
 
         messages.success(request, "Producto agregado correctamente 🎉")
@@ -174,21 +244,113 @@ def crear_producto(request):
 
 
 
+# Importación masiva de productos (CSV/JSONL + zip de imágenes opcional)
+def importar_productos(request):
+    artesano = get_artesano(request)
+    if not artesano:
+        messages.error(request, "Debes iniciar sesión como artesano.")
+        return HttpResponseRedirect(reverse('login'))
+    tienda = artesano.tienda
+
+    if not tienda:
+        messages.error(request, "Primero debes crear tu tienda antes de agregar productos.")
+        return HttpResponseRedirect(reverse('mi_tienda'))
+
+    context = {}
+    if request.method == 'POST':
+        archivo = request.FILES.get('archivo')
+        if not archivo:
+            messages.error(request, "Debes seleccionar un archivo CSV o JSONL.")
+            return HttpResponseRedirect(reverse('importar_productos'))
+
+        try:
+            resultado = importar(tienda, archivo, formato_de(archivo.name), request.FILES.get('imagenes'))
+        except ErrorImportacion as e:
+            messages.error(request, str(e))
+            return HttpResponseRedirect(reverse('importar_productos'))
+
+        if resultado.creados:
+            messages.success(request, f"Se importaron {resultado.creados} productos 🎉")
+        if not resultado.total_errores:
+            return HttpResponseRedirect(reverse('mi_tienda'))
+        messages.error(request, f"{resultado.total_errores} filas no se importaron.")
+        context['resultado'] = resultado
+
+    return render(request, 'importar_productos.html', context)
+
+
+# Exportación de ventas o pedidos de la tienda (CSV/JSONL), generada en streaming
+def exportar_tienda(request):
+    artesano = get_artesano(request)
+    if not artesano:
+        messages.error(request, "Debes iniciar sesión como artesano.")
+        return HttpResponseRedirect(reverse('login'))
+    tienda = artesano.tienda
+
+    if not tienda:
+        messages.info(request, "Aún no tienes una tienda. ¡Crea una ahora!")
+        return HttpResponseRedirect(reverse('crear_tienda'))
+
+    tipo = request.GET.get('tipo', 'ventas')
+    formato = request.GET.get('formato', 'csv')
+    try:
+        lineas = exportar(tienda, tipo, formato, request.GET.get('desde'), request.GET.get('hasta'))
+    except ErrorExportacion as e:
+        messages.error(request, str(e))
+        return HttpResponseRedirect(reverse('mi_tienda'))
+
+    response = StreamingHttpResponse(lineas, content_type=FORMATOS[formato])
+    response['Content-Disposition'] = f'attachment; filename="{tipo}-tienda-{tienda.pk}.{formato}"'
+    return response
+
+
 # Editar producto
 def editar_producto(request, producto_id):
     producto = get_object_or_404(Producto, id=producto_id, tienda__artesano__user=request.user)
 
     if request.method == 'POST':
+        try:
+            stock = _stock(request.POST.get('stock'))
+            stock_mostrado = _stock(request.POST.get('stock_original', producto.stock))
+        except ValueError:
+            messages.error(request, ERROR_STOCK)
+            return HttpResponseRedirect(reverse('editar_producto', args=[producto.pk]))
+
+        error = 'imagen' in request.FILES and imagenes.error_de_imagen(request.FILES['imagen'])
+        if error:
+            messages.error(request, error)
+            return HttpResponseRedirect(reverse('editar_producto', args=[producto.pk]))
+
         producto.nombre = request.POST.get('nombre')
         producto.precio = request.POST.get('precio')
         producto.categoria = request.POST.get('categoria')
         producto.descripcion = request.POST.get('descripcion')
 
+        # El stock no va en el save(): las compras lo descuentan con UPDATE
+        # (inventario.reservar). Se cambia sólo si sigue en el valor que mostró
+        # el formulario; si hubo una compra entretanto, no se pisa.
+        stock_conflicto = stock != stock_mostrado and not Producto.objects.filter(
+            pk=producto.pk, stock=stock_mostrado,
+        ).update(stock=stock)
+
+        campos = ['nombre', 'precio', 'categoria', 'descripcion']
+
         # Si se sube una nueva imagen
         if 'imagen' in request.FILES:
             producto.imagen = request.FILES['imagen']
-
-        producto.save()
+            campos.append('imagen')
+
+        # Sólo los campos del formulario: los contadores y la tendencia se
+        # mantienen con UPDATE ... F() y el valor en memoria puede estar viejo
+        producto.save(update_fields=campos)
+        if stock_conflicto:
+            producto.refresh_from_db(fields=['stock'])
+            messages.warning(
+                request,
+                f"El stock cambió mientras editabas (ahora {producto.stock}); "
+                "se guardó el resto. Revisa el stock y vuelve a guardar.",
+            )
+            return HttpResponseRedirect(reverse('editar_producto', args=[producto.pk]))
         messages.success(request, "Producto actualizado correctamente 🎉")
         return HttpResponseRedirect(reverse('mi_tienda'))
 
@@ -0,0 +1,197 @@
+"""
+Métricas por vista en formato de texto de Prometheus.
+
+``MetricsMiddleware`` mide cada request y, con ``connection.execute_wrapper``,
+cuenta las consultas SQL y su tiempo. Todo se agrupa por nombre de URL
+(``compradores:catalog``, ``mi_tienda``...), no por ruta, para que la
+cardinalidad quede acotada. Si una misma consulta (mismo SQL con distintos
+parámetros) se repite ``METRICS_N_PLUS_ONE_THRESHOLD`` veces o más en un
+request, se cuenta y se registra como posible N+1.
+
+Los valores viven en memoria del proceso: con varios workers, cada uno
+expone los suyos (Prometheus los distingue por instancia).
+"""
+import bisect
+import hmac
+import logging
+import re
+import threading
+from collections import Counter, defaultdict
+from time import perf_counter
+
+from django.conf import settings
+from django.db import connection
+from django.http import Http404, HttpResponse, HttpResponseForbidden
+
+logger = logging.getLogger(__name__)
+
+BUCKETS_SEGUNDOS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+BUCKETS_CONSULTAS = (1, 2, 5, 10, 20, 50, 100, 200)
+SIN_VISTA = '<sin-vista>'
+METODOS = {'GET', 'HEAD', 'POST', 'PUT', 'PATCH', 'DELETE', 'OPTIONS'}
+
+
+def _umbral_n_mas_uno():
+    return getattr(settings, 'METRICS_N_PLUS_ONE_THRESHOLD', 5)
+
+
+def _escapar(valor):
+    return str(valor).replace('\\', r'\\').replace('"', r'\"').replace('\n', r'\n')
+
+
+def _etiquetas(nombres, valores, extra=''):
+    partes = [f'{n}="{_escapar(v)}"' for n, v in zip(nombres, valores)]
+    if extra:
+        partes.append(extra)
+    return '{' + ','.join(partes) + '}' if partes else ''
+
+
+class Contador:
+    tipo = 'counter'
+
+    def __init__(self, nombre, ayuda, etiquetas):
+        self.nombre, self.ayuda, self.etiquetas = nombre, ayuda, etiquetas
+        self.valores = defaultdict(float)
+
+    def inc(self, valores, cantidad=1):
+        self.valores[valores] += cantidad
+
+    def lineas(self):
+        for valores, total in sorted(self.valores.items()):
+            yield f'{self.nombre}{_etiquetas(self.etiquetas, valores)} {total:g}'
+
+
+class Histograma:
+    tipo = 'histogram'
+
+    def __init__(self, nombre, ayuda, etiquetas, buckets):
+        self.nombre, self.ayuda, self.etiquetas = nombre, ayuda, etiquetas
+        self.buckets = tuple(buckets)
+        # por etiquetas: [conteo por bucket..., conteo +Inf], suma
+        self.valores = {}
+
+    def observe(self, valores, valor):
+        serie = self.valores.get(valores)
+        if serie is None:
+            serie = self.valores[valores] = [[0] * (len(self.buckets) + 1), 0.0]
+        serie[0][bisect.bisect_left(self.buckets, valor)] += 1
+        serie[1] += valor
+
+    def lineas(self):
+        for valores, (conteos, suma) in sorted(self.valores.items()):
+            acumulado = 0
+            for limite, conteo in zip(self.buckets + ('+Inf',), conteos):
+                acumulado += conteo
+                le = f'le="{limite}"'
+                yield f'{self.nombre}_bucket{_etiquetas(self.etiquetas, valores, le)} {acumulado}'
+            yield f'{self.nombre}_sum{_etiquetas(self.etiquetas, valores)} {suma:g}'
+            yield f'{self.nombre}_count{_etiquetas(self.etiquetas, valores)} {acumulado}'
+
+
+class Registro:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.duracion = Histograma(
+            'http_request_duration_seconds', 'Duración de los requests por vista.',
+            ('view', 'method', 'status'), BUCKETS_SEGUNDOS,
+        )
+        self.consultas = Histograma(
+            'db_queries_per_request', 'Consultas SQL por request.', ('view',), BUCKETS_CONSULTAS,
+        )
+        self.tiempo_sql = Contador(
+            'db_query_seconds_total', 'Tiempo total en consultas SQL.', ('view',),
+        )
+        self.n_mas_uno = Contador(
+            'db_repeated_query_requests_total',
+            'Requests con una misma consulta repetida (posible N+1).', ('view',),
+        )
+
+    def metricas(self):
+        return (self.duracion, self.consultas, self.tiempo_sql, self.n_mas_uno)
+
+    def registrar(self, vista, metodo, status, segundos, consultas):
+        with self.lock:
+            self.duracion.observe((vista, metodo, f'{status // 100}xx'), segundos)
+            self.consultas.observe((vista,), consultas.total)
+            self.tiempo_sql.inc((vista,), consultas.segundos)
+            if consultas.repetida:
+                self.n_mas_uno.inc((vista,))
+
+    def texto(self):
+        lineas = []
+        with self.lock:
+            for metrica in self.metricas():
+                lineas.append(f'# HELP {metrica.nombre} {metrica.ayuda}')
+                lineas.append(f'# TYPE {metrica.nombre} {metrica.tipo}')
+                lineas.extend(metrica.lineas())
+        return '\n'.join(lineas) + '\n'
+
+
+registro = Registro()
+
+
+class ConsultasDelRequest:
+    """execute_wrapper: cuenta consultas, su tiempo y cuántas veces se repite cada SQL."""
+    __slots__ = ('total', 'segundos', 'formas', 'repetida')
+
+    def __init__(self):
+        self.total = 0
+        self.segundos = 0.0
+        self.formas = Counter()
+        self.repetida = None
+
+    def __call__(self, execute, sql, params, many, context):
+        inicio = perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.segundos += perf_counter() - inicio
+            self.total += 1
+            # El SQL llega con marcadores (%s): los parámetros no cambian la forma
+            self.formas[sql] += 1
+
+    def revisar_repetidas(self, umbral):
+        if self.total < umbral:
+            return
+        sql, veces = self.formas.most_common(1)[0]
+        if veces >= umbral:
+            self.repetida = (re.sub(r'\s+', ' ', sql)[:300], veces)
+
+
+class MetricsMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        consultas = ConsultasDelRequest()
+        inicio = perf_counter()
+        with connection.execute_wrapper(consultas):
+            response = self.get_response(request)
+        segundos = perf_counter() - inicio
+
+        match = getattr(request, 'resolver_match', None)
+        vista = match.view_name if match else SIN_VISTA
+        if vista == 'metrics':
+            return response
+
+        consultas.revisar_repetidas(_umbral_n_mas_uno())
+        if consultas.repetida:
+            logger.warning(
+                "Posible N+1 en %s: la misma consulta se ejecutó %d veces: %s",
+                vista, consultas.repetida[1], consultas.repetida[0],
+            )
+        metodo = request.method if request.method in METODOS else 'OTHER'
+        registro.registrar(vista, metodo, response.status_code, segundos, consultas)
+        return response
+
+
+def metrics_view(request):
+    # Se exige "Authorization: Bearer <METRICS_TOKEN>"; sin token configurado
+    # el endpoint no existe, salvo en desarrollo (DEBUG)
+    token = getattr(settings, 'METRICS_TOKEN', None)
+    if not token:
+        if not settings.DEBUG:
+            raise Http404
+    elif not hmac.compare_digest(request.headers.get('Authorization', ''), f'Bearer {token}'):
+        return HttpResponseForbidden()
+    return HttpResponse(registro.texto(), content_type='text/plain; version=0.0.4; charset=utf-8')
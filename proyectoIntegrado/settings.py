@@ -10,23 +10,71 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.0/ref/settings/
 """
 
+import os
 from pathlib import Path
 
+from django.core.exceptions import ImproperlyConfigured
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 TEMPLATES_DIRS = BASE_DIR / 'templates'
 
 
+# Configuración por variables de entorno. DJANGO_PROFILE elige el perfil:
+# - development (por defecto): DEBUG, MySQL local, sin conexiones persistentes.
+# - production: sin DEBUG, conexiones persistentes, sesiones cached_db,
+#   loader de plantillas en caché; SECRET_KEY y credenciales obligatorias.
+# - sqlite: como development pero con SQLite, para correr todo sin MySQL
+#   (pruebas y benchmarks incluidos).
+def env(name, default=None):
+    return os.environ.get(name, default)
+
+
+def env_bool(name, default=False):
+    value = os.environ.get(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ('1', 'true', 'yes', 'on', 'si', 'sí')
+
+
+def env_int(name, default):
+    value = os.environ.get(name)
+    return default if value in (None, '') else int(value)
+
+
+def env_list(name, default=''):
+    return [v.strip() for v in env(name, default).split(',') if v.strip()]
+
+
+PROFILES = ('development', 'production', 'sqlite')
+PROFILE = env('DJANGO_PROFILE', 'development')
+if PROFILE not in PROFILES:
+    raise ImproperlyConfigured(f"DJANGO_PROFILE debe ser uno de {', '.join(PROFILES)}.")
+PRODUCTION = PROFILE == 'production'
+
+
+def env_required(name, development_default):
+    # En producción no hay valores por defecto inseguros
+    value = env(name)
+    if value is None:
+        if PRODUCTION:
+            raise ImproperlyConfigured(f"Falta la variable de entorno {name}.")
+        return development_default
+    return value
+
+
 # Quick-start development settings - unsuitable for production
 # See https://docs.djangoproject.com/en/5.0/howto/deployment/checklist/
 
 # SECURITY WARNING: keep the secret key used in production secret!
-SECRET_KEY = 'django-insecure-l1!2wmvr0^55t9vz1pz0l%2b+o!rr$1*r3r=4vs9v!(j=fuino'
+SECRET_KEY = env_required(
+    'DJANGO_SECRET_KEY', 'django-insecure-l1!2wmvr0^55t9vz1pz0l%2b+o!rr$1*r3r=4vs9v!(j=fuino'
+)
 
 # SECURITY WARNING: don't run with debug turned on in production!
-DEBUG = True
+DEBUG = env_bool('DJANGO_DEBUG', not PRODUCTION)
 
-ALLOWED_HOSTS = []
+ALLOWED_HOSTS = env_list('DJANGO_ALLOWED_HOSTS')
 
 
 # Application definition
@@ -44,6 +92,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # Primero, para medir también el costo del resto de middlewares
+    'proyectoIntegrado.metrics.MetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -67,27 +117,103 @@ TEMPLATES = [
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
                 'proyectoApp.context_processors.tienda_context',
+                'compradoresApp.context_processors.badges_context',
 
             ],
         },
     },
 ]
 
+if PRODUCTION:
+    # Plantillas compiladas una vez por proceso (sin revisar cambios en disco)
+    TEMPLATES[0]['APP_DIRS'] = False
+    TEMPLATES[0]['OPTIONS']['loaders'] = [
+        ('django.template.loaders.cached.Loader', [
+            'django.template.loaders.filesystem.Loader',
+            'django.template.loaders.app_directories.Loader',
+        ]),
+    ]
+
 WSGI_APPLICATION = 'proyectoIntegrado.wsgi.application'
 
 
 # Database
 # https://docs.djangoproject.com/en/5.0/ref/settings/#databases
-import pymysql
-pymysql.install_as_MySQLdb()
-DATABASES = {
+if PROFILE == 'sqlite':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': env('SQLITE_PATH', BASE_DIR / 'db.sqlite3'),
+            'OPTIONS': {'timeout': 20},
+            # En archivo (no en memoria) para que las pruebas con hilos puedan escribir
+            'TEST': {'NAME': env('SQLITE_TEST_PATH', BASE_DIR / 'test_db.sqlite3')},
+        }
+    }
+else:
+    import pymysql
+    pymysql.install_as_MySQLdb()
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.mysql',
+            'NAME': env('DB_NAME', 'proyectoIntegradoDB'),
+            'USER': env_required('DB_USER', 'root'),
+            'PASSWORD': env_required('DB_PASSWORD', ''),
+            'HOST': env('DB_HOST', ''),
+            'PORT': env('DB_PORT', ''),
+            # Conexiones persistentes: se reutilizan entre requests y se
+            # verifican antes de usarlas si el servidor las cerró.
+            'CONN_MAX_AGE': env_int('DB_CONN_MAX_AGE', 600 if PRODUCTION else 0),
+            'CONN_HEALTH_CHECKS': env_bool('DB_CONN_HEALTH_CHECKS', PRODUCTION),
+            'OPTIONS': {'charset': 'utf8mb4'},
+        }
+    }
+
+
+# Caché (páginas anónimas, fragmentos, versiones, badges, artesano actual,
+# tendencias, facetas). LocMemCache es por proceso: lo que escriben los
+# comandos (procesar_tendencias, procesar_notificaciones, precalcular_facetas)
+# o las señales en otro worker no se ve. En producción es obligatorio uno
+# compartido, p. ej. CACHE_BACKEND=django.core.cache.backends.redis.RedisCache
+# y CACHE_LOCATION=redis://127.0.0.1:6379/1.
+CACHES = {
     'default': {
-        'ENGINE': 'django.db.backends.mysql',
-        'NAME': 'proyectoIntegradoDB',
-        'USER': 'root',
-        'PASSWORD': ''
+        'BACKEND': env('CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': env('CACHE_LOCATION', 'marketplace'),
+        'TIMEOUT': env_int('CACHE_TIMEOUT', 300),
     }
 }
+CACHE_SHARED = not CACHES['default']['BACKEND'].endswith(('LocMemCache', 'FileBasedCache'))
+if not CACHE_SHARED:
+    CACHES['default']['OPTIONS'] = {'MAX_ENTRIES': env_int('CACHE_MAX_ENTRIES', 10000)}
+    if PRODUCTION:
+        raise ImproperlyConfigured(
+            "En producción CACHE_BACKEND debe ser un caché compartido entre procesos "
+            "(Redis o Memcached), no LocMemCache ni FileBasedCache."
+        )
+
+ANONYMOUS_PAGE_CACHE_TIMEOUT = env_int('ANONYMOUS_PAGE_CACHE_TIMEOUT', 300)
+
+# Vida media del puntaje de tendencia (ver compradoresApp/trending.py)
+TRENDING_HALF_LIFE_HOURS = env_int('TRENDING_HALF_LIFE_HOURS', 48)
+
+
+# Sesiones y mensajes: cached_db lee la sesión del caché y sólo va a la base
+# de datos al escribir o si el caché la perdió; los mensajes viajan en una
+# cookie y no generan escrituras de sesión.
+SESSION_ENGINE = env(
+    'DJANGO_SESSION_ENGINE',
+    'django.contrib.sessions.backends.cached_db' if PRODUCTION else 'django.contrib.sessions.backends.db',
+)
+MESSAGE_STORAGE = 'django.contrib.messages.storage.cookie.CookieStorage'
+
+SESSION_COOKIE_SECURE = CSRF_COOKIE_SECURE = env_bool('DJANGO_SECURE_COOKIES', PRODUCTION)
+
+
+# Métricas en /metrics (ver proyectoIntegrado/metrics.py): el scraper debe
+# enviar "Authorization: Bearer <token>". Obligatorio en producción; sin
+# token, /metrics sólo responde con DEBUG.
+METRICS_TOKEN = env_required('METRICS_TOKEN', None)
+METRICS_N_PLUS_ONE_THRESHOLD = env_int('METRICS_N_PLUS_ONE_THRESHOLD', 5)
 
 
 # Password validation
@@ -128,6 +254,17 @@ STATIC_URL = '/static/'
 STATICFILES_DIRS = [BASE_DIR / 'static']
 STATIC_ROOT = BASE_DIR / 'staticfiles'
 
+# collectstatic minifica, agrega el hash al nombre y precomprime (.gz/.br);
+# ver proyectoIntegrado/staticfiles.py
+STORAGES = {
+    'default': {
+        'BACKEND': 'django.core.files.storage.FileSystemStorage',
+    },
+    'staticfiles': {
+        'BACKEND': 'proyectoIntegrado.staticfiles.CompressedManifestStaticFilesStorage',
+    },
+}
+
 
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.0/ref/settings/#default-auto-field
@@ -0,0 +1,233 @@
+"""
+Pipeline de archivos estáticos para producción.
+
+`collectstatic` con ``CompressedManifestStaticFilesStorage``:
+1. renombra cada archivo con el hash de su contenido (``style.3f2a9c1b7e4d.css``),
+2. minifica CSS/JS propios con ``rcssmin``/``rjsmin`` (no toca ``*.min.*`` ni
+   el admin de Django). Si falta alguno, en producción ``collectstatic`` falla
+   y en los demás perfiles avisa y copia esos archivos sin minificar,
+3. escribe variantes precomprimidas ``.gz`` y, si está instalado ``brotli``, ``.br``.
+
+Los nombres con hash nunca cambian de contenido, así que se sirven con
+``Cache-Control: immutable`` por un año. ``PrecompressedStaticApp`` los sirve
+desde la app WSGI; detrás de un proxy basta con algo como (nginx)::
+
+    location /static/ {
+        alias /ruta/al/proyecto/staticfiles/;
+        gzip_static on;
+        brotli_static on;          # módulo ngx_brotli
+        expires max;
+        add_header Cache-Control "public, max-age=31536000, immutable";
+    }
+"""
+import gzip
+import logging
+import mimetypes
+import os
+import re
+from email.utils import formatdate
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.core.exceptions import ImproperlyConfigured
+
+try:
+    import brotli
+except ImportError:  # brotli es opcional: sin él sólo se genera .gz
+    brotli = None
+
+# Minificadores con tokenizador real (strings, url(), calc(), selectores).
+# Se requieren en producción; ver CompressedManifestStaticFilesStorage.
+try:
+    import rcssmin
+except ImportError:
+    rcssmin = None
+try:
+    import rjsmin
+except ImportError:
+    rjsmin = None
+
+EXTENSIONES_COMPRIMIBLES = ('.css', '.js', '.svg', '.txt', '.json', '.map', '.html', '.xml', '.ico')
+CACHE_INMUTABLE = 'public, max-age=31536000, immutable'
+CACHE_CORTO = 'public, max-age=60'
+# nombre.<12 hex>.ext, como los genera ManifestStaticFilesStorage
+NOMBRE_CON_HASH = re.compile(r'\.[0-9a-f]{12}\.[^/.]+$')
+
+logger = logging.getLogger(__name__)
+
+
+MINIFICADORES = {}
+if rcssmin is not None:
+    MINIFICADORES['.css'] = rcssmin.cssmin
+if rjsmin is not None:
+    MINIFICADORES['.js'] = rjsmin.jsmin
+# Extensión -> paquete que la minifica, para el mensaje cuando falta
+PAQUETES_MINIFICADORES = {'.css': 'rcssmin', '.js': 'rjsmin'}
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+
+    def _minificable(self, nombre):
+        return not nombre.startswith('admin/') and '.min.' not in nombre
+
+    def _minificar(self, nombre):
+        minificador = MINIFICADORES.get(os.path.splitext(nombre)[1])
+        if not minificador or not self._minificable(nombre):
+            return
+        ruta = self.path(nombre)
+        with open(ruta, encoding='utf-8') as f:
+            original = f.read()
+        with open(ruta, 'w', encoding='utf-8') as f:
+            f.write(minificador(original))
+
+    def _revisar_minificadores(self, nombres):
+        """Falla en producción (avisa en otro caso) si hay CSS/JS sin minificador."""
+        extensiones = {os.path.splitext(n)[1] for n in nombres if self._minificable(n)}
+        faltan = sorted(
+            PAQUETES_MINIFICADORES[ext] for ext in extensiones
+            if ext in PAQUETES_MINIFICADORES and ext not in MINIFICADORES
+        )
+        if not faltan:
+            return
+        mensaje = (
+            f"Falta {', '.join(faltan)}: los archivos estáticos se copian sin minificar. "
+            f"Instálalo con: pip install {' '.join(faltan)}"
+        )
+        if settings.PRODUCTION:
+            raise ImproperlyConfigured(mensaje)
+        logger.warning(mensaje)
+
+    def _comprimir(self, nombre):
+        if not nombre.endswith(EXTENSIONES_COMPRIMIBLES):
+            return
+        ruta = self.path(nombre)
+        with open(ruta, 'rb') as f:
+            datos = f.read()
+        variantes = [('.gz', lambda d: gzip.compress(d, compresslevel=9, mtime=0))]
+        if brotli is not None:
+            variantes.append(('.br', lambda d: brotli.compress(d, quality=11)))
+        for sufijo, comprimir in variantes:
+            comprimido = comprimir(datos)
+            # Sólo vale la pena si ahorra al menos un 5 %
+            if len(comprimido) < len(datos) * 0.95:
+                with open(ruta + sufijo, 'wb') as f:
+                    f.write(comprimido)
+
+    def post_process(self, paths, dry_run=False, **options):
+        if dry_run:
+            yield from super().post_process(paths, dry_run=dry_run, **options)
+            return
+
+        self._revisar_minificadores(paths)
+        generados = set()
+        for nombre, hashed, procesado in super().post_process(paths, dry_run=dry_run, **options):
+            if hashed and not isinstance(procesado, Exception):
+                generados.add(nombre)
+                generados.add(hashed)
+            yield nombre, hashed, procesado
+
+        # El hash se calcula sobre la fuente; minificar no cambia qué versión
+        # identifica, así que se hace sobre los archivos ya escritos.
+        for nombre in generados:
+            self._minificar(nombre)
+            self._comprimir(nombre)
+
+
+# Codificación -> sufijo de la variante, en orden de preferencia del servidor
+VARIANTES = {'br': '.br', 'gzip': '.gz'}
+
+
+def elegir_codificaciones(cabecera):
+    """
+    Codificaciones de VARIANTES que acepta un Accept-Encoding, de mayor a menor
+    q (en empate, la preferencia del servidor). q=0 la rechaza; "*" vale para
+    las no mencionadas.
+    """
+    calidades = {}
+    for parte in cabecera.split(','):
+        token, *parametros = [p.strip() for p in parte.split(';')]
+        if not token:
+            continue
+        q = 1.0
+        for parametro in parametros:
+            nombre, _, valor = parametro.partition('=')
+            if nombre.strip().lower() == 'q':
+                try:
+                    q = float(valor)
+                except ValueError:
+                    q = 0.0
+        calidades[token.lower()] = q
+
+    orden = list(VARIANTES)
+    aceptadas = [
+        (calidades.get(nombre, calidades.get('*', 0.0)), nombre) for nombre in orden
+    ]
+    return [n for q, n in sorted(aceptadas, key=lambda x: (-x[0], orden.index(x[1]))) if q > 0]
+
+
+class PrecompressedStaticApp:
+    """
+    Envoltorio WSGI que sirve STATIC_ROOT eligiendo la variante .br/.gz según
+    Accept-Encoding, con caché inmutable para los nombres con hash.
+    """
+
+    def __init__(self, application, root=None, prefix=None):
+        self.application = application
+        self.root = os.path.realpath(root or settings.STATIC_ROOT)
+        self.prefix = prefix or settings.STATIC_URL
+        if not self.prefix.startswith('/'):
+            self.prefix = '/' + self.prefix
+
+    def _ruta(self, path_info):
+        relativa = path_info[len(self.prefix):]
+        ruta = os.path.realpath(os.path.join(self.root, relativa))
+        if not ruta.startswith(self.root + os.sep) or not os.path.isfile(ruta):
+            return None
+        return ruta
+
+    def __call__(self, environ, start_response):
+        path_info = environ.get('PATH_INFO', '')
+        if not path_info.startswith(self.prefix) or environ.get('REQUEST_METHOD') not in ('GET', 'HEAD'):
+            return self.application(environ, start_response)
+
+        ruta = self._ruta(path_info)
+        if ruta is None:
+            return self.application(environ, start_response)
+
+        content_type = mimetypes.guess_type(ruta)[0] or 'application/octet-stream'
+        servir, codificacion = ruta, None
+        for nombre in elegir_codificaciones(environ.get('HTTP_ACCEPT_ENCODING', '')):
+            if os.path.isfile(ruta + VARIANTES[nombre]):
+                servir, codificacion = ruta + VARIANTES[nombre], nombre
+                break
+
+        stat = os.stat(servir)
+        etag = f'"{int(stat.st_mtime):x}-{stat.st_size:x}"'
+        headers = [
+            ('Content-Type', content_type),
+            ('Cache-Control', CACHE_INMUTABLE if NOMBRE_CON_HASH.search(ruta) else CACHE_CORTO),
+            ('Last-Modified', formatdate(stat.st_mtime, usegmt=True)),
+            ('ETag', etag),
+            ('Vary', 'Accept-Encoding'),
+        ]
+        if codificacion:
+            headers.append(('Content-Encoding', codificacion))
+
+        if environ.get('HTTP_IF_NONE_MATCH') == etag:
+            start_response('304 Not Modified', headers)
+            return []
+
+        headers.append(('Content-Length', str(stat.st_size)))
+        start_response('200 OK', headers)
+        if environ['REQUEST_METHOD'] == 'HEAD':
+            return []
+        file_wrapper = environ.get('wsgi.file_wrapper')
+        if file_wrapper:
+            return file_wrapper(open(servir, 'rb'), 65536)
+        return _leer_por_bloques(servir)
+
+
+def _leer_por_bloques(ruta, tamano=65536):
+    with open(ruta, 'rb') as f:
+        while bloque := f.read(tamano):
+            yield bloque
@@ -0,0 +1,261 @@
+import gzip
+import os
+import shutil
+import tempfile
+from types import SimpleNamespace
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management import call_command
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+
+from . import metrics, staticfiles
+from .staticfiles import PrecompressedStaticApp, elegir_codificaciones
+
+# Las pruebas no corren collectstatic: sin manifiesto de archivos con hash
+sin_manifiesto = override_settings(STORAGES={
+    **settings.STORAGES,
+    'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'},
+})
+
+CSS = '/* estilos */\nbody {\n    color: red;\n}\n' + ''.join(
+    f'.tarjeta-{i} {{\n    margin: {i}px;\n}}\n' for i in range(200)
+)
+JS = '// interfaz\nfunction saludar(nombre) {\n    return "hola " + nombre;\n}\n' * 50
+
+
+def directorio_temporal(test):
+    directorio = tempfile.mkdtemp()
+    test.addCleanup(shutil.rmtree, directorio)
+    return directorio
+
+
+def escribir(ruta, contenido):
+    os.makedirs(os.path.dirname(ruta), exist_ok=True)
+    with open(ruta, 'wb') as f:
+        f.write(contenido)
+
+
+class CollectstaticTests(SimpleTestCase):
+    """collectstatic escribe nombres con hash, minifica y deja variantes precomprimidas."""
+
+    def setUp(self):
+        fuente = directorio_temporal(self)
+        self.destino = directorio_temporal(self)
+        escribir(os.path.join(fuente, 'css', 'estilo.css'), CSS.encode())
+        escribir(os.path.join(fuente, 'js', 'app.js'), JS.encode())
+        ajustes = override_settings(
+            STATICFILES_DIRS=[fuente],
+            STATICFILES_FINDERS=['django.contrib.staticfiles.finders.FileSystemFinder'],
+            STATIC_ROOT=self.destino,
+            STORAGES={
+                **settings.STORAGES,
+                'staticfiles': {'BACKEND': 'proyectoIntegrado.staticfiles.CompressedManifestStaticFilesStorage'},
+            },
+        )
+        ajustes.enable()
+        self.addCleanup(ajustes.disable)
+
+    def recolectar(self):
+        call_command('collectstatic', interactive=False, verbosity=0)
+
+    def con_hash(self, carpeta, extension):
+        nombres = [
+            n for n in os.listdir(os.path.join(self.destino, carpeta))
+            if n.endswith(extension) and staticfiles.NOMBRE_CON_HASH.search(n)
+        ]
+        self.assertEqual(len(nombres), 1, nombres)
+        return os.path.join(self.destino, carpeta, nombres[0])
+
+    def leer(self, ruta):
+        with open(ruta, 'rb') as f:
+            return f.read()
+
+    def test_hash_minificado_y_variantes(self):
+        minificadores = {'.css': lambda s: s.replace('    ', ''), '.js': lambda s: s.replace('    ', '')}
+        with mock.patch.dict(staticfiles.MINIFICADORES, minificadores, clear=True):
+            self.recolectar()
+
+        for carpeta, extension, original in (('css', '.css', CSS), ('js', '.js', JS)):
+            ruta = self.con_hash(carpeta, extension)
+            contenido = self.leer(ruta)
+            self.assertEqual(contenido, original.replace('    ', '').encode())
+            self.assertEqual(gzip.decompress(self.leer(ruta + '.gz')), contenido)
+            if staticfiles.brotli is not None:
+                self.assertEqual(staticfiles.brotli.decompress(self.leer(ruta + '.br')), contenido)
+            else:
+                self.assertFalse(os.path.exists(ruta + '.br'))
+
+    def test_sin_minificador_avisa_y_copia_tal_cual(self):
+        with mock.patch.dict(staticfiles.MINIFICADORES, clear=True):
+            with self.assertLogs('proyectoIntegrado.staticfiles', 'WARNING') as registros:
+                self.recolectar()
+
+        self.assertIn('rcssmin, rjsmin', registros.output[0])
+        self.assertEqual(self.leer(self.con_hash('css', '.css')), CSS.encode())
+        self.assertTrue(os.path.exists(self.con_hash('js', '.js') + '.gz'))
+
+    @override_settings(PRODUCTION=True)
+    def test_sin_minificador_falla_en_produccion(self):
+        with mock.patch.dict(staticfiles.MINIFICADORES, {'.css': str.strip}, clear=True):
+            with self.assertRaisesMessage(ImproperlyConfigured, 'rjsmin'):
+                self.recolectar()
+
+
+class PrecompressedStaticAppTests(SimpleTestCase):
+    """La variante servida sale de Accept-Encoding; lo demás pasa a la app de Django."""
+
+    def setUp(self):
+        self.root = directorio_temporal(self)
+        self.ruta = os.path.join(self.root, 'css', 'estilo.0123456789ab.css')
+        escribir(self.ruta, CSS.encode())
+        escribir(self.ruta + '.gz', b'gz')
+        escribir(self.ruta + '.br', b'br')
+        escribir(os.path.join(self.root, 'robots.txt'), b'User-agent: *')
+        self.django = mock.Mock(return_value=[b'django'])
+        self.app = PrecompressedStaticApp(self.django, root=self.root, prefix='/static/')
+
+    def pedir(self, path, accept_encoding=None, method='GET'):
+        environ = {'PATH_INFO': path, 'REQUEST_METHOD': method}
+        if accept_encoding is not None:
+            environ['HTTP_ACCEPT_ENCODING'] = accept_encoding
+        respuesta = {}
+
+        def start_response(status, headers):
+            respuesta['status'] = status
+            respuesta['headers'] = dict(headers)
+
+        respuesta['cuerpo'] = b''.join(self.app(environ, start_response))
+        return respuesta
+
+    def test_negociacion(self):
+        casos = [
+            ('gzip, deflate, br', 'br', b'br'),
+            ('br;q=0, gzip', 'gzip', b'gz'),
+            ('gzip;q=1, br;q=0.5', 'gzip', b'gz'),
+            ('*', 'br', b'br'),
+            ('identity', None, CSS.encode()),
+            (None, None, CSS.encode()),
+        ]
+        for accept_encoding, codificacion, cuerpo in casos:
+            with self.subTest(accept_encoding=accept_encoding):
+                respuesta = self.pedir('/static/css/estilo.0123456789ab.css', accept_encoding)
+                self.assertEqual(respuesta['status'], '200 OK')
+                self.assertEqual(respuesta['cuerpo'], cuerpo)
+                self.assertEqual(respuesta['headers'].get('Content-Encoding'), codificacion)
+                self.assertEqual(respuesta['headers']['Vary'], 'Accept-Encoding')
+                self.assertEqual(respuesta['headers']['Content-Type'], 'text/css')
+                self.assertEqual(respuesta['headers']['Cache-Control'], staticfiles.CACHE_INMUTABLE)
+        self.django.assert_not_called()
+
+    def test_sin_hash_cache_corto_y_etag(self):
+        respuesta = self.pedir('/static/robots.txt', 'gzip')
+        self.assertEqual(respuesta['headers']['Cache-Control'], staticfiles.CACHE_CORTO)
+        self.assertNotIn('Content-Encoding', respuesta['headers'])
+
+        environ = {
+            'PATH_INFO': '/static/robots.txt', 'REQUEST_METHOD': 'GET',
+            'HTTP_IF_NONE_MATCH': respuesta['headers']['ETag'],
+        }
+        start_response = mock.Mock()
+        self.assertEqual(self.app(environ, start_response), [])
+        self.assertEqual(start_response.call_args.args[0], '304 Not Modified')
+
+    def test_lo_demas_pasa_a_django(self):
+        for path, method in (
+            ('/catalogo/', 'GET'),
+            ('/static/no-existe.css', 'GET'),
+            ('/static/../settings.py', 'GET'),
+            ('/static/robots.txt', 'POST'),
+        ):
+            with self.subTest(path=path, method=method):
+                self.assertEqual(self.pedir(path, method=method)['cuerpo'], b'django')
+
+    def test_elegir_codificaciones(self):
+        self.assertEqual(elegir_codificaciones('gzip, br'), ['br', 'gzip'])
+        self.assertEqual(elegir_codificaciones('br;q=0.2, gzip;q=0.8'), ['gzip', 'br'])
+        self.assertEqual(elegir_codificaciones('*;q=0.5, br;q=0'), ['gzip'])
+        self.assertEqual(elegir_codificaciones('gzip;q=abc'), [])
+        self.assertEqual(elegir_codificaciones(''), [])
+
+
+@sin_manifiesto
+class MetricsTests(TestCase):
+    """Histogramas por vista, detección de N+1 y /metrics protegido por token."""
+
+    def setUp(self):
+        self.registro = metrics.Registro()
+        parche = mock.patch.object(metrics, 'registro', self.registro)
+        parche.start()
+        self.addCleanup(parche.stop)
+
+    def lineas(self):
+        return self.registro.texto().splitlines()
+
+    def test_histograma_acumula_por_bucket(self):
+        histograma = metrics.Histograma('latencia', 'Latencia.', ('view',), (0.1, 1))
+        for valor in (0.05, 0.1, 0.5, 3):
+            histograma.observe(('catalogo',), valor)
+        self.assertEqual(list(histograma.lineas()), [
+            'latencia_bucket{view="catalogo",le="0.1"} 2',
+            'latencia_bucket{view="catalogo",le="1"} 3',
+            'latencia_bucket{view="catalogo",le="+Inf"} 4',
+            'latencia_sum{view="catalogo"} 3.65',
+            'latencia_count{view="catalogo"} 4',
+        ])
+
+    def test_registra_por_nombre_de_vista(self):
+        self.client.get(reverse('compradores:catalog'))
+        self.client.get(reverse('compradores:catalog'), {'page': 2})
+        self.client.get('/no-existe/')
+
+        lineas = self.lineas()
+        self.assertIn(
+            'http_request_duration_seconds_count{view="compradores:catalog",method="GET",status="2xx"} 2', lineas,
+        )
+        self.assertIn('http_request_duration_seconds_count{view="<sin-vista>",method="GET",status="4xx"} 1', lineas)
+        self.assertIn('db_queries_per_request_count{view="compradores:catalog"} 2', lineas)
+        self.assertFalse([l for l in lineas if l.startswith('db_repeated_query_requests_total{')])
+
+    @override_settings(METRICS_N_PLUS_ONE_THRESHOLD=3)
+    def test_consulta_repetida_cuenta_como_n_mas_uno(self):
+        ids = [User.objects.create_user(f'comprador{i}').pk for i in range(3)]
+
+        def vista(consultar):
+            def get_response(request):
+                request.resolver_match = SimpleNamespace(view_name='prueba')
+                for pk in consultar:
+                    User.objects.filter(pk=pk).exists()
+                return HttpResponse()
+            return metrics.MetricsMiddleware(get_response)
+
+        vista(ids[:2])(RequestFactory().get('/'))
+        self.assertNotIn('db_repeated_query_requests_total{view="prueba"} 1', self.lineas())
+
+        with self.assertLogs('proyectoIntegrado.metrics', 'WARNING') as registros:
+            vista(ids)(RequestFactory().get('/'))
+        self.assertIn('Posible N+1 en prueba: la misma consulta se ejecutó 3 veces', registros.output[0])
+        self.assertIn('db_repeated_query_requests_total{view="prueba"} 1', self.lineas())
+        self.assertIn('db_queries_per_request_count{view="prueba"} 2', self.lineas())
+
+    @override_settings(METRICS_TOKEN=None, DEBUG=False)
+    def test_sin_token_no_existe(self):
+        self.assertEqual(self.client.get(reverse('metrics')).status_code, 404)
+
+    @override_settings(METRICS_TOKEN='secreto')
+    def test_con_token(self):
+        self.client.get(reverse('compradores:catalog'))
+        for cabecera in ({}, {'HTTP_AUTHORIZATION': 'Bearer otro'}, {'HTTP_AUTHORIZATION': 'secreto'}):
+            self.assertEqual(self.client.get(reverse('metrics'), **cabecera).status_code, 403)
+
+        response = self.client.get(reverse('metrics'), HTTP_AUTHORIZATION='Bearer secreto')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['Content-Type'].startswith('text/plain; version=0.0.4'))
+        self.assertContains(response, '# TYPE http_request_duration_seconds histogram')
+        self.assertContains(response, 'view="compradores:catalog"')
+        # Las visitas del scraper no se miden a sí mismas
+        self.assertNotContains(response, 'view="metrics"')
@@ -18,8 +18,10 @@ from django.contrib import admin
 from django.urls import path, include
 from django.conf.urls.static import static
 from django.conf import settings   
+from proyectoIntegrado.metrics import metrics_view
 urlpatterns = [
     path('admin/', admin.site.urls),
+    path('metrics', metrics_view, name='metrics'),
     path('', include('proyectoApp.urls')),
 ]
 if settings.DEBUG:
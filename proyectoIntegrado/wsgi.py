@@ -14,3 +14,8 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'proyectoIntegrado.settings')
 
 application = get_wsgi_application()
+
+# Sirve STATIC_ROOT (con nombres con hash y variantes .br/.gz) sin pasar por Django
+from proyectoIntegrado.staticfiles import PrecompressedStaticApp  # noqa: E402
+
+application = PrecompressedStaticApp(application)